@@ -0,0 +1,178 @@
+# backtest/bar_store.py
+"""
+Local store of daily bars for path-dependent backtests.
+
+Bars live in backtest/bars/<TICKER>.csv (date, open, high, low, close), one file
+per ticker, filled from Alpaca by update(). load() aligns every ticker to the
+NYSE session calendar and returns (session x ticker) close/low/high matrices.
+The aligned matrices are pickled under backtest/cache/, one file per ticker set,
+and reused while the bar files are unchanged, so repeated runs skip CSV parsing
+entirely. A rebuild replaces the set's file, and only the BAR_CACHE_LIMIT most
+recently used files are kept.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glob
+import hashlib
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from backtest.engine import forward_window
+from utils.trading_calendar import nyse_calendar, to_days
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+BARS_DIR = os.path.join(BACKTEST_DIR, 'bars')
+CACHE_DIR = os.path.join(BACKTEST_DIR, 'cache')
+BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close']
+FETCH_WORKERS = 8
+BAR_CACHE_LIMIT = 8  # cached ticker sets kept in CACHE_DIR
+
+
+class DailyBars:
+    """
+    Daily close/low/high as (session x ticker) matrices on the NYSE calendar,
+    NaN where a ticker has no bar.
+    """
+
+    def __init__(self, sessions, tickers, close, low, high):
+        self.sessions = sessions
+        self.tickers = list(tickers)
+        self.close = close
+        self.low = low
+        self.high = high
+        self._ticker_index = {t: i for i, t in enumerate(self.tickers)}
+
+    def ticker_positions(self, tickers):
+        return np.array([self._ticker_index.get(t, -1) for t in tickers], dtype=int)
+
+    def session_positions(self, dates):
+        """Index of the last session on or before each date (-1 if before the first session)."""
+        return np.searchsorted(self.sessions, to_days(dates), side='right') - 1
+
+    def entry_positions(self, dates):
+        """
+        Index of the last session strictly before each date (-1 if none): the close an
+        entry on that rebalance date is priced at, as walk_forward.stream_indicator_panel
+        snapshots it. Holding periods count sessions from there, the date's own first.
+        """
+        return np.searchsorted(self.sessions, to_days(dates), side='left') - 1
+
+    def forward_window(self, start, ticker_idx, n, field='close'):
+        """
+        (entries x n) values of field for sessions start+1..start+n of each entry.
+        Sessions past the end, negative starts or unknown tickers are NaN.
+        """
+        return forward_window(getattr(self, field), start, ticker_idx, n)
+
+
+class BarStore:
+    """Per-ticker daily bar CSVs plus a pickled, calendar-aligned matrix cache."""
+
+    def __init__(self, bars_dir=BARS_DIR, cache_dir=CACHE_DIR):
+        self.bars_dir = bars_dir
+        self.cache_dir = cache_dir
+
+    def path(self, ticker):
+        return os.path.join(self.bars_dir, f'{ticker}.csv')
+
+    def tickers(self):
+        return sorted(os.path.basename(p)[:-4] for p in glob.glob(os.path.join(self.bars_dir, '*.csv')))
+
+    def write(self, ticker, rows):
+        """Merge bar dicts (see history_collector.get_daily_bars) into the ticker's file."""
+        os.makedirs(self.bars_dir, exist_ok=True)
+        new = pd.DataFrame(rows, columns=BAR_COLUMNS)
+        path = self.path(ticker)
+        if os.path.exists(path):
+            new = pd.concat([pd.read_csv(path), new], ignore_index=True)
+        new = new.drop_duplicates('date', keep='last').sort_values('date')
+        new.to_csv(path, index=False)
+
+    def update(self, tickers, start, end, fetch=None, max_workers=FETCH_WORKERS):
+        """
+        Download daily bars for tickers between start and end (datetimes, UTC) and merge them
+        into the store. fetch defaults to history_collector.get_daily_bars.
+        Returns:
+            dict: {ticker: number of bars fetched}
+        """
+        if fetch is None:
+            from data.history_collector import get_daily_bars
+            fetch = get_daily_bars
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            fetched = dict(zip(tickers, pool.map(lambda t: fetch(t, start, end), tickers)))
+        for ticker, rows in fetched.items():
+            if rows:
+                self.write(ticker, rows)
+            else:
+                logger.warning(f"No bars fetched for {ticker}")
+        return {t: len(rows) for t, rows in fetched.items()}
+
+    def load(self, tickers=None):
+        """
+        Aligned DailyBars for tickers (all stored tickers if None). Missing tickers are
+        all-NaN columns.
+        """
+        tickers = list(tickers) if tickers is not None else self.tickers()
+        files = [self.path(t) for t in tickers]
+        key = [(t, os.path.getmtime(f) if os.path.exists(f) else None) for t, f in zip(tickers, files)]
+        # Named by the ticker set only, so changed bar files replace the set's cache instead of adding one
+        digest = hashlib.sha1(repr(tickers).encode()).hexdigest()[:16]
+        cache_path = os.path.join(self.cache_dir, f'daily_bars_{digest}.pkl')
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = pickle.load(f)
+                if cached.get('key') == key:
+                    os.utime(cache_path)  # most recently used, for prune_cache
+                    return cached['bars']
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable bar cache {cache_path}: {e}")
+
+        frames = []
+        for i, path in enumerate(files):
+            if os.path.exists(path):
+                df = pd.read_csv(path, usecols=['date', 'low', 'high', 'close'])
+                frames.append(df.assign(ticker_idx=i))
+        if frames:
+            stacked = pd.concat(frames, ignore_index=True)
+            days = to_days(stacked['date'].tolist())
+            first, last = days.min(), days.max()
+        else:
+            stacked, days = None, None
+        calendar = nyse_calendar()
+        sessions = calendar.sessions_between(first, last) if frames else calendar.sessions[:0]
+        shape = (len(sessions), len(tickers))
+        matrices = {col: np.full(shape, np.nan) for col in ('close', 'low', 'high')}
+        if frames:
+            rows = np.searchsorted(sessions, days)
+            # Bars dated on non-sessions (rare vendor artifacts) are dropped
+            on_session = (rows < len(sessions)) & (sessions[np.minimum(rows, len(sessions) - 1)] == days)
+            cols = stacked['ticker_idx'].to_numpy()
+            for col in matrices:
+                matrices[col][rows[on_session], cols[on_session]] = stacked[col].to_numpy(dtype=float)[on_session]
+        bars = DailyBars(sessions, tickers, matrices['close'], matrices['low'], matrices['high'])
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'key': key, 'bars': bars}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+        self.prune_cache()
+        return bars
+
+    def prune_cache(self, keep=BAR_CACHE_LIMIT):
+        """Delete all but the keep most recently used bar caches; returns the deleted paths."""
+        paths = sorted(glob.glob(os.path.join(self.cache_dir, 'daily_bars_*.pkl')), key=os.path.getmtime, reverse=True)
+        deleted = []
+        for path in paths[keep:]:
+            try:
+                os.remove(path)
+                deleted.append(path)
+            except OSError as e:
+                logger.warning(f"Could not delete bar cache {path}: {e}")
+        return deleted
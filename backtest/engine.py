@@ -0,0 +1,444 @@
+# backtest/engine.py
+"""
+Array-based backtest engine: the same backtest_results.csv as backtester.main(),
+without the per-ticker, per-offset Python loops.
+
+  1. Every indicators_YYYY-MM-DD.csv is loaded once into a (date x ticker) price
+     matrix.
+  2. The strongly-bullish entries of every bull_put_analysis_<date>.json become
+     (date index, ticker index) arrays.
+  3. For each holding period the forward price window after every entry is
+     gathered in one fancy-indexing step. Breach counts are row sums of
+     window < protection price, and the lowest price seen is a row min.
+  4. Result rows for every (entry, protection, holding) combination are built by
+     broadcasting, and win rates come from one groupby.
+
+Exit prices are taken from the analysis JSON's price_<n>d fields, as in
+backtester.main(); holding periods without such a field use the price matrix.
+
+run_path_backtest() is the daily-resolution mode: each trade is checked against
+every session of its holding period from the local bar store (bar_store.py),
+optionally against intraday lows, giving the first-touch date of the short
+strike and the max adverse excursion. All trades are evaluated at once as an
+(entries x protections x sessions) mask, so the cost does not grow with the
+number of trades beyond the array size.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import glob
+import json
+import time
+import numpy as np
+import pandas as pd
+from backtest.backtester import PROTECTION_LEVELS, HOLDING_PERIODS, BACKTEST_START, BACKTEST_END
+from utils.trading_calendar import TradingCalendar, nyse_calendar
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+INDICATOR_PATTERN = os.path.join(BACKTEST_DIR, 'indicators_*.csv')
+RESULT_COLUMNS = [
+    'date', 'ticker', 'entry_price', 'exit_price', 'protection', 'holding_days', 'breached',
+    'protection_price', 'actual_move', 'pct_move',
+    'combined_signal_value', 'combined_signal_text',
+    'breaches_5d', 'breaches_10d', 'breaches_25d'
+]
+SUMMARY_HOLDINGS = (5, 10, 25)  # breaches_<n>d columns
+PATH_RESULT_COLUMNS = [
+    'date', 'ticker', 'entry_price', 'exit_date', 'exit_price', 'protection', 'holding_days',
+    'protection_price', 'breached', 'touched', 'first_touch_date', 'days_to_touch',
+    'path_min', 'mae_pct', 'pct_move', 'combined_signal_value', 'combined_signal_text'
+]
+
+
+def forward_window(matrix, start, ticker_idx, n):
+    """
+    (entries x n) values of a (row x ticker) matrix at rows start+1..start+n of each entry.
+    Rows past the end, negative starts or unknown tickers (-1) are NaN.
+    """
+    offsets = start[:, None] + np.arange(1, n + 1)[None, :]
+    valid = (start[:, None] >= 0) & (ticker_idx[:, None] >= 0) & (offsets < matrix.shape[0])
+    window = np.full(offsets.shape, np.nan)
+    rows, cols = np.nonzero(valid)
+    window[rows, cols] = matrix[offsets[rows, cols], ticker_idx[rows]]
+    return window
+
+
+class PricePanel:
+    """
+    Close prices as a (date x ticker) float matrix, NaN where a ticker has no price.
+    calendar maps a date to its row in O(1) and shifts dates by whole samples.
+    """
+
+    def __init__(self, dates, tickers, prices):
+        self.dates = list(dates)
+        self.tickers = list(tickers)
+        self.prices = prices
+        self.calendar = TradingCalendar.from_dates(self.dates)
+        self._ticker_index = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_indicator_csvs(cls, pattern=INDICATOR_PATTERN, start=None, end=None):
+        """Panel of the indicator CSVs matching pattern, optionally only those dated within [start, end] ('YYYY-MM-DD')."""
+        files = sorted(glob.glob(pattern))
+        dates = [os.path.basename(f).replace('indicators_', '').replace('.csv', '') for f in files]
+        keep = [(start is None or d >= start) and (end is None or d <= end) for d in dates]
+        files = [f for f, k in zip(files, keep) if k]
+        dates = [d for d, k in zip(dates, keep) if k]
+        frames = []
+        for date_str, csv_path in zip(dates, files):
+            # Keep tickers such as 'NA' as strings; unparseable prices become NaN like the None of the loop version
+            df = pd.read_csv(csv_path, usecols=['ticker', 'current_price'], dtype={'ticker': str}, keep_default_na=False)
+            frames.append(df.assign(date=date_str))
+        stacked = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['date', 'ticker', 'current_price'])
+        return cls.from_frame(stacked, dates)
+
+    @classmethod
+    def from_frame(cls, frame, dates=None):
+        """
+        Panel of an indicator frame with date, ticker and current_price columns (one row
+        per date and ticker, e.g. every indicators_<date>.csv stacked). dates defaults to
+        the sorted dates of frame.
+        """
+        dates = sorted(set(frame['date'])) if dates is None else list(dates)
+        tickers = list(dict.fromkeys(frame['ticker']))
+        date_idx = pd.Index(dates).get_indexer(frame['date'])
+        ticker_idx = pd.Index(tickers).get_indexer(frame['ticker'])
+        prices = np.full((len(dates), len(tickers)), np.nan)
+        prices[date_idx, ticker_idx] = pd.to_numeric(frame['current_price'], errors='coerce').to_numpy(dtype=float)
+        return cls(dates, tickers, prices)
+
+    def ticker_positions(self, tickers):
+        return np.array([self._ticker_index.get(t, -1) for t in tickers], dtype=int)
+
+    def date_positions(self, dates):
+        positions = [self.calendar.position(d) for d in dates]
+        return np.array([-1 if i is None else i for i in positions], dtype=int)
+
+    def forward_window(self, date_idx, ticker_idx, n):
+        """
+        Prices for offsets 1..n after each (date, ticker) entry as an (entries x n) array.
+        Offsets past the last date, unknown dates or unknown tickers are NaN.
+        """
+        return forward_window(self.prices, date_idx, ticker_idx, n)
+
+    def price_after(self, date_idx, ticker_idx, n):
+        """Price n samples after each entry (NaN past the end), i.e. the last column of forward_window."""
+        return self.forward_window(date_idx, ticker_idx, n)[:, -1] if n > 0 else np.full(len(date_idx), np.nan)
+
+
+def load_entries(dates, analysis_dir=BACKTEST_DIR, signal_text='strongly bullish'):
+    """
+    Strongly bullish entries from bull_put_analysis_<date>.json, in date then file order.
+    Returns:
+        pd.DataFrame: date, ticker, entry_price, combined_signal_value, combined_signal_text
+                      and every price_<n>d field present in the files.
+    """
+    records = []
+    for date_str in dates:
+        path = os.path.join(analysis_dir, f'bull_put_analysis_{date_str}.json')
+        if not os.path.exists(path):
+            continue
+        with open(path, 'r') as f:
+            analysis = json.load(f)
+        for stock in analysis:
+            if stock.get('combined_signal', {}).get('text', '').lower() != signal_text:
+                continue
+            if stock.get('entry_price') is None:
+                continue
+            record = {
+                'date': date_str,
+                'ticker': stock['ticker'],
+                'entry_price': stock['entry_price'],
+                'combined_signal_value': stock['combined_signal']['value'],
+                'combined_signal_text': stock['combined_signal']['text'],
+            }
+            for key, value in stock.items():
+                if key.startswith('price_') and key.endswith('d'):
+                    record[key] = value
+            records.append(record)
+    entries = pd.DataFrame(records)
+    if records:
+        # Keep ints as ints (e.g. a value of 2 is written as "2", not "2.0")
+        entries['combined_signal_value'] = pd.Series([r['combined_signal_value'] for r in records], dtype=object)
+    return entries
+
+
+def run_backtest(panel, entries, protection_levels, holding_periods):
+    """
+    Evaluate every entry for every (protection, holding) pair.
+    Args:
+        panel (PricePanel): Prices for breach counting (and exits without a price_<n>d field).
+        entries (pd.DataFrame): Output of load_entries.
+        protection_levels (list[float]): Short strike distances below entry.
+        holding_periods (list[int]): Holding periods in samples.
+    Returns:
+        pd.DataFrame: RESULT_COLUMNS plus 'path_min' (lowest price while holding), in the
+                      row order of backtester.main(): entry, then protection, then holding.
+    """
+    n_entries, n_prot, n_hold = len(entries), len(protection_levels), len(holding_periods)
+    if n_entries == 0 or n_prot == 0 or n_hold == 0:
+        return pd.DataFrame(columns=RESULT_COLUMNS + ['path_min'])
+    date_idx = panel.date_positions(entries['date'])
+    ticker_idx = panel.ticker_positions(entries['ticker'])
+    entry = entries['entry_price'].to_numpy(dtype=float)
+    max_window = max(max(holding_periods), max(SUMMARY_HOLDINGS))
+    window = panel.forward_window(date_idx, ticker_idx, max_window)
+
+    # Summary breach counts use the first protection level, as in the loop version
+    summary_strike = entry * (1 - protection_levels[0])
+    below_summary = window < summary_strike[:, None]
+    breach_summary = {h: below_summary[:, :h].sum(axis=1) for h in SUMMARY_HOLDINGS}
+
+    exits = np.empty((n_entries, n_hold))
+    path_min = np.empty((n_entries, n_hold))
+    for j, h in enumerate(holding_periods):
+        field = f'price_{h}d'
+        if field in entries:
+            exits[:, j] = pd.to_numeric(entries[field], errors='coerce').to_numpy(dtype=float)
+        else:
+            exits[:, j] = window[:, h - 1]
+        with np.errstate(all='ignore'):
+            lows = np.fmin.reduce(window[:, :h], axis=1, initial=np.inf)
+        path_min[:, j] = np.where(np.isinf(lows), np.nan, lows)
+
+    # (entry, protection, holding) grid flattened in loop order
+    protection = np.asarray(protection_levels, dtype=float)
+    prot_grid = np.broadcast_to(protection[None, :, None], (n_entries, n_prot, n_hold)).ravel()
+    hold_grid = np.broadcast_to(np.asarray(holding_periods)[None, None, :], (n_entries, n_prot, n_hold)).ravel()
+    entry_grid = np.repeat(entry, n_prot * n_hold)
+    exit_grid = np.broadcast_to(exits[:, None, :], (n_entries, n_prot, n_hold)).ravel()
+    protection_price = entry_grid * (1 - prot_grid)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        actual_move = exit_grid - entry_grid
+        pct_move = np.where(entry_grid != 0, (exit_grid - entry_grid) / entry_grid * 100, np.nan)
+    repeat = lambda col: np.repeat(entries[col].to_numpy(dtype=object), n_prot * n_hold)
+    result = pd.DataFrame({
+        'date': repeat('date'),
+        'ticker': repeat('ticker'),
+        'entry_price': entry_grid,
+        'exit_price': exit_grid,
+        'protection': prot_grid,
+        'holding_days': hold_grid,
+        'breached': exit_grid < protection_price,
+        'protection_price': protection_price,
+        'actual_move': actual_move,
+        'pct_move': pct_move,
+        'combined_signal_value': repeat('combined_signal_value'),
+        'combined_signal_text': repeat('combined_signal_text'),
+    })
+    for h in SUMMARY_HOLDINGS:
+        result[f'breaches_{h}d'] = np.repeat(breach_summary[h], n_prot * n_hold)
+    result['path_min'] = np.broadcast_to(path_min[:, None, :], (n_entries, n_prot, n_hold)).ravel()
+    return result
+
+
+def _date_strings(days):
+    # Vectorized to_strings(): 'YYYY-MM-DD' objects, None for NaT
+    out = np.datetime_as_string(days, unit='D').astype(object)
+    out[np.isnat(days)] = None
+    return out
+
+
+def run_path_backtest(bars, entries, protection_levels, holding_periods, use_lows=False):
+    """
+    Evaluate every entry against its full daily price path.
+    Args:
+        bars (DailyBars): Session-aligned bars from BarStore.load().
+        entries (pd.DataFrame): Output of load_entries; the entry is at the close of the
+                                last session before its date (DailyBars.entry_positions).
+        protection_levels (list[float]): Short strike distances below entry.
+        holding_periods (list[int]): Holding periods in trading sessions.
+        use_lows (bool): Count a touch when the session low (rather than the close) is
+                         below the strike; sessions without a low fall back to the close.
+    Returns:
+        pd.DataFrame: PATH_RESULT_COLUMNS, one row per (entry, protection, holding) in that order.
+            breached: exit close below the strike. touched: the path went below the strike
+            at any session while holding. days_to_touch counts sessions after entry.
+            mae_pct: max adverse excursion, (lowest price - entry) / entry * 100, capped at 0.
+    """
+    n_entries, n_prot, n_hold = len(entries), len(protection_levels), len(holding_periods)
+    if n_entries == 0 or n_prot == 0 or n_hold == 0:
+        return pd.DataFrame(columns=PATH_RESULT_COLUMNS)
+    start = bars.entry_positions(entries['date'])
+    ticker_idx = bars.ticker_positions(entries['ticker'])
+    entry = entries['entry_price'].to_numpy(dtype=float)
+    max_window = max(holding_periods)
+    closes = bars.forward_window(start, ticker_idx, max_window)
+    path = closes
+    if use_lows:
+        lows = bars.forward_window(start, ticker_idx, max_window, field='low')
+        path = np.where(np.isnan(lows), closes, lows)
+
+    # First session (0-based) each strike is touched, max_window if never
+    protection = np.asarray(protection_levels, dtype=float)
+    strikes = entry[:, None] * (1 - protection[None, :])
+    below = path[:, None, :] < strikes[:, :, None]
+    first = np.where(below.any(axis=2), below.argmax(axis=2), max_window)
+    running_min = np.fmin.accumulate(path, axis=1)
+
+    hold = np.asarray(holding_periods, dtype=int)
+    shape = (n_entries, n_prot, n_hold)
+    first_grid = np.broadcast_to(first[:, :, None], shape).ravel()
+    hold_grid = np.broadcast_to(hold[None, None, :], shape).ravel()
+    touched = first_grid < hold_grid
+    entry_grid = np.repeat(entry, n_prot * n_hold)
+    start_grid = np.repeat(start, n_prot * n_hold)
+    exit_grid = np.broadcast_to(closes[:, hold - 1][:, None, :], shape).ravel()
+    path_min = np.broadcast_to(running_min[:, hold - 1][:, None, :], shape).ravel()
+    strike_grid = np.broadcast_to(strikes[:, :, None], shape).ravel()
+    sessions = bars.sessions
+    at = lambda pos, mask: np.where(mask & (pos < len(sessions)), sessions[np.clip(pos, 0, len(sessions) - 1)],
+                                    np.datetime64('NaT', 'D'))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pct_move = np.where(entry_grid != 0, (exit_grid - entry_grid) / entry_grid * 100, np.nan)
+        mae_pct = np.minimum((path_min - entry_grid) / entry_grid * 100, 0.0)
+    repeat = lambda col: np.repeat(entries[col].to_numpy(dtype=object), n_prot * n_hold)
+    return pd.DataFrame({
+        'date': repeat('date'),
+        'ticker': repeat('ticker'),
+        'entry_price': entry_grid,
+        'exit_date': _date_strings(at(start_grid + hold_grid, (start_grid >= 0) & ~np.isnan(exit_grid))),
+        'exit_price': exit_grid,
+        'protection': np.broadcast_to(protection[None, :, None], shape).ravel(),
+        'holding_days': hold_grid,
+        'protection_price': strike_grid,
+        'breached': exit_grid < strike_grid,
+        'touched': touched,
+        'first_touch_date': _date_strings(at(start_grid + first_grid + 1, touched)),
+        'days_to_touch': np.where(touched, first_grid + 1, np.nan),
+        'path_min': path_min,
+        'mae_pct': mae_pct,
+        'pct_move': pct_move,
+        'combined_signal_value': repeat('combined_signal_value'),
+        'combined_signal_text': repeat('combined_signal_text'),
+    })
+
+
+def win_rates(result):
+    """Win rate per (protection, holding_days) with one groupby."""
+    grouped = result.groupby(['protection', 'holding_days'], sort=False)['breached']
+    summary = grouped.agg(total='size', losses='sum').reset_index()
+    summary['wins'] = summary['total'] - summary['losses']
+    summary['win_rate'] = summary['wins'] / summary['total']
+    return summary
+
+
+def _csv_value(value):
+    # Same rounding as backtester.main(): bools as-is, numbers to 2 places, NaN as empty
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else round(float(value), 2)
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return value
+
+
+def _csv_column(series):
+    values = series.tolist()
+    if series.dtype == float:
+        return [None if v != v else round(v, 2) for v in values]
+    if series.dtype == bool or pd.api.types.is_integer_dtype(series.dtype):
+        return values
+    return [_csv_value(v) for v in values]
+
+
+def write_results_csv(result, out_csv, columns=RESULT_COLUMNS):
+    """Write result in backtest_results.csv format, converting column by column."""
+    header = columns
+    columns = [_csv_column(result[col]) for col in header]
+    with open(out_csv, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(zip(*columns))
+
+
+def main(protection_levels=None, holding_periods=None, out_csv=None, resolution='sample', use_lows=False,
+         workers=1, start_date=None, end_date=None, bootstrap=None):
+    """
+    Vectorized equivalent of backtester.main(); writes backtest_results.csv and prints win rates.
+    resolution='daily' runs run_path_backtest() on the local bar store instead and writes
+    backtest_path_results.csv with touch rates and average max adverse excursion.
+    workers > 1 splits the rebalance dates across a process pool (see parallel.py).
+    bootstrap ('trade' or 'week') also prints win rate confidence intervals (see bootstrap.py).
+    start_date / end_date (datetimes) default to backtester.BACKTEST_START / BACKTEST_END.
+    """
+    protection_levels = protection_levels or PROTECTION_LEVELS
+    holding_periods = holding_periods or HOLDING_PERIODS
+    start_date = start_date or BACKTEST_START
+    end_date = end_date or BACKTEST_END
+    start = time.perf_counter()
+    panel = PricePanel.from_indicator_csvs(start=start_date.strftime('%Y-%m-%d'), end=end_date.strftime('%Y-%m-%d'))
+    mondays = [str(d) for d in nyse_calendar().weekdays(start_date, end_date, weekday=0)]
+    entries = load_entries(mondays)
+    return run_and_report(panel, entries, protection_levels, holding_periods, out_csv, resolution, use_lows,
+                          workers, start, bootstrap)
+
+
+def run_and_report(panel, entries, protection_levels, holding_periods, out_csv=None, resolution='sample',
+                   use_lows=False, workers=1, start=None, bootstrap=None):
+    """
+    Backtest entries on panel (or, with resolution='daily', on the bar store), write the
+    results CSV and print win rates. Shared by main() and the in-memory pipeline.py.
+    """
+    start = start or time.perf_counter()
+    if resolution == 'daily':
+        result = _main_daily(entries, protection_levels, holding_periods, out_csv, use_lows, workers, start)
+    else:
+        result = _main_sample(panel, entries, protection_levels, holding_periods, out_csv, workers, start)
+    if bootstrap and len(result):
+        from backtest.bootstrap import report_intervals
+        report_intervals(result, block=bootstrap, out_csv=os.path.join(BACKTEST_DIR, 'backtest_win_rate_ci.csv'))
+    return result
+
+
+def _main_sample(panel, entries, protection_levels, holding_periods, out_csv, workers, start):
+    if workers > 1:
+        from backtest.parallel import parallel_backtest
+        result = parallel_backtest(panel, entries, protection_levels, holding_periods, max_workers=workers)
+    else:
+        result = run_backtest(panel, entries, protection_levels, holding_periods)
+    out_csv = out_csv or os.path.join(BACKTEST_DIR, 'backtest_results.csv')
+    write_results_csv(result, out_csv)
+    summary = win_rates(result)
+    for row in summary.itertuples(index=False):
+        print(f"Protection: {int(row.protection*100)}%, Holding: {row.holding_days}d => "
+              f"Win rate: {row.win_rate:.2%} ({row.wins}/{row.total})")
+    logger.info(f"Backtest of {len(entries)} entries written to {out_csv} in {time.perf_counter() - start:.2f}s")
+    return result
+
+
+def _main_daily(entries, protection_levels, holding_periods, out_csv, use_lows, workers, start):
+    from backtest.bar_store import BarStore
+    tickers = sorted(set(entries['ticker'])) if len(entries) else []
+    bars = BarStore().load(tickers)
+    missing = [t for t, has in zip(bars.tickers, ~np.all(np.isnan(bars.close), axis=0)) if not has]
+    if missing:
+        logger.warning(f"No stored bars for {len(missing)} tickers (run BarStore().update first): {missing[:10]}")
+    if workers > 1:
+        from backtest.parallel import parallel_path_backtest
+        result = parallel_path_backtest(bars, entries, protection_levels, holding_periods, use_lows=use_lows,
+                                        max_workers=workers)
+    else:
+        result = run_path_backtest(bars, entries, protection_levels, holding_periods, use_lows=use_lows)
+    out_csv = out_csv or os.path.join(BACKTEST_DIR, 'backtest_path_results.csv')
+    write_results_csv(result, out_csv, PATH_RESULT_COLUMNS)
+    summary = win_rates(result)
+    grouped = result.groupby(['protection', 'holding_days'], sort=False)
+    summary['touch_rate'] = grouped['touched'].mean().to_numpy()
+    summary['avg_mae_pct'] = grouped['mae_pct'].mean().to_numpy()
+    for row in summary.itertuples(index=False):
+        print(f"Protection: {int(row.protection*100)}%, Holding: {row.holding_days}d => "
+              f"Win rate: {row.win_rate:.2%} ({row.wins}/{row.total}), "
+              f"Touched: {row.touch_rate:.2%}, Avg MAE: {row.avg_mae_pct:.2f}%")
+    logger.info(f"Daily path backtest of {len(entries)} entries written to {out_csv} in {time.perf_counter() - start:.2f}s")
+    return result
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+# backtest/parallel.py
+"""
+Process-pool backtesting over shared-memory price arrays.
+
+Rebalance dates are independent once prices are known, so a backtest can be cut
+into shards (blocks of consecutive dates, or chunks of parameter candidates) and
+run on every core. The large arrays (price matrices, precomputed exits) are
+copied once into multiprocessing.shared_memory blocks; workers attach to them by
+name at start-up, so tasks only carry the small shard description. Results come
+back in shard order, so the merged output is identical to a serial run.
+
+    with SharedArrays({'prices': panel.prices}) as shared:
+        ...  # shared.spec is what workers need to attach
+
+map_shards() wraps the pool; parallel_backtest() and parallel_path_backtest()
+are engine.run_backtest / run_path_backtest split by rebalance date.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+SHARDS_PER_WORKER = 4  # smaller shards even out workers that draw slow dates
+
+# Per-process state built by _init_worker: the attached arrays (or what build() made from them)
+_WORKER_STATE = None
+_WORKER_BLOCKS = []
+
+
+class SharedArrays:
+    """
+    Context manager copying named numpy arrays into shared memory blocks, unlinked on exit.
+    spec ({name: (block name, shape, dtype)}) is picklable and small; attach_arrays(spec)
+    turns it back into arrays in another process without copying.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+        self.blocks = []
+        self.spec = {}
+
+    def __enter__(self):
+        for name, array in self.arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self.blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+        return self
+
+    def __exit__(self, *exc):
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+        return False
+
+
+def attach_arrays(spec):
+    """
+    Read-only numpy views of the shared blocks described by spec.
+    Returns:
+        tuple: ({name: array}, [SharedMemory]); keep the blocks referenced while the arrays are used.
+    """
+    arrays, blocks = {}, []
+    for name, (block_name, shape, dtype) in spec.items():
+        # Pool workers share the parent's resource tracker, which unlinks the block once,
+        # when SharedArrays exits
+        block = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+        blocks.append(block)
+    return arrays, blocks
+
+
+def _init_worker(spec, build, meta):
+    global _WORKER_STATE, _WORKER_BLOCKS
+    arrays, _WORKER_BLOCKS = attach_arrays(spec)
+    _WORKER_STATE = build(arrays, **meta) if build else arrays
+
+
+def _run_shard(task):
+    func, shard = task
+    return func(_WORKER_STATE, shard)
+
+
+def map_shards(func, shards, arrays, build=None, meta=None, max_workers=None):
+    """
+    Run func(state, shard) for every shard across a process pool.
+    Args:
+        func (callable): Module-level function taking (state, shard).
+        shards (list): Picklable shard descriptions (rows, dates, candidates ...).
+        arrays (dict): {name: np.ndarray} shared with every worker through shared memory.
+        build (callable): Optional module-level build(arrays, **meta) run once per worker;
+                          its return value is the state passed to func. Defaults to the arrays.
+        meta (dict): Small picklable keyword arguments for build.
+        max_workers (int): Pool size, defaults to the CPU count. 1 runs in-process.
+    Returns:
+        list: func's results in shard order.
+    """
+    meta = meta or {}
+    max_workers = max_workers or DEFAULT_WORKERS
+    if max_workers == 1 or len(shards) <= 1:
+        state = build(arrays, **meta) if build else arrays
+        return [func(state, shard) for shard in shards]
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shared.spec, build, meta)) as pool:
+            return list(pool.map(_run_shard, [(func, shard) for shard in shards]))
+
+
+def date_shards(dates, n_shards):
+    """
+    Split the sorted unique values of dates into at most n_shards contiguous blocks.
+    Returns:
+        list[np.ndarray]: Row positions of dates for each non-empty block, in date order.
+    """
+    dates = np.asarray(dates)
+    unique, inverse = np.unique(dates, return_inverse=True)
+    blocks = np.array_split(np.arange(len(unique)), max(min(n_shards, len(unique)), 1))
+    block_of_date = np.empty(len(unique), dtype=int)
+    for b, members in enumerate(blocks):
+        block_of_date[members] = b
+    block_of_row = block_of_date[inverse]
+    order = np.argsort(block_of_row, kind='stable')
+    bounds = np.searchsorted(block_of_row[order], np.arange(len(blocks) + 1))
+    return [order[bounds[b]:bounds[b + 1]] for b in range(len(blocks)) if bounds[b + 1] > bounds[b]]
+
+
+def _shard_entries(entries, n_shards):
+    # Shards keep the rows of each date together; concatenating shard results in order
+    # gives the serial row order because entries are sorted by date
+    entries = entries.reset_index(drop=True)
+    return [entries.iloc[rows] for rows in date_shards(entries['date'].to_numpy(), n_shards)]
+
+
+def _panel_state(arrays, dates, tickers, protection_levels, holding_periods):
+    from backtest.engine import PricePanel
+    return PricePanel(dates, tickers, arrays['prices']), protection_levels, holding_periods
+
+
+def _panel_shard(state, entries):
+    from backtest.engine import run_backtest
+    panel, protection_levels, holding_periods = state
+    return run_backtest(panel, entries, protection_levels, holding_periods)
+
+
+def _bars_state(arrays, tickers, protection_levels, holding_periods, use_lows):
+    from backtest.bar_store import DailyBars
+    bars = DailyBars(arrays['sessions'], tickers, arrays['close'], arrays['low'], arrays['high'])
+    return bars, protection_levels, holding_periods, use_lows
+
+
+def _bars_shard(state, entries):
+    from backtest.engine import run_path_backtest
+    bars, protection_levels, holding_periods, use_lows = state
+    return run_path_backtest(bars, entries, protection_levels, holding_periods, use_lows=use_lows)
+
+
+def _concat(frames, empty):
+    frames = [f for f in frames if len(f)]
+    return pd.concat(frames, ignore_index=True) if frames else empty
+
+
+def parallel_backtest(panel, entries, protection_levels, holding_periods, max_workers=None, n_shards=None):
+    """
+    engine.run_backtest split by rebalance date across a process pool; same rows, same order.
+    Args:
+        panel (PricePanel): Its price matrix is shared with the workers.
+        entries (pd.DataFrame): Output of engine.load_entries (date-sorted).
+        max_workers (int): Pool size, defaults to the CPU count.
+        n_shards (int): Date blocks, defaults to SHARDS_PER_WORKER per worker.
+    """
+    from backtest.engine import run_backtest
+    max_workers = max_workers or DEFAULT_WORKERS
+    shards = _shard_entries(entries, n_shards or max_workers * SHARDS_PER_WORKER)
+    meta = {'dates': panel.dates, 'tickers': panel.tickers,
+            'protection_levels': list(protection_levels), 'holding_periods': list(holding_periods)}
+    frames = map_shards(_panel_shard, shards, {'prices': panel.prices}, build=_panel_state, meta=meta,
+                        max_workers=max_workers)
+    return _concat(frames, run_backtest(panel, entries.iloc[:0], protection_levels, holding_periods))
+
+
+def parallel_path_backtest(bars, entries, protection_levels, holding_periods, use_lows=False,
+                           max_workers=None, n_shards=None):
+    """engine.run_path_backtest split by rebalance date; bars' matrices are shared with the workers."""
+    from backtest.engine import PATH_RESULT_COLUMNS
+    max_workers = max_workers or DEFAULT_WORKERS
+    shards = _shard_entries(entries, n_shards or max_workers * SHARDS_PER_WORKER)
+    arrays = {'sessions': bars.sessions, 'close': bars.close, 'low': bars.low, 'high': bars.high}
+    meta = {'tickers': bars.tickers, 'protection_levels': list(protection_levels),
+            'holding_periods': list(holding_periods), 'use_lows': use_lows}
+    frames = map_shards(_bars_shard, shards, arrays, build=_bars_state, meta=meta, max_workers=max_workers)
+    return _concat(frames, pd.DataFrame(columns=PATH_RESULT_COLUMNS))
@@ -0,0 +1,402 @@
+# backtest/param_sweep.py
+"""
+Parameter sweep for the strategy weights in config/credit_spread_indicator.json and
+the backtester's BULLISH_THRESHOLD / PROTECTION_LEVELS / HOLDING_PERIODS.
+
+The historical indicator panel (all backtest indicators_*.csv files stacked) is
+loaded once and cached on disk. The strategy rules are evaluated over it once, so
+every candidate only re-weights the per-strategy scores and re-thresholds the
+precomputed forward prices. Candidates are evaluated in chunks across a process
+pool whose workers attach to the precomputed arrays in shared memory.
+
+Search space keys:
+    'weight:<strategy name>'               strategy weight
+    'threshold:<strategy name>:<constant>' replaces every <constant> in the strategy's rule
+                                           expressions, e.g. 'threshold:Trend Strength with ADX:20'
+                                           sweeps the 20 of 'adx_14 > 20'
+    'bullish_threshold'                    minimum combined_signal.value to enter a trade
+    'protection'                           short strike distance below entry (0.10 = 10%)
+    'holding'                              holding period in indicator samples
+
+Each distinct set of rule thresholds a strategy takes among the candidates is
+evaluated over the panel once, in build_sweep_data(); candidates then swap that
+strategy's score column. Sweep thresholds over lists of values: a (low, high)
+range draws a new value, and so a new evaluation, for every candidate.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import ast
+import csv
+import glob
+import itertools
+import json
+import pickle
+import random
+import numpy as np
+import pandas as pd
+from backtest.backtester import BULLISH_THRESHOLD, PROTECTION_LEVELS, HOLDING_PERIODS
+from strategy.bull_bear_indicator_analysis import load_config
+from strategy.rule_engine import compile_rules, RuleSet
+from backtest.parallel import map_shards
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BACKTEST_DIR, 'cache')
+DEFAULT_PANEL_PATTERN = os.path.join(BACKTEST_DIR, 'indicators_*.csv')
+CHUNK_SIZE = 256
+THRESHOLD_PREFIX = 'threshold:'
+# Rule thresholds default_search_space() sweeps, for strategies present in the config
+DEFAULT_THRESHOLD_SPACE = {
+    'threshold:Trend Strength with ADX:20': [15, 20, 25],
+    'threshold:Overbought/Oversold with RSI & Bollinger Bands:70': [65, 70, 75],
+    'threshold:Overbought/Oversold with RSI & Bollinger Bands:30': [25, 30, 35],
+}
+
+
+def load_indicator_panel(pattern=DEFAULT_PANEL_PATTERN, cache_path=None):
+    """
+    Load every indicators_YYYY-MM-DD.csv matching pattern into one DataFrame with a
+    'date' column. The result is pickled to cache_path and reused as long as the
+    set of files and their modification times are unchanged.
+    Args:
+        pattern (str): Glob pattern for the indicator CSVs.
+        cache_path (str): Pickle path for the cached panel. Defaults to backtest/cache/indicator_panel.pkl.
+    Returns:
+        pd.DataFrame: The stacked panel, sorted by date then file order.
+    """
+    files = sorted(glob.glob(pattern))
+    if not files:
+        raise FileNotFoundError(f"No indicator CSVs match {pattern}")
+    if cache_path is None:
+        cache_path = os.path.join(CACHE_DIR, 'indicator_panel.pkl')
+    cache_key = [(os.path.basename(f), os.path.getmtime(f)) for f in files]
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('key') == cache_key:
+                return cached['panel']
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable panel cache {cache_path}: {e}")
+    frames = []
+    for csv_path in files:
+        df = pd.read_csv(csv_path)
+        df.insert(0, 'date', os.path.basename(csv_path).replace('indicators_', '').replace('.csv', ''))
+        frames.append(df)
+    panel = pd.concat(frames, ignore_index=True)
+    skip = {'date', 'ticker', 'earnings_date', 'dividend_date', 'ex_dividend_date'}
+    for col in panel.columns:
+        if col not in skip:
+            panel[col] = pd.to_numeric(panel[col], errors='coerce')
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump({'key': cache_key, 'panel': panel}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return panel
+
+
+class _ReplaceConstants(ast.NodeTransformer):
+    # Swaps numeric constants (negative ones included) and records which were found
+    def __init__(self, replacements):
+        self.replacements = replacements
+        self.matched = set()
+
+    def _replace(self, node, value):
+        if value in self.replacements:
+            self.matched.add(value)
+            return ast.copy_location(ast.Constant(self.replacements[value]), node)
+        return node
+
+    def visit_UnaryOp(self, node):
+        operand = node.operand
+        if isinstance(node.op, ast.USub) and isinstance(operand, ast.Constant) and _is_number(operand.value):
+            return self._replace(node, -float(operand.value))
+        return self.generic_visit(node)
+
+    def visit_Constant(self, node):
+        return self._replace(node, float(node.value)) if _is_number(node.value) else node
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_threshold_key(key):
+    """'threshold:<strategy name>:<constant>' -> (strategy name, constant). Names may contain ':'."""
+    name, _, constant = key[len(THRESHOLD_PREFIX):].rpartition(':')
+    return name, float(constant)
+
+
+def candidate_thresholds(candidate):
+    """{strategy name: {constant: value}} from the candidate's threshold keys."""
+    thresholds = {}
+    for key, value in candidate.items():
+        if key.startswith(THRESHOLD_PREFIX):
+            name, constant = parse_threshold_key(key)
+            thresholds.setdefault(name, {})[constant] = float(value)
+    return thresholds
+
+
+def _variant_key(name, replacements):
+    return f"{name}|{json.dumps(sorted(replacements.items()))}"
+
+
+def threshold_variant_scores(panel, config, candidates):
+    """
+    Scores of every strategy variant the candidates' threshold keys ask for, each
+    evaluated over the panel once.
+    Returns:
+        dict: {variant key: np.ndarray of the strategy's scores, one per panel row}
+    Raises:
+        ValueError: If a key names an unknown strategy or a constant its rules don't use.
+    """
+    strategies = {s['name']: s for s in config.get('strategies', [])}
+    variants = {}
+    for candidate in candidates:
+        for name, replacements in candidate_thresholds(candidate).items():
+            key = _variant_key(name, replacements)
+            if key in variants:
+                continue
+            if name not in strategies:
+                raise ValueError(f"Threshold key for unknown strategy '{name}'")
+            strategy = strategies[name]
+            transformer = _ReplaceConstants(replacements)
+            rules = []
+            for rule in strategy.get('rules', []):
+                tree = transformer.visit(ast.parse(rule['when'], mode='eval'))
+                rules.append({**rule, 'when': ast.unparse(tree)})
+            unknown = set(replacements) - transformer.matched
+            if unknown:
+                raise ValueError(f"Strategy '{name}' has no rule constant {sorted(unknown)}")
+            variant = compile_rules({**config, 'strategies': [{**strategy, 'rules': rules}]})
+            variants[key] = variant.evaluate(panel)['scores'][:, 0]
+    return variants
+
+
+def build_sweep_data(panel, rule_set, holding_periods, candidates=(), config=None):
+    """
+    Precompute everything candidates share: per-strategy scores, entry prices and,
+    for each holding period, the exit price and the lowest price seen while holding.
+    Args:
+        panel (pd.DataFrame): Output of load_indicator_panel.
+        rule_set (RuleSet): Compiled strategy rules.
+        holding_periods (iterable[int]): Holding periods (in samples) candidates may use.
+        candidates (list[dict]): Candidates whose threshold keys need strategy variants.
+        config (dict): Config rule_set was compiled from; loaded if None and needed.
+    Returns:
+        dict of numpy arrays keyed by 'scores', 'available', 'strategy_names',
+        'entry', 'exit' ({h: array}), 'path_min' ({h: array}) and 'variants'
+        ({variant key: strategy scores}).
+    """
+    variants = {}
+    if any(candidate_thresholds(c) for c in candidates):
+        variants = threshold_variant_scores(panel, config or load_config(), candidates)
+    evaluation = rule_set.evaluate(panel)
+    dates = np.array(sorted(panel['date'].unique()))
+    tickers = np.array(sorted(panel['ticker'].unique()))
+    date_idx = np.searchsorted(dates, panel['date'].to_numpy())
+    ticker_idx = np.searchsorted(tickers, panel['ticker'].to_numpy())
+    prices = np.full((len(dates), len(tickers)), np.nan)
+    entry = panel['current_price'].to_numpy(dtype=float)
+    prices[date_idx, ticker_idx] = entry
+    exit_prices = {}
+    path_min = {}
+    running_min = np.full(prices.shape, np.inf)
+    for offset in range(1, max(holding_periods) + 1):
+        shifted = np.full(prices.shape, np.nan)
+        shifted[:-offset] = prices[offset:]
+        running_min = np.fmin(running_min, shifted)
+        if offset in holding_periods:
+            exit_prices[offset] = shifted[date_idx, ticker_idx]
+            lows = running_min[date_idx, ticker_idx]
+            path_min[offset] = np.where(np.isinf(lows), np.nan, lows)
+    return {
+        'scores': evaluation['scores'],
+        'available': evaluation['available'],
+        'strategy_names': rule_set.names,
+        'default_weights': rule_set.weights,
+        'entry': entry,
+        'exit': exit_prices,
+        'path_min': path_min,
+        'variants': variants,
+    }
+
+
+def grid_search_space(space):
+    """
+    Expand a grid search space into candidate dicts.
+    Args:
+        space (dict): {param: [values, ...]}
+    Returns:
+        list[dict]: Every combination of the listed values.
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_search_space(space, n_candidates, seed=None):
+    """
+    Sample candidates from a search space. A list is sampled uniformly by choice,
+    a (low, high) tuple uniformly as a float.
+    Args:
+        space (dict): {param: [values, ...] or (low, high)}
+        n_candidates (int): Number of candidates to draw.
+        seed (int): Seed for reproducible draws.
+    Returns:
+        list[dict]
+    """
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(n_candidates):
+        candidate = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                candidate[key] = rng.uniform(values[0], values[1])
+            else:
+                candidate[key] = rng.choice(values)
+        candidates.append(candidate)
+    return candidates
+
+
+def evaluate_candidate(data, candidate):
+    """
+    Score one candidate against the precomputed sweep data.
+    Returns:
+        dict: The candidate's parameters plus trades, wins, win_rate, breach_rate
+              (exit below the short strike), touch_rate (any sample below the
+              short strike while holding) and avg_pct_move.
+    """
+    weights = data['default_weights'].copy()
+    for j, name in enumerate(data['strategy_names']):
+        weights[j] = candidate.get(f'weight:{name}', weights[j])
+    scores = data['scores']
+    thresholds = candidate_thresholds(candidate)
+    if thresholds:
+        scores = scores.copy()
+        names = list(data['strategy_names'])
+        for name, replacements in thresholds.items():
+            key = _variant_key(name, replacements)
+            if key not in data.get('variants', {}):
+                raise ValueError(f"No precomputed scores for {key}; pass the candidates to build_sweep_data")
+            scores[:, names.index(name)] = data['variants'][key]
+    combined = RuleSet.combine_scores(scores, weights, data['available'])
+    holding = candidate['holding']
+    protection = candidate['protection']
+    entry = data['entry']
+    exit_price = data['exit'][holding]
+    strike = entry * (1 - protection)
+    traded = (combined >= candidate['bullish_threshold']) & ~np.isnan(entry) & ~np.isnan(exit_price)
+    trades = int(traded.sum())
+    result = dict(candidate)
+    result['trades'] = trades
+    if trades == 0:
+        result.update(wins=0, win_rate=0.0, breach_rate=0.0, touch_rate=0.0, avg_pct_move=None)
+        return result
+    breached = exit_price[traded] < strike[traded]
+    touched = data['path_min'][holding][traded] < strike[traded]
+    wins = trades - int(breached.sum())
+    result['wins'] = wins
+    result['win_rate'] = wins / trades
+    result['breach_rate'] = float(breached.mean())
+    result['touch_rate'] = float(touched.mean())
+    result['avg_pct_move'] = float(np.mean((exit_price[traded] - entry[traded]) / entry[traded] * 100))
+    return result
+
+
+def _shared_sweep_arrays(data):
+    # Flatten the sweep data into named arrays for shared memory; the rest travels as meta
+    arrays = {key: np.asarray(data[key]) for key in ('scores', 'available', 'default_weights', 'entry')}
+    for key in ('exit', 'path_min'):
+        for holding, values in data[key].items():
+            arrays[f'{key}:{holding}'] = values
+    for variant, values in data.get('variants', {}).items():
+        arrays[f'variant:{variant}'] = values
+    return arrays, {'strategy_names': list(data['strategy_names'])}
+
+
+def _sweep_state(arrays, strategy_names):
+    data = {key: arrays[key] for key in ('scores', 'available', 'default_weights', 'entry')}
+    data['strategy_names'] = strategy_names
+    for key in ('exit', 'path_min'):
+        data[key] = {int(name.split(':')[1]): values for name, values in arrays.items() if name.startswith(f'{key}:')}
+    data['variants'] = {name[len('variant:'):]: values for name, values in arrays.items() if name.startswith('variant:')}
+    return data
+
+
+def _evaluate_chunk(data, candidates):
+    return [evaluate_candidate(data, c) for c in candidates]
+
+
+def run_sweep(candidates, data, max_workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Evaluate candidates across a process pool. Results come back in candidate order.
+    The precomputed arrays are shared with the workers through shared memory
+    (backtest/parallel.py), so each task only carries its chunk of candidates.
+    Args:
+        candidates (list[dict]): Output of grid_search_space or random_search_space.
+        data (dict): Output of build_sweep_data.
+        max_workers (int): Pool size, defaults to the CPU count. Use 1 to run in-process.
+        chunk_size (int): Candidates per task.
+    Returns:
+        list[dict]: One result per candidate (see evaluate_candidate).
+    """
+    if max_workers == 1 or len(candidates) <= chunk_size:
+        return [evaluate_candidate(data, c) for c in candidates]
+    chunks = [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+    arrays, meta = _shared_sweep_arrays(data)
+    results = []
+    for chunk_results in map_shards(_evaluate_chunk, chunks, arrays, build=_sweep_state, meta=meta,
+                                    max_workers=max_workers):
+        results.extend(chunk_results)
+    return results
+
+
+def default_search_space(rule_set):
+    """A grid around the current config weights, DEFAULT_THRESHOLD_SPACE and the backtester's parameters."""
+    space = {
+        'bullish_threshold': [BULLISH_THRESHOLD - 0.25, BULLISH_THRESHOLD, BULLISH_THRESHOLD + 0.25],
+        'protection': list(PROTECTION_LEVELS),
+        'holding': list(HOLDING_PERIODS),
+    }
+    for strategy in rule_set.strategies:
+        space[f'weight:{strategy.name}'] = [max(strategy.weight - 3, 0), strategy.weight, strategy.weight + 3]
+    for key, values in DEFAULT_THRESHOLD_SPACE.items():
+        if parse_threshold_key(key)[0] in rule_set.names:
+            space[key] = list(values)
+    return space
+
+
+def write_sweep_results(results, out_csv):
+    fields = list(dict.fromkeys(k for r in results for k in r))
+    with open(out_csv, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(n_random=2000, seed=42):
+    config = load_config()
+    rule_set = compile_rules(config)
+    space = default_search_space(rule_set)
+    # The full grid is 3^(strategies + thresholds + 3) candidates, so sample it by default
+    if n_random:
+        candidates = random_search_space(space, n_random, seed=seed)
+    else:
+        candidates = grid_search_space(space)
+    panel = load_indicator_panel()
+    data = build_sweep_data(panel, rule_set, sorted(set(space['holding'])), candidates, config)
+    print(f"Evaluating {len(candidates)} candidates over {len(panel)} panel rows ...")
+    results = run_sweep(candidates, data)
+    results.sort(key=lambda r: (r['win_rate'], r['trades']), reverse=True)
+    out_csv = os.path.join(BACKTEST_DIR, 'sweep_results.csv')
+    write_sweep_results(results, out_csv)
+    for r in results[:10]:
+        print(json.dumps({k: (round(v, 4) if isinstance(v, float) else v) for k, v in r.items()}))
+    print(f"Sweep results written to {out_csv}")
+
+
+if __name__ == '__main__':
+    main(n_random=int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,187 @@
+# backtest/pipeline.py
+"""
+In-memory backtest: indicator panel -> signals -> trade outcomes, without per-date files.
+
+The file-based flow writes indicators_<date>.csv for every Monday, reads each one
+back to write bull_put_analysis_<date>.json, and reads those again in
+engine.main(). Here the same steps pass frames instead:
+
+  1. build_indicator_panel() computes every Monday's indicator rows into one
+     frame (date + INDICATOR_CSV_COLUMNS), from Alpaca history as
+     generate_all_indicators_csvs() does, or streamed from the bar store.
+  2. The strategy rules behind analyze_all_stocks() score the whole panel in one
+     RuleSet.evaluate() call; strongly bullish rows with a price are the entries.
+  3. engine.run_and_report() backtests them on a PricePanel of the same frame.
+
+The results match the file-based flow. The per-date files are debug output
+only: write_intermediate=True (WRITE_INTERMEDIATE_FILES in backtester.py)
+writes them with the same content as before.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import numpy as np
+import pandas as pd
+from backtest.backtester import (PROTECTION_LEVELS, HOLDING_PERIODS, BACKTEST_START, BACKTEST_END, BACKTEST_RESOLUTION,
+                                 USE_INTRADAY_LOWS, BACKTEST_WORKERS, SIMULATE_SPREAD_PNL, BOOTSTRAP_WIN_RATES,
+                                 INDICATOR_CSV_COLUMNS, compute_indicator_rows, get_all_mondays)
+from backtest.engine import PricePanel, run_and_report
+from strategy.bull_bear_indicator_analysis import analyze_frame, load_config
+from strategy.rule_engine import compile_rules
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+TEXT_COLUMNS = ('date', 'ticker', 'earnings_date', 'dividend_date', 'ex_dividend_date')
+EXIT_OFFSETS = (5, 10, 25)  # price_<n>d fields of bull_put_analysis_<date>.json
+ENTRY_SIGNAL = 'strongly bullish'
+
+
+def _numeric(panel):
+    # Same coercion as load_stock_data(): indicator columns as floats, NaN for missing values
+    for col in panel.columns:
+        if col not in TEXT_COLUMNS:
+            panel[col] = pd.to_numeric(panel[col], errors='coerce')
+    return panel
+
+
+def build_indicator_panel(mondays, tickers, source='alpaca'):
+    """
+    Indicator rows of every ticker on every rebalance date, in one frame.
+    Args:
+        mondays (list[datetime]): Rebalance dates (backtester.get_all_mondays).
+        tickers (list[str]): Universe.
+        source (str): 'alpaca' computes each date's 400-day window like generate_all_indicators_csvs();
+                      'bars' streams the local bar store once (walk_forward.stream_indicator_panel).
+    Returns:
+        pd.DataFrame: date ('YYYY-MM-DD') followed by the indicator columns, date-sorted.
+    """
+    if source == 'bars':
+        from backtest.bar_store import BarStore
+        from backtest.walk_forward import stream_indicator_panel
+        bars = BarStore().load(tickers)
+        panel = stream_indicator_panel(bars, [m.strftime('%Y-%m-%d') for m in mondays])
+        return _numeric(panel.drop(columns=['entry_session']))
+    frames = []
+    for monday in mondays:
+        rows = compute_indicator_rows(monday, tickers)
+        if rows:
+            frame = pd.DataFrame(rows, columns=INDICATOR_CSV_COLUMNS)
+            frame.insert(0, 'date', monday.strftime('%Y-%m-%d'))
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['date'] + INDICATOR_CSV_COLUMNS)
+    return _numeric(pd.concat(frames, ignore_index=True))
+
+
+def load_indicator_panel(csv_files):
+    """Stack indicators_YYYY-MM-DD.csv files into the frame build_indicator_panel() returns."""
+    frames = []
+    for csv_path in csv_files:
+        # Keep tickers such as 'NA' as strings
+        df = pd.read_csv(csv_path, dtype={'ticker': str}, keep_default_na=False, na_values=[''])
+        df.insert(0, 'date', os.path.basename(csv_path)[len('indicators_'):-len('.csv')])
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['date', 'ticker', 'current_price'])
+    return _numeric(pd.concat(frames, ignore_index=True))
+
+
+def panel_entries(panel, rule_set=None, signal_text=ENTRY_SIGNAL):
+    """
+    Rows of panel whose combined signal is signal_text and that have a price.
+    Returns:
+        pd.DataFrame: date, ticker, entry_price, combined_signal_value, combined_signal_text,
+                      in panel order (the layout of engine.load_entries).
+    """
+    rule_set = rule_set or compile_rules(load_config())
+    evaluation = rule_set.evaluate(panel)
+    text = np.asarray(evaluation['combined_text'], dtype=object)
+    price = pd.to_numeric(panel['current_price'], errors='coerce').to_numpy(dtype=float)
+    keep = (pd.Series(text).astype(str).str.lower().to_numpy() == signal_text) & ~np.isnan(price)
+    return pd.DataFrame({
+        'date': panel['date'].to_numpy(dtype=object)[keep],
+        'ticker': panel['ticker'].to_numpy(dtype=object)[keep],
+        'entry_price': price[keep],
+        'combined_signal_value': np.asarray(evaluation['combined_value'], dtype=float)[keep],
+        'combined_signal_text': text[keep],
+    })
+
+
+def _json_value(value):
+    return None if isinstance(value, float) and np.isnan(value) else value
+
+
+def write_indicator_csvs(panel, out_dir=BACKTEST_DIR):
+    """Debug output: one indicators_<date>.csv per date of panel."""
+    for date_str, group in panel.groupby('date', sort=True):
+        out_path = os.path.join(out_dir, f'indicators_{date_str}.csv')
+        group.drop(columns=['date']).to_csv(out_path, index=False)
+        print(f"Wrote indicators for {date_str} ({len(group)} tickers) at {out_path}")
+
+
+def write_analysis_files(panel, rule_set=None, out_dir=BACKTEST_DIR, exit_offsets=EXIT_OFFSETS):
+    """
+    Debug output: bull_put_analysis_<date>.json per date, the analyze_all_stocks() records
+    plus entry_price and price_<n>d (the price n rebalance dates later) for every ticker.
+    """
+    rule_set = rule_set or compile_rules(load_config())
+    prices = PricePanel.from_frame(panel)
+    for date_str, group in panel.groupby('date', sort=True):
+        results = analyze_frame(group, rule_set=rule_set, as_of=date_str)
+        date_idx = np.full(len(group), prices.date_positions([date_str])[0])
+        ticker_idx = prices.ticker_positions(group['ticker'])
+        later = {n: prices.price_after(date_idx, ticker_idx, n) for n in exit_offsets}
+        columns = {col: group[col].tolist() if col in group else [None] * len(group)
+                   for col in ('current_price', 'high_52w', 'low_52w')}
+        for i, analysis in enumerate(results):
+            for col, values in columns.items():
+                analysis[col] = _json_value(values[i])
+            analysis['entry_price'] = analysis['current_price']
+            for n in exit_offsets:
+                analysis[f'price_{n}d'] = _json_value(float(later[n][i]))
+        output_json = os.path.join(out_dir, f'bull_put_analysis_{date_str}.json')
+        with open(output_json, 'w') as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"Wrote {output_json} ({len(results)} tickers)")
+
+
+def run_pipeline(panel, protection_levels, holding_periods, out_csv=None, resolution='sample', use_lows=False,
+                 workers=1, rule_set=None, write_intermediate=False, bootstrap=None):
+    """
+    Signals and backtest results for an indicator panel, all in memory.
+    Returns:
+        tuple: (entries, result) where result is what engine.run_and_report() returns.
+    """
+    started = time.perf_counter()
+    rule_set = rule_set or compile_rules(load_config())
+    entries = panel_entries(panel, rule_set)
+    if write_intermediate:
+        write_indicator_csvs(panel)
+        write_analysis_files(panel, rule_set)
+    result = run_and_report(PricePanel.from_frame(panel), entries, protection_levels, holding_periods, out_csv,
+                            resolution, use_lows, workers, started, bootstrap)
+    return entries, result
+
+
+def main(source='alpaca', write_intermediate=False):
+    """In-memory equivalent of backtester.py's generate -> analyze -> main sequence."""
+    from utils.ticker_loader import load_tickers
+    started = time.perf_counter()
+    panel = build_indicator_panel(get_all_mondays(BACKTEST_START, BACKTEST_END), load_tickers(), source=source)
+    logger.info(f"Indicator panel of {len(panel)} rows built in {time.perf_counter() - started:.2f}s")
+    entries, result = run_pipeline(panel, PROTECTION_LEVELS, HOLDING_PERIODS, resolution=BACKTEST_RESOLUTION,
+                                   use_lows=USE_INTRADAY_LOWS, workers=BACKTEST_WORKERS,
+                                   write_intermediate=write_intermediate, bootstrap=BOOTSTRAP_WIN_RATES)
+    if SIMULATE_SPREAD_PNL:
+        from backtest.spread_pnl import main as run_spread_pnl
+        run_spread_pnl(PROTECTION_LEVELS, HOLDING_PERIODS, entries=entries)
+    return result
+
+
+if __name__ == '__main__':
+    main()
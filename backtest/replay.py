@@ -0,0 +1,269 @@
+# backtest/replay.py
+"""
+Replay the trade generator's recommendations against stored option chains.
+
+Every spread / condor / strangle in output/bull_bear_trades_out/bull_bear_trades_<date>.json
+is opened at its recommended credit on <date> and re-marked at every session
+after that until expiration (or the last stored day):
+
+  1. Trades become legs (option type, strike, +1 long / -1 short), and legs x
+     sessions become mark requests.
+  2. Requests are grouped by (underlying, date); each group loads that day's
+     quotes from the chain store once (only the expirations it needs) and is
+     matched to them with one merge.
+  3. A leg is marked at the bid/ask mid. Without a two-sided quote it is
+     priced with Black-Scholes from the day's underlying price and the
+     contract's implied volatility (the quote's, else the leg's nearest known
+     one, else FALLBACK_IV). On the expiration date legs are worth intrinsic value.
+  4. The underlying price of a day is the chain snapshot's, else that
+     session's close from the bar store. Only when neither exists is the last
+     known price carried forward, and marks priced from it are labelled 'stale'.
+
+The P&L of a trade on a day is (entry credit - cost to close) per contract.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glob
+import json
+import time
+import numpy as np
+import pandas as pd
+from backtest.bar_store import BarStore
+from trade_generator.chain_store import ChainStore
+from trade_generator.greeks import bs_price
+from utils.trading_calendar import nyse_calendar, to_days
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRADES_DIR = os.path.join(PROJECT_ROOT, 'output/bull_bear_trades_out')
+RISK_FREE_RATE = 5.0  # percent
+FALLBACK_IV = 0.30  # for legs never seen with an implied volatility
+SPREAD_KEYS = ('bull_put_spreads', 'bear_call_spreads', 'iron_condors', 'short_strangles')
+# (option type, record field, quantity) per strategy; -1 is a short leg
+STRATEGY_LEGS = {
+    'Bull Put': [('put', 'short_strike', -1), ('put', 'long_strike', 1)],
+    'Bear Call': [('call', 'short_strike', -1), ('call', 'long_strike', 1)],
+    'Iron Condor': [('put', 'put_short_strike', -1), ('put', 'put_long_strike', 1),
+                    ('call', 'call_short_strike', -1), ('call', 'call_long_strike', 1)],
+    'Short Strangle': [('put', 'put_short_strike', -1), ('call', 'call_short_strike', -1)],
+}
+TRADE_COLUMNS = ['trade_id', 'trade_date', 'ticker', 'strategy', 'expiration', 'credit', 'max_loss', 'current_price']
+QUOTE_FIELDS = ['bid', 'ask', 'lastPrice', 'impliedVolatility', 'underlying_price']
+SUMMARY_COLUMNS = [
+    'trade_id', 'trade_date', 'ticker', 'strategy', 'expiration', 'credit', 'max_loss', 'last_date', 'expired',
+    'pnl', 'return_on_risk', 'worst_pnl', 'days_marked', 'quoted_share', 'stale_days'
+]
+
+
+def load_trade_files(trades_dir=TRADES_DIR, start=None, end=None):
+    """
+    Trades and legs from every bull_bear_trades_<date>.json with start <= date <= end.
+    Returns:
+        tuple: (trades with TRADE_COLUMNS, legs with trade_id, option_type, strike, quantity)
+    """
+    trades, legs = [], []
+    for path in sorted(glob.glob(os.path.join(trades_dir, 'bull_bear_trades_????-??-??.json'))):
+        trade_date = os.path.basename(path)[len('bull_bear_trades_'):-len('.json')]
+        if (start and trade_date < start) or (end and trade_date > end):
+            continue
+        with open(path, 'r') as f:
+            results = json.load(f)
+        for result in results:
+            for key in SPREAD_KEYS:
+                for record in result.get(key, []):
+                    strategy_legs = STRATEGY_LEGS.get(record.get('strategy'))
+                    if not strategy_legs:
+                        continue
+                    trade_id = len(trades)
+                    trades.append({
+                        'trade_id': trade_id,
+                        'trade_date': trade_date,
+                        'ticker': (record.get('ticker') or result['ticker']).upper(),
+                        'strategy': record['strategy'],
+                        'expiration': record.get('expiration') or result['expiration'],
+                        'credit': (record.get('max_profit') or 0.0) / 100,
+                        'max_loss': record.get('max_loss') if record.get('max_loss') is not None else record.get('margin'),
+                        'current_price': record.get('current_price', result.get('current_price')),
+                    })
+                    for option_type, field, quantity in strategy_legs:
+                        if record.get(field) is not None:
+                            legs.append({'trade_id': trade_id, 'option_type': option_type,
+                                         'strike': float(record[field]), 'quantity': quantity})
+    return (pd.DataFrame(trades, columns=TRADE_COLUMNS),
+            pd.DataFrame(legs, columns=['trade_id', 'option_type', 'strike', 'quantity']))
+
+
+def mark_requests(trades, legs, as_of=None, calendar=None):
+    """
+    One row per (leg, session) from each trade's date through its expiration (or as_of).
+    Returns:
+        pd.DataFrame: trade_id, ticker, expiration, option_type, strike, quantity, date.
+    """
+    calendar = calendar or nyse_calendar()
+    if trades.empty:
+        return pd.DataFrame(columns=['trade_id', 'ticker', 'expiration', 'option_type', 'strike', 'quantity', 'date'])
+    last = to_days(trades['expiration'].tolist())
+    if as_of is not None:
+        last = np.minimum(last, to_days(as_of)[0])
+    first_pos = calendar.positions(trades['trade_date'].tolist(), roll='forward')
+    last_pos = calendar.positions(last, roll='backward')
+    counts = np.maximum(last_pos - first_pos + 1, 0)
+    # Ragged expansion: session positions first_pos..last_pos for every trade
+    rows = np.repeat(np.arange(len(trades)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    sessions = pd.DataFrame({
+        'trade_id': trades['trade_id'].to_numpy()[rows],
+        'date': np.datetime_as_string(calendar.sessions[first_pos[rows] + offsets], unit='D'),
+    })
+    requests = sessions.merge(legs, on='trade_id')
+    requests = requests.merge(trades[['trade_id', 'ticker', 'expiration']], on='trade_id')
+    return requests[['trade_id', 'ticker', 'expiration', 'option_type', 'strike', 'quantity', 'date']]
+
+
+def fetch_quotes(requests, store):
+    """
+    Quotes for every request, read once per (ticker, date) from the chain store.
+    Returns:
+        pd.DataFrame: requests plus bid, ask, lastPrice, impliedVolatility and underlying_price
+                      (NaN where the store has no matching contract or day).
+    """
+    matched = []
+    keys = ['expiration', 'option_type', 'strike']
+    for (ticker, date_str), group in requests.groupby(['ticker', 'date'], sort=False):
+        quotes = store.load(ticker, date_str, expirations=sorted(group['expiration'].unique()))
+        if quotes.empty:
+            matched.append(group)
+            continue
+        # Strikes are matched after rounding, as trade files store them to the cent
+        quotes = quotes.assign(strike=quotes['strike'].round(2)).drop_duplicates(keys, keep='last')
+        underlying = quotes['underlying_price'].dropna()
+        group = group.assign(strike=group['strike'].round(2))
+        merged = group.merge(quotes.drop(columns=['underlying_price']), on=keys, how='left')
+        merged['underlying_price'] = underlying.iloc[0] if len(underlying) else np.nan
+        matched.append(merged)
+    quoted = pd.concat(matched, ignore_index=True) if matched else requests
+    return quoted.reindex(columns=list(requests.columns) + QUOTE_FIELDS)
+
+
+def mark_legs(quoted, bars=None, r=RISK_FREE_RATE):
+    """
+    Mark every leg on every day: quote mid, else Black-Scholes, intrinsic on expiration day.
+    Args:
+        quoted (pd.DataFrame): Output of fetch_quotes.
+        bars (DailyBars): Closes for the days the chain store has no underlying price.
+        r (float): Risk-free rate in percent.
+    Returns:
+        pd.DataFrame: quoted sorted by trade, leg and date, plus spot, spot_source ('chain', 'bars',
+                      'carried' or None), mark and source ('quote', 'model', 'expiry', 'stale' for
+                      model or expiry marks from a carried spot, or None when no price could be set).
+    """
+    leg_keys = ['trade_id', 'option_type', 'strike', 'quantity']
+    marks = quoted.sort_values(leg_keys + ['date'], kind='stable').reset_index(drop=True)
+    chain_spot = marks['underlying_price'].to_numpy(dtype=float)
+    close = np.full(len(marks), np.nan)
+    if bars is not None:
+        days = to_days(marks['date'].tolist())
+        pos = bars.session_positions(days)
+        ticker_idx = bars.ticker_positions(marks['ticker'])
+        ok = (pos >= 0) & (ticker_idx >= 0)
+        # Only the bar of that very session; an earlier close is no better than a carried spot
+        ok[ok] = bars.sessions[pos[ok]] == days[ok]
+        close[ok] = bars.close[pos[ok], ticker_idx[ok]]
+    spot = np.where(np.isnan(chain_spot), close, chain_spot)
+    by_leg = [marks[k] for k in leg_keys]
+    marks['spot'] = pd.Series(spot).groupby(by_leg).ffill().to_numpy()
+    spot_source = np.where(~np.isnan(chain_spot), 'chain', np.where(~np.isnan(close), 'bars', 'carried')).astype(object)
+    spot_source[marks['spot'].isna().to_numpy()] = None
+    marks['spot_source'] = spot_source
+    iv = marks['impliedVolatility'].where(marks['impliedVolatility'] > 0)
+    iv = iv.groupby(by_leg).ffill().groupby(by_leg).bfill().fillna(FALLBACK_IV)
+
+    bid, ask = marks['bid'].to_numpy(dtype=float), marks['ask'].to_numpy(dtype=float)
+    two_sided = (bid > 0) & (ask > 0) & (ask >= bid)
+    days = (to_days(marks['expiration'].tolist()) - to_days(marks['date'].tolist())).astype(float)
+    model = bs_price(marks['spot'].to_numpy(dtype=float), marks['strike'].to_numpy(dtype=float), days, r,
+                     iv.to_numpy(dtype=float), marks['option_type'].to_numpy())
+    expiry = days <= 0
+    mark = np.where(expiry, model, np.where(two_sided, (bid + ask) / 2, model))
+    source = np.where(expiry, 'expiry', np.where(two_sided, 'quote', 'model')).astype(object)
+    source[(source != 'quote') & (spot_source == 'carried')] = 'stale'
+    source[np.isnan(mark)] = None
+    marks['mark'] = mark
+    marks['source'] = source
+    return marks
+
+
+def trade_pnl(marks, trades):
+    """
+    Daily P&L per trade (dollars per contract): (credit + sum(quantity x mark)) x 100.
+    Returns:
+        pd.DataFrame: trade_id, date, value (cost to close), pnl, quoted (all legs quoted),
+                      stale (some leg priced from a carried spot).
+    """
+    marks = marks.assign(signed=marks['quantity'] * marks['mark'], is_quote=marks['source'] == 'quote',
+                         is_stale=marks['source'] == 'stale')
+    daily = marks.groupby(['trade_id', 'date'], sort=True).agg(
+        signed=('signed', lambda v: v.sum(min_count=len(v))), quoted=('is_quote', 'all'),
+        stale=('is_stale', 'any')).reset_index()
+    credit = daily['trade_id'].map(trades.set_index('trade_id')['credit'])
+    daily['value'] = -daily.pop('signed')
+    daily['pnl'] = (credit - daily['value']) * 100
+    return daily
+
+
+def summarize_replay(daily, trades):
+    """Last mark, worst mark and quote coverage per trade (SUMMARY_COLUMNS)."""
+    marked = daily.dropna(subset=['pnl'])
+    grouped = marked.groupby('trade_id', sort=True)
+    stats = grouped.agg(last_date=('date', 'last'), pnl=('pnl', 'last'), worst_pnl=('pnl', 'min'),
+                        days_marked=('pnl', 'size'), quoted_share=('quoted', 'mean'),
+                        stale_days=('stale', 'sum')).reset_index()
+    summary = trades.merge(stats, on='trade_id', how='left')
+    summary['expired'] = summary['last_date'] >= summary['expiration']
+    max_loss = pd.to_numeric(summary['max_loss'], errors='coerce')
+    summary['return_on_risk'] = summary['pnl'] / max_loss.where(max_loss > 0)
+    return summary[SUMMARY_COLUMNS]
+
+
+def replay(trades_dir=TRADES_DIR, store=None, bars=None, start=None, end=None, as_of=None, bar_store=None):
+    """
+    Re-mark every stored recommendation.
+    Args:
+        bars (DailyBars): Underlying closes; if None and bar_store is given, loaded from it
+                          for the traded tickers.
+    Returns:
+        tuple: (per-trade summary, daily P&L per trade, leg marks)
+    """
+    store = store or ChainStore()
+    trades, legs = load_trade_files(trades_dir, start, end)
+    if bars is None and bar_store is not None:
+        bars = bar_store.load(sorted(trades['ticker'].unique()))
+    requests = mark_requests(trades, legs, as_of=as_of)
+    marks = mark_legs(fetch_quotes(requests, store), bars=bars)
+    daily = trade_pnl(marks, trades)
+    return summarize_replay(daily, trades), daily, marks
+
+
+def main(start=None, end=None):
+    """Replay all trade files; writes trade_replay_<today>.csv next to them and prints totals by strategy."""
+    started = time.perf_counter()
+    summary, daily, marks = replay(start=start, end=end, as_of=np.datetime64('today', 'D'), bar_store=BarStore())
+    out_path = os.path.join(TRADES_DIR, f"trade_replay_{np.datetime64('today', 'D')}.csv")
+    summary.to_csv(out_path, index=False)
+    by_strategy = summary.dropna(subset=['pnl']).groupby('strategy')
+    for strategy, group in by_strategy:
+        print(f"{strategy}: {len(group)} trades, P&L ${group['pnl'].sum():,.2f}, "
+              f"win rate {(group['pnl'] > 0).mean():.2%}, quoted marks {group['quoted_share'].mean():.0%}")
+    quoted = (marks['source'] == 'quote').mean() if len(marks) else 0.0
+    stale = (marks['source'] == 'stale').mean() if len(marks) else 0.0
+    logger.info(f"Replayed {len(summary)} trades ({len(marks)} leg marks, {quoted:.0%} quoted, {stale:.0%} stale) "
+                f"into {out_path} in {time.perf_counter() - started:.2f}s")
+    return summary
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+# backtest/spread_pnl.py
+"""
+Option-priced P&L for the backtest's hypothetical bull put spreads.
+
+Every entry becomes, for each (protection, holding, width) configuration, a
+put spread with the short strike protection below the entry price and the long
+strike width_pct of the entry price further down, expiring at the close of the
+exit session (holding trading days later) unless expiry_days says otherwise:
+
+  - the credit is the Black-Scholes value of short minus long put at entry;
+  - the exit debit is the spread's value at the exit session: intrinsic at
+    expiry, Black-Scholes with the remaining calendar days before it;
+  - volatility is the trailing realized volatility of the underlying
+    (HV_WINDOW sessions, annualized), or the entry's stored 'iv' where present.
+
+All (entry x configuration) spreads are priced in a few array calls to
+trade_generator.greeks.bs_price. summarize_pnl() reports P&L, return on risk
+and the max drawdown of the cumulative P&L (ordered by exit date) per
+configuration.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import numpy as np
+import pandas as pd
+from backtest.backtester import PROTECTION_LEVELS, HOLDING_PERIODS, BACKTEST_START, BACKTEST_END
+from trade_generator.greeks import bs_price
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+RISK_FREE_RATE = 5.0  # percent, as in bull_bear_credit_trades
+HV_WINDOW = 20  # sessions of log returns behind the historical volatility
+TRADING_DAYS_PER_YEAR = 252
+SPREAD_WIDTH_PCTS = [0.025, 0.05]  # long strike distance below the short strike, as a fraction of entry
+MIN_CREDIT = 0.01  # spreads priced below this are not traded
+PNL_COLUMNS = [
+    'date', 'ticker', 'entry_price', 'exit_date', 'exit_price', 'protection', 'holding_days', 'width_pct',
+    'short_strike', 'long_strike', 'expiry_days', 'entry_vol', 'exit_vol', 'credit', 'exit_debit',
+    'pnl', 'max_loss', 'return_on_risk'
+]
+CONFIG_COLUMNS = ['protection', 'holding_days', 'width_pct']
+SUMMARY_COLUMNS = [
+    'trades', 'win_rate', 'total_pnl', 'avg_pnl', 'avg_return_on_risk', 'return_on_risk', 'worst_pnl', 'max_drawdown'
+]
+TEXT_COLUMNS = ('date', 'ticker', 'exit_date')
+
+
+def historical_volatility(bars, window=HV_WINDOW):
+    """
+    Annualized realized volatility of daily log returns over the trailing window, as a
+    (session x ticker) matrix; NaN until two thirds of the window has returns.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_returns = np.diff(np.log(bars.close), axis=0, prepend=np.nan)
+    rolling = pd.DataFrame(log_returns).rolling(window, min_periods=max(2, window * 2 // 3)).std()
+    return rolling.to_numpy() * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+
+def simulate_spread_pnl(bars, entries, protection_levels, holding_periods, width_pcts=None, r=RISK_FREE_RATE,
+                        expiry_days=None, hv=None):
+    """
+    Price every (entry, protection, holding, width) put spread at entry and exit.
+    Args:
+        bars (DailyBars): Session-aligned bars (exit prices and historical volatility).
+        entries (pd.DataFrame): date, ticker, entry_price and optionally iv (decimal); the entry
+                                is at the close of the last session before its date.
+        protection_levels (list[float]): Short strike distances below entry.
+        holding_periods (list[int]): Sessions held.
+        width_pcts (list[float]): Spread widths as fractions of the entry price.
+        r (float): Risk-free rate in percent.
+        expiry_days (int): Calendar days from entry to expiry; None expires at the exit session.
+        hv (np.ndarray): Precomputed historical_volatility(bars), to share across calls.
+    Returns:
+        pd.DataFrame: PNL_COLUMNS, one row per entry and configuration (entry, then protection,
+                      holding, width). Dollar columns are per contract (x100); trades without
+                      a price, volatility or minimum credit have NaN pnl.
+    """
+    width_pcts = SPREAD_WIDTH_PCTS if width_pcts is None else width_pcts
+    n_entries = len(entries)
+    shape = (n_entries, len(protection_levels), len(holding_periods), len(width_pcts))
+    if n_entries == 0 or 0 in shape:
+        # Typed like a non-empty result, so summarize_pnl and CSV readers see the same columns
+        return pd.DataFrame({c: pd.Series(dtype=object if c in TEXT_COLUMNS else float) for c in PNL_COLUMNS})
+    hv = historical_volatility(bars) if hv is None else hv
+    start = bars.entry_positions(entries['date'])
+    ticker_idx = bars.ticker_positions(entries['ticker'])
+    entry = entries['entry_price'].to_numpy(dtype=float)
+    known = (start >= 0) & (ticker_idx >= 0)
+    entry_vol = np.where(known, hv[np.maximum(start, 0), np.maximum(ticker_idx, 0)], np.nan)
+    if 'iv' in entries:
+        stored = pd.to_numeric(entries['iv'], errors='coerce').to_numpy(dtype=float)
+        entry_vol = np.where(np.isnan(stored), entry_vol, stored)
+
+    # Exit session, price and volatility per (entry, holding)
+    hold = np.asarray(holding_periods, dtype=int)
+    exit_pos = start[:, None] + hold[None, :]
+    on_bars = known[:, None] & (exit_pos < len(bars.sessions))
+    safe_pos = np.where(on_bars, exit_pos, 0)
+    safe_ticker = np.maximum(ticker_idx, 0)[:, None]
+    exit_price = np.where(on_bars, bars.close[safe_pos, safe_ticker], np.nan)
+    exit_vol = np.where(on_bars, hv[safe_pos, safe_ticker], np.nan)
+    entry_day = bars.sessions[np.maximum(start, 0)]
+    held_days = (bars.sessions[safe_pos] - entry_day[:, None]).astype(int)
+    total_days = held_days if expiry_days is None else np.maximum(held_days, expiry_days)
+    remaining = total_days - held_days
+    total_days = np.where(on_bars, total_days, np.nan)
+
+    # (entry, protection, holding, width) grids
+    expand = lambda a, axes: np.broadcast_to(np.expand_dims(a, axes), shape)
+    protection = np.asarray(protection_levels, dtype=float)
+    widths = np.asarray(width_pcts, dtype=float)
+    S0 = expand(entry, (1, 2, 3))
+    short_strike = S0 * (1 - expand(protection, (0, 2, 3)))
+    long_strike = short_strike - S0 * expand(widths, (0, 1, 2))
+    T0 = expand(total_days, (1, 3)).astype(float)
+    sigma0 = expand(entry_vol, (1, 2, 3))
+    credit = bs_price(S0, short_strike, T0, r, sigma0, 'put') - bs_price(S0, long_strike, T0, r, sigma0, 'put')
+    S1 = expand(exit_price, (1, 3))
+    T1 = expand(remaining, (1, 3)).astype(float)
+    sigma1 = expand(exit_vol, (1, 3))
+    sigma1 = np.where(np.isnan(sigma1), sigma0, sigma1)  # intrinsic at expiry needs no volatility
+    exit_debit = bs_price(S1, short_strike, T1, r, sigma1, 'put') - bs_price(S1, long_strike, T1, r, sigma1, 'put')
+
+    width = short_strike - long_strike
+    traded = np.isfinite(credit) & (credit >= MIN_CREDIT) & np.isfinite(exit_debit)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pnl = np.where(traded, (credit - exit_debit) * 100, np.nan)
+        max_loss = np.where(traded, (width - credit) * 100, np.nan)
+        return_on_risk = pnl / max_loss
+
+    repeat = lambda values: np.repeat(np.asarray(values, dtype=object), np.prod(shape[1:]))
+    exit_dates = np.where(on_bars, bars.sessions[safe_pos], np.datetime64('NaT', 'D'))
+    exit_strings = np.datetime_as_string(exit_dates, unit='D').astype(object)
+    exit_strings[np.isnat(exit_dates)] = None
+    ravel = lambda a: np.asarray(a).ravel()
+    return pd.DataFrame({
+        'date': repeat(entries['date']),
+        'ticker': repeat(entries['ticker']),
+        'entry_price': ravel(S0),
+        'exit_date': ravel(np.broadcast_to(exit_strings[:, None, :, None], shape)),
+        'exit_price': ravel(S1),
+        'protection': ravel(expand(protection, (0, 2, 3))),
+        'holding_days': ravel(expand(hold, (0, 1, 3))),
+        'width_pct': ravel(expand(widths, (0, 1, 2))),
+        'short_strike': ravel(short_strike),
+        'long_strike': ravel(long_strike),
+        'expiry_days': ravel(T0),
+        'entry_vol': ravel(sigma0),
+        'exit_vol': ravel(expand(exit_vol, (1, 3))),
+        'credit': ravel(credit),
+        'exit_debit': ravel(exit_debit),
+        'pnl': ravel(pnl),
+        'max_loss': ravel(max_loss),
+        'return_on_risk': ravel(return_on_risk),
+    })
+
+
+def summarize_pnl(trades):
+    """
+    Per-configuration results of simulate_spread_pnl, over the trades with a P&L.
+    Returns:
+        pd.DataFrame: CONFIG_COLUMNS + SUMMARY_COLUMNS. return_on_risk is total P&L / total
+                      max loss; max_drawdown is the largest fall of cumulative P&L from its
+                      peak, trades ordered by exit date.
+    """
+    done = trades[trades['pnl'].notna()].sort_values(CONFIG_COLUMNS + ['exit_date', 'date', 'ticker'], kind='stable')
+    if done.empty:
+        return pd.DataFrame(columns=CONFIG_COLUMNS + SUMMARY_COLUMNS)
+    grouped = done.groupby(CONFIG_COLUMNS, sort=True)
+    equity = grouped['pnl'].cumsum()
+    drawdown = equity - equity.groupby([done[c] for c in CONFIG_COLUMNS]).cummax().clip(lower=0)
+    summary = grouped.agg(
+        trades=('pnl', 'size'),
+        wins=('pnl', lambda p: int((p > 0).sum())),
+        total_pnl=('pnl', 'sum'),
+        avg_pnl=('pnl', 'mean'),
+        avg_return_on_risk=('return_on_risk', 'mean'),
+        total_max_loss=('max_loss', 'sum'),
+        worst_pnl=('pnl', 'min'),
+    ).reset_index()
+    summary['win_rate'] = summary['wins'] / summary['trades']
+    summary['return_on_risk'] = summary['total_pnl'] / summary['total_max_loss']
+    summary['max_drawdown'] = (-drawdown.groupby([done[c] for c in CONFIG_COLUMNS]).min()).clip(lower=0).to_numpy()
+    return summary[CONFIG_COLUMNS + SUMMARY_COLUMNS]
+
+
+def main(protection_levels=None, holding_periods=None, width_pcts=None, out_csv=None, entries=None):
+    """
+    Price the backtest's strongly bullish entries as put spreads; writes backtest_spread_pnl.csv.
+    entries defaults to those of the bull_put_analysis_<date>.json files (pipeline.py passes its own).
+    """
+    from backtest.bar_store import BarStore
+    from backtest.engine import load_entries
+    from utils.trading_calendar import nyse_calendar
+    started = time.perf_counter()
+    if entries is None:
+        mondays = [str(d) for d in nyse_calendar().weekdays(BACKTEST_START, BACKTEST_END, weekday=0)]
+        entries = load_entries(mondays)
+    bars = BarStore().load(sorted(set(entries['ticker'])) if len(entries) else [])
+    trades = simulate_spread_pnl(bars, entries, protection_levels or PROTECTION_LEVELS,
+                                 holding_periods or HOLDING_PERIODS, width_pcts)
+    out_csv = out_csv or os.path.join(BACKTEST_DIR, 'backtest_spread_pnl.csv')
+    trades.to_csv(out_csv, index=False)
+    summary = summarize_pnl(trades)
+    summary.to_csv(out_csv.replace('.csv', '_summary.csv'), index=False)
+    for row in summary.itertuples(index=False):
+        print(f"Protection: {int(row.protection*100)}%, Holding: {row.holding_days}d, Width: {row.width_pct:.1%} => "
+              f"P&L: ${row.total_pnl:,.0f} over {row.trades} trades, win rate {row.win_rate:.2%}, "
+              f"return on risk {row.return_on_risk:.2%}, max drawdown ${row.max_drawdown:,.0f}")
+    logger.info(f"Spread P&L for {len(entries)} entries written to {out_csv} in {time.perf_counter() - started:.2f}s")
+    return trades, summary
+
+
+if __name__ == '__main__':
+    main()
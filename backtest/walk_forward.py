@@ -0,0 +1,239 @@
+# backtest/walk_forward.py
+"""
+Walk-forward backtest over any date range, straight from the daily bar store.
+
+  1. Indicators are streamed: IndicatorState (indicators/incremental.py) is
+     advanced once per session for the whole universe and snapshotted on each
+     rebalance date, instead of refetching and recomputing a 400-day window per
+     ticker and date. The snapshot for a rebalance date uses the bars before it,
+     like the indicators_YYYY-MM-DD.csv files.
+  2. The strategy rules score the snapshot panel once (strategy/rule_engine.py).
+  3. Exits and the lowest close while holding come from the session matrix, so
+     holding periods are true trading days.
+  4. Rolling windows of in_sample_weeks rebalances calibrate the bullish
+     threshold (best win rate with at least min_trades trades) separately for
+     each (protection, holding) pair, using only trades that exited before the
+     out-of-sample window starts; the chosen threshold is then scored on the
+     following out_of_sample_weeks rebalances. Windows advance by the
+     out-of-sample length, so every out-of-sample week is scored exactly once.
+
+Fill the bar store first, e.g. BarStore().update(load_tickers(), start, end).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+import numpy as np
+import pandas as pd
+from indicators.incremental import IndicatorState, SNAPSHOT_COLUMNS
+from backtest.backtester import PROTECTION_LEVELS, HOLDING_PERIODS
+from backtest.bar_store import BarStore
+from backtest.param_sweep import evaluate_candidate
+from strategy.bull_bear_indicator_analysis import load_config
+from strategy.rule_engine import compile_rules, RuleSet
+from utils.ticker_loader import load_tickers
+from utils.trading_calendar import nyse_calendar, to_days
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKTEST_DIR = os.path.dirname(os.path.abspath(__file__))
+WALK_FORWARD = {
+    'start': '2015-01-01',
+    'end': '2024-12-31',
+    'rebalance_weekday': 0,       # Monday (the next session when it is a holiday)
+    'in_sample_weeks': 104,
+    'out_of_sample_weeks': 26,
+    'thresholds': [0.0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 2.0],
+    'min_trades': 30,             # in-sample trades a threshold needs to be eligible
+}
+WINDOW_COLUMNS = [
+    'in_sample_start', 'in_sample_end', 'out_of_sample_start', 'out_of_sample_end', 'protection', 'holding',
+    'bullish_threshold', 'in_sample_trades', 'in_sample_win_rate', 'trades', 'wins', 'win_rate',
+    'breach_rate', 'touch_rate', 'avg_pct_move'
+]
+
+
+def stream_indicator_panel(bars, rebalance_dates):
+    """
+    Indicator snapshots of every ticker on each rebalance date, streaming the bars once.
+    Args:
+        bars (DailyBars): Session-aligned bars, starting early enough to warm up the indicators.
+        rebalance_dates (array-like): Rebalance dates (sorted).
+    Returns:
+        pd.DataFrame: date, ticker, SNAPSHOT_COLUMNS and entry_session (index of the last
+                      session before the date, where current_price was set), one row per
+                      ticker that has a price.
+    """
+    rebalance = to_days(rebalance_dates)
+    # Session index each rebalance date is snapshotted before
+    cut = np.searchsorted(bars.sessions, rebalance, side='left')
+    state = IndicatorState(len(bars.tickers))
+    tickers = np.array(bars.tickers, dtype=object)
+    frames = []
+    next_rebalance = 0
+    for i in range(len(bars.sessions) + 1):
+        while next_rebalance < len(cut) and cut[next_rebalance] == i:
+            values = state.snapshot()
+            has_price = ~np.isnan(values['current_price'])
+            frame = pd.DataFrame({col: values[col][has_price] for col in SNAPSHOT_COLUMNS})
+            frame.insert(0, 'ticker', tickers[has_price])
+            frame.insert(0, 'date', str(rebalance[next_rebalance]))
+            frame['entry_session'] = i - 1
+            frames.append(frame)
+            next_rebalance += 1
+        if next_rebalance == len(cut) or i == len(bars.sessions):
+            break
+        state.update(bars.close[i], bars.high[i], bars.low[i])
+    if not frames:
+        return pd.DataFrame(columns=['date', 'ticker'] + SNAPSHOT_COLUMNS + ['entry_session'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_walk_forward_data(panel, bars, rule_set, holding_periods):
+    """
+    Scores and session-accurate outcomes for every panel row, in the layout of
+    param_sweep.build_sweep_data (so evaluate_candidate applies), plus 'date' and
+    'exit_date' ({h: exit session}, NaT past the end of the bars).
+    """
+    evaluation = rule_set.evaluate(panel)
+    start = panel['entry_session'].to_numpy(dtype=int)
+    ticker_idx = bars.ticker_positions(panel['ticker'])
+    window = bars.forward_window(start, ticker_idx, max(holding_periods))
+    running_min = np.fmin.accumulate(window, axis=1)
+    n_sessions = len(bars.sessions)
+    exit_date = {}
+    for h in holding_periods:
+        pos = start + h
+        exit_date[h] = np.where((start >= 0) & (pos < n_sessions), bars.sessions[np.clip(pos, 0, n_sessions - 1)],
+                                np.datetime64('NaT', 'D'))
+    return {
+        'date': panel['date'].to_numpy(),
+        'scores': evaluation['scores'],
+        'available': evaluation['available'],
+        'strategy_names': rule_set.names,
+        'default_weights': rule_set.weights,
+        'entry': panel['current_price'].to_numpy(dtype=float),
+        'exit': {h: window[:, h - 1] for h in holding_periods},
+        'path_min': {h: running_min[:, h - 1] for h in holding_periods},
+        'exit_date': exit_date,
+    }
+
+
+def _subset(data, rows):
+    subset = {key: data[key] for key in ('available', 'strategy_names', 'default_weights')}
+    for key in ('date', 'scores', 'entry'):
+        subset[key] = data[key][rows]
+    for key in ('exit', 'path_min', 'exit_date'):
+        subset[key] = {h: values[rows] for h, values in data[key].items()}
+    return subset
+
+
+def walk_forward_windows(dates, in_sample, out_of_sample):
+    """
+    Rolling (in-sample, out-of-sample) windows over sorted rebalance dates.
+    Returns:
+        list[tuple]: (in-sample dates, out-of-sample dates) arrays; the last out-of-sample
+                     window may be shorter.
+    """
+    dates = np.asarray(dates)
+    return [(dates[s - in_sample:s], dates[s:s + out_of_sample])
+            for s in range(in_sample, len(dates), out_of_sample)]
+
+
+def calibrate_threshold(data, protection, holding, thresholds, min_trades):
+    """
+    The threshold with the best in-sample win rate (ties: more trades) among those
+    trading at least min_trades times, or None if none does. All thresholds are
+    scored at once from the combined signal computed with the default weights.
+    Returns:
+        dict or None: evaluate_candidate result for the chosen threshold.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    combined = RuleSet.combine_scores(data['scores'], data['default_weights'], data['available'])
+    entry, exit_price = data['entry'], data['exit'][holding]
+    valid = ~np.isnan(entry) & ~np.isnan(exit_price)
+    lost = exit_price < entry * (1 - protection)
+    traded = (combined[:, None] >= thresholds[None, :]) & valid[:, None]
+    trades = traded.sum(axis=0)
+    wins = trades - (traded & lost[:, None]).sum(axis=0)
+    eligible = np.flatnonzero(trades >= max(min_trades, 1))
+    if eligible.size == 0:
+        return None
+    win_rate = wins[eligible] / trades[eligible]
+    # Best win rate, then most trades, then the first listed threshold
+    best = eligible[np.lexsort((-trades[eligible], -win_rate))[0]]
+    return evaluate_candidate(data, {'bullish_threshold': thresholds[best].item(), 'protection': protection,
+                                     'holding': holding})
+
+
+def run_walk_forward(data, protection_levels, holding_periods, settings=None):
+    """
+    Calibrate in-sample, score out-of-sample, for every window and (protection, holding) pair.
+    Args:
+        data (dict): Output of build_walk_forward_data (rows sorted by date).
+        settings (dict): Overrides for WALK_FORWARD.
+    Returns:
+        pd.DataFrame: WINDOW_COLUMNS, one row per window and pair with an eligible threshold.
+    """
+    settings = {**WALK_FORWARD, **(settings or {})}
+    dates = data['date']
+    rows = []
+    for in_dates, out_dates in walk_forward_windows(np.unique(dates), settings['in_sample_weeks'], settings['out_of_sample_weeks']):
+        in_rows = np.arange(np.searchsorted(dates, in_dates[0]), np.searchsorted(dates, in_dates[-1], side='right'))
+        out_of_sample = _subset(data, slice(np.searchsorted(dates, out_dates[0]), np.searchsorted(dates, out_dates[-1], side='right')))
+        for holding in holding_periods:
+            # No look-ahead: in-sample trades still open when the out-of-sample window starts are left out
+            settled = data['exit_date'][holding][in_rows] < to_days(out_dates[0])[0]
+            in_sample = _subset(data, in_rows[settled])
+            for protection in protection_levels:
+                chosen = calibrate_threshold(in_sample, protection, holding, settings['thresholds'], settings['min_trades'])
+                if chosen is None:
+                    continue
+                scored = evaluate_candidate(out_of_sample, {
+                    'bullish_threshold': chosen['bullish_threshold'], 'protection': protection, 'holding': holding})
+                rows.append({
+                    'in_sample_start': in_dates[0], 'in_sample_end': in_dates[-1],
+                    'out_of_sample_start': out_dates[0], 'out_of_sample_end': out_dates[-1],
+                    'protection': protection, 'holding': holding,
+                    'bullish_threshold': chosen['bullish_threshold'],
+                    'in_sample_trades': chosen['trades'], 'in_sample_win_rate': chosen['win_rate'],
+                    **{k: scored[k] for k in ('trades', 'wins', 'win_rate', 'breach_rate', 'touch_rate', 'avg_pct_move')},
+                })
+    return pd.DataFrame(rows, columns=WINDOW_COLUMNS)
+
+
+def out_of_sample_summary(windows):
+    """Trade-weighted out-of-sample win rate per (protection, holding) across all windows."""
+    grouped = windows.groupby(['protection', 'holding'], sort=False)
+    summary = grouped.agg(windows=('trades', 'size'), trades=('trades', 'sum'), wins=('wins', 'sum')).reset_index()
+    summary['win_rate'] = np.where(summary['trades'] > 0, summary['wins'] / summary['trades'].clip(lower=1), np.nan)
+    return summary
+
+
+def main(settings=None, tickers=None, out_csv=None):
+    """Walk-forward run over WALK_FORWARD['start']..['end']; writes walk_forward_results.csv."""
+    settings = {**WALK_FORWARD, **(settings or {})}
+    started = time.perf_counter()
+    bars = BarStore().load(tickers or load_tickers())
+    if len(bars.sessions) == 0:
+        logger.error("The bar store is empty; fill it with BarStore().update(...) first")
+        return None
+    rebalance = nyse_calendar().rebalance_dates(settings['start'], settings['end'], weekday=settings['rebalance_weekday'])
+    panel = stream_indicator_panel(bars, rebalance)
+    logger.info(f"Streamed {len(bars.sessions)} sessions x {len(bars.tickers)} tickers into {len(panel)} "
+                f"snapshots in {time.perf_counter() - started:.2f}s")
+    data = build_walk_forward_data(panel, bars, compile_rules(load_config()), HOLDING_PERIODS)
+    windows = run_walk_forward(data, PROTECTION_LEVELS, HOLDING_PERIODS, settings)
+    out_csv = out_csv or os.path.join(BACKTEST_DIR, 'walk_forward_results.csv')
+    windows.to_csv(out_csv, index=False)
+    for row in out_of_sample_summary(windows).itertuples(index=False):
+        print(f"Protection: {int(row.protection*100)}%, Holding: {row.holding}d => "
+              f"Out-of-sample win rate: {row.win_rate:.2%} ({row.wins}/{row.trades} over {row.windows} windows)")
+    logger.info(f"Walk-forward results written to {out_csv} in {time.perf_counter() - started:.2f}s")
+    return windows
+
+
+if __name__ == '__main__':
+    main()
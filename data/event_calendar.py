@@ -0,0 +1,127 @@
+# data/event_calendar.py
+"""
+Corporate-events calendar: earnings, dividend and ex-dividend dates for a whole
+ticker universe, parsed once into numpy datetime64 arrays so proximity questions
+("days to earnings", "earnings within N days", "event before expiry X") are
+answered for every ticker or option contract as array operations.
+
+All queries take an explicit as_of date (default: today) so historical replays
+see one consistent "today" for the whole run.
+"""
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+
+EVENT_COLUMNS = ('earnings_date', 'dividend_date', 'ex_dividend_date')
+NAT = np.datetime64('NaT', 'D')
+
+
+def to_day_array(values):
+    """Parse 'YYYY-MM-DD' strings, dates or Timestamps into datetime64[D]; anything else becomes NaT."""
+    parsed = pd.to_datetime(pd.Series(list(values), dtype=object), format='%Y-%m-%d', errors='coerce')
+    return parsed.to_numpy(dtype='datetime64[D]')
+
+
+def _as_of_day(as_of):
+    if as_of is None:
+        as_of = date.today()
+    if isinstance(as_of, datetime):
+        as_of = as_of.date()
+    return np.datetime64(as_of, 'D')
+
+
+class CorporateEventCalendar:
+    """
+    Event dates per ticker. Build it with from_events() (the dict returned by
+    get_next_earnings_and_dividend_dates per ticker) or from_frame() (an indicator
+    DataFrame with earnings_date / dividend_date / ex_dividend_date columns).
+    """
+
+    def __init__(self, tickers, events):
+        self.tickers = list(tickers)
+        self.events = events  # {event_column: np.ndarray datetime64[D], aligned with tickers}
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+
+    @classmethod
+    def from_events(cls, corporate_events):
+        """corporate_events: {ticker: {'earnings_date': str or None, ...}}"""
+        tickers = list(corporate_events)
+        events = {
+            col: to_day_array([(corporate_events[t] or {}).get(col) for t in tickers])
+            for col in EVENT_COLUMNS
+        }
+        return cls(tickers, events)
+
+    @classmethod
+    def from_frame(cls, df, ticker_col='ticker'):
+        """Build from a frame with one row per ticker; missing event columns become NaT."""
+        tickers = df[ticker_col].tolist()
+        events = {}
+        for col in EVENT_COLUMNS:
+            if col in df.columns:
+                events[col] = to_day_array(df[col].tolist())
+            else:
+                events[col] = np.full(len(tickers), NAT)
+        return cls(tickers, events)
+
+    def positions(self, tickers):
+        """Row positions for tickers (-1 for unknown tickers)."""
+        return np.array([self._index.get(t, -1) for t in tickers], dtype=int)
+
+    def dates(self, event='earnings_date', tickers=None):
+        """Event dates for tickers (all tickers if None), NaT where unknown."""
+        values = self.events[event]
+        if tickers is None:
+            return values
+        pos = self.positions(tickers)
+        out = np.full(len(pos), NAT)
+        known = pos >= 0
+        out[known] = values[pos[known]]
+        return out
+
+    def days_until(self, event='earnings_date', as_of=None, tickers=None):
+        """Calendar days from as_of to the event (negative if already passed, NaN if unknown)."""
+        event_dates = self.dates(event, tickers)
+        days = (event_dates - _as_of_day(as_of)).astype('timedelta64[D]').astype(float)
+        days[np.isnat(event_dates)] = np.nan
+        return days
+
+    def days_to_earnings(self, as_of=None, tickers=None):
+        """Days until the next earnings date; NaN when unknown or already passed."""
+        days = self.days_until('earnings_date', as_of, tickers)
+        days[days < 0] = np.nan
+        return days
+
+    def earnings_within(self, n_days, as_of=None, tickers=None):
+        """True where earnings fall between as_of and as_of + n_days (inclusive)."""
+        days = self.days_to_earnings(as_of, tickers)
+        return np.nan_to_num(days, nan=np.inf) <= n_days
+
+    def event_before(self, expiries, tickers, event='earnings_date'):
+        """
+        True where the ticker's event falls on or before the matching expiry.
+        Args:
+            expiries (array-like): Expiration dates, one per contract.
+            tickers (list[str] or str): Underlying per contract, or one ticker for all contracts.
+            event (str): Event column to test.
+        Returns:
+            np.ndarray of bool
+        """
+        expiries = to_day_array(expiries)
+        if isinstance(tickers, str):
+            tickers = [tickers] * len(expiries)
+        event_dates = self.dates(event, tickers)
+        return ~np.isnat(event_dates) & ~np.isnat(expiries) & (event_dates <= expiries)
+
+    def table(self):
+        """Date-indexed long table of all known events: columns date, ticker, event."""
+        frames = []
+        for col in EVENT_COLUMNS:
+            values = self.events[col]
+            known = ~np.isnat(values)
+            frames.append(pd.DataFrame({
+                'date': values[known],
+                'ticker': np.asarray(self.tickers, dtype=object)[known],
+                'event': col.replace('_date', ''),
+            }))
+        return pd.concat(frames, ignore_index=True).sort_values(['date', 'ticker'], kind='stable').set_index('date')
@@ -88,4 +88,32 @@ def get_historical_ohlc(symbol, lookback_days=30, end_date=None):
             lows.append(low)
         else:
             logger.warning(f"Unrecognized bar format for {symbol}: {bar}")
-    return closes, highs, lows
\ No newline at end of file
+    return closes, highs, lows
+
+def get_daily_bars(symbol, start, end):
+    """
+    Fetch dated daily bars for a symbol.
+    Args:
+        symbol (str): Ticker symbol
+        start (datetime): First day (UTC)
+        end (datetime): Last day (inclusive, UTC)
+    Returns:
+        list[dict]: {'date': 'YYYY-MM-DD', 'open', 'high', 'low', 'close'} per bar, oldest first,
+                    or an empty list if the request failed
+    """
+    try:
+        bars = get_raw_historical_bars(symbol, TimeFrame.Day, start, end, feed='iex')
+    except Exception as e:
+        logger.error(f"Failed to fetch bars for {symbol}: {e}")
+        return []
+    rows = []
+    for bar in bars:
+        get = bar.get if isinstance(bar, dict) else lambda k, b=bar: getattr(b, k, None)
+        timestamp = get('timestamp')
+        values = [get(k) for k in ('open', 'high', 'low', 'close')]
+        if timestamp is None or any(v is None for v in values):
+            logger.warning(f"Unrecognized bar format for {symbol}: {bar}")
+            continue
+        date_str = timestamp.strftime('%Y-%m-%d') if hasattr(timestamp, 'strftime') else str(timestamp)[:10]
+        rows.append(dict(zip(('date', 'open', 'high', 'low', 'close'), [date_str] + [float(v) for v in values])))
+    return rows
@@ -0,0 +1,120 @@
+# data/indicator_store.py
+"""
+Typed, compressed history of the daily indicator rows.
+
+indicators_<date>.csv is written fresh every day as untyped text, so a
+historical question means globbing and parsing every file. The indicator stage
+also appends each day's rows to a date-partitioned Parquet dataset:
+
+    output/indicator_store/date=YYYY-MM-DD/indicators.parquet
+
+  - one partition per trading day, written atomically; re-running a day replaces
+    its partition, so appends are idempotent;
+  - numeric indicators are float64 and event dates are date32, so nothing is
+    re-parsed or coerced on read;
+  - zstd compression, rows sorted by ticker so row-group statistics can skip
+    tickers that are not requested.
+
+IndicatorStore.read() takes a date range, a ticker set and a column list.
+Partitions outside the range are pruned by directory name without being opened,
+only the requested columns are decoded, and the ticker filter is pushed down
+into the Parquet scan.
+"""
+import os
+import glob
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from data.event_calendar import EVENT_COLUMNS, to_day_array
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INDICATOR_STORE_DIR = os.path.join(PROJECT_ROOT, 'output/indicator_store')
+PARTITION_FILE = 'indicators.parquet'
+COMPRESSION = 'zstd'
+TEXT_COLUMNS = ('ticker',)
+_PARTITIONING = ds.partitioning(pa.schema([('date', pa.date32())]), flavor='hive')
+
+
+def _to_table(frame):
+    # ticker as string, event dates as date32, every other column as float64
+    frame = frame.sort_values('ticker', kind='stable')
+    arrays, fields = [], []
+    for col in frame.columns:
+        if col == 'date':
+            continue
+        if col in TEXT_COLUMNS:
+            arrays.append(pa.array(frame[col].astype(str).to_numpy(dtype=object), pa.string()))
+            fields.append(pa.field(col, pa.string()))
+        elif col in EVENT_COLUMNS:
+            days = to_day_array(frame[col])
+            arrays.append(pa.array(days, pa.date32(), mask=np.isnat(days)))
+            fields.append(pa.field(col, pa.date32()))
+        else:
+            values = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=float)
+            arrays.append(pa.array(values, pa.float64(), mask=np.isnan(values)))
+            fields.append(pa.field(col, pa.float64()))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+class IndicatorStore:
+    """Date-partitioned Parquet dataset of daily indicator rows."""
+
+    def __init__(self, store_dir=INDICATOR_STORE_DIR):
+        self.store_dir = store_dir
+
+    def path(self, date_str):
+        return os.path.join(self.store_dir, f'date={date_str}', PARTITION_FILE)
+
+    def dates(self):
+        """Sorted 'YYYY-MM-DD' dates with a partition."""
+        paths = glob.glob(os.path.join(self.store_dir, 'date=*', PARTITION_FILE))
+        return sorted(os.path.basename(os.path.dirname(p))[len('date='):] for p in paths)
+
+    def append(self, frame, date_str):
+        """
+        Store one day's indicator rows (the columns of indicators_<date>.csv), replacing
+        any earlier partition for date_str.
+        Returns:
+            str: Path of the partition file.
+        """
+        path = self.path(date_str)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        pq.write_table(_to_table(frame), tmp_path, compression=COMPRESSION)
+        os.replace(tmp_path, path)
+        return path
+
+    def read(self, start=None, end=None, tickers=None, columns=None):
+        """
+        Indicator rows for start <= date <= end ('YYYY-MM-DD', inclusive).
+        Args:
+            tickers (iterable[str]): Only these tickers; None reads all.
+            columns (list[str]): Indicator columns besides date and ticker; None reads all.
+        Returns:
+            pd.DataFrame: date, ticker and the columns, sorted by date then ticker.
+                          Dates are datetime64; numeric columns are float64.
+        """
+        dates = [d for d in self.dates() if (start is None or d >= start) and (end is None or d <= end)]
+        if not dates:
+            return pd.DataFrame(columns=['date', 'ticker'] + list(columns or []))
+        dataset = ds.dataset([self.path(d) for d in dates], format='parquet', partitioning=_PARTITIONING,
+                             partition_base_dir=self.store_dir)
+        names = ['date', 'ticker'] + [c for c in (columns or dataset.schema.names) if c not in ('date', 'ticker')]
+        names = [c for c in names if c in dataset.schema.names]
+        row_filter = ds.field('ticker').isin(sorted(set(tickers))) if tickers is not None else None
+        table = dataset.to_table(columns=names, filter=row_filter)
+        frame = table.to_pandas(date_as_object=False)
+        return frame.sort_values(['date', 'ticker'], kind='stable').reset_index(drop=True)
+
+    def import_csvs(self, csv_dir):
+        """Backfill partitions from indicators_YYYY-MM-DD.csv files; returns the dates written."""
+        written = []
+        for csv_path in sorted(glob.glob(os.path.join(csv_dir, 'indicators_????-??-??.csv'))):
+            date_str = os.path.basename(csv_path)[len('indicators_'):-len('.csv')]
+            # Keep tickers such as 'NA' as strings
+            frame = pd.read_csv(csv_path, dtype={'ticker': str}, keep_default_na=False, na_values=[''])
+            self.append(frame, date_str)
+            written.append(date_str)
+        return written
@@ -4,7 +4,9 @@ from typing import List, Dict, Any
 from utils.alpaca_api import get_option_chain, get_raw_last_trade
 from utils.logger import get_logger
 from data.corporate_events import get_next_earnings_and_dividend_dates
+from data.event_calendar import CorporateEventCalendar, to_day_array
 from datetime import datetime, timedelta
+import numpy as np
 import csv
 import re
 
@@ -46,7 +48,7 @@ def parse_option_symbol(symbol):
     exp_date = f"{year:04d}-{month:02d}-{day:02d}"
     return underlying, exp_date, opt_type, strike
 
-def collect_options_data(symbol, expiration_date_gte, expiration_date_lte, output_csv, earnings_info=None):
+def collect_options_data(symbol, expiration_date_gte, expiration_date_lte, output_csv, earnings_info=None, event_calendar=None, as_of=None):
     # DEBUG: Print the symbol and date range being processed
     logger.info(f"Collecting options for {symbol} from {expiration_date_gte} to {expiration_date_lte}")
     
@@ -61,10 +63,11 @@ def collect_options_data(symbol, expiration_date_gte, expiration_date_lte, outpu
     except Exception as e:
         logger.error(f"Error fetching underlying price for {symbol}: {e}")
     logger.info(f"Underlying price for {symbol}: {underlying_price}")
-    # Use passed-in earnings_info if available, else fetch
-    if earnings_info is None:
-        earnings_info = get_next_earnings_and_dividend_dates(symbol)
-    earnings_date = earnings_info.get('earnings_date') if earnings_info else None
+    # Use the shared event calendar or passed-in earnings_info if available, else fetch
+    if event_calendar is None:
+        if earnings_info is None:
+            earnings_info = get_next_earnings_and_dividend_dates(symbol)
+        event_calendar = CorporateEventCalendar.from_events({symbol: earnings_info})
     logger.info(f"Earnings info for {symbol}: {earnings_info}")
     
     # Prepare CSV header (removed 'last_price')
@@ -74,14 +77,15 @@ def collect_options_data(symbol, expiration_date_gte, expiration_date_lte, outpu
         'delta','gamma','theta','vega','rho','implied_volatility','underlying_price',
         'in_the_money','earnings_within_dte'
     ]
-    rows = [header]
-    today = datetime.now().date()
+    rows = []
+    exp_dates = []
+    today = np.datetime64(as_of or datetime.now().date(), 'D')
     
     # Process each contract and extract required fields
     for c in contracts.values():
         occ_symbol = c.symbol
         underlying, exp_date, opt_type, strike = parse_option_symbol(occ_symbol)
-        dte = (datetime.strptime(exp_date, '%Y-%m-%d').date() - today).days
+        exp_dates.append(exp_date)
         
         quote = c.latest_quote
         bid = quote.bid_price
@@ -103,17 +107,13 @@ def collect_options_data(symbol, expiration_date_gte, expiration_date_lte, outpu
         else:  # put
             in_the_money = underlying_price is not None and underlying_price < strike
         
-        earnings_within_dte = False
-        if earnings_date:
-            earnings_within_dte = (datetime.strptime(earnings_date, '%Y-%m-%d').date() <= datetime.strptime(exp_date, '%Y-%m-%d').date())
-        
         row = [
             underlying,
             occ_symbol,
             opt_type,
             exp_date,
             strike,
-            dte,
+            None,  # days_to_expiration, filled in below for all contracts at once
             bid,
             ask,
             mid,
@@ -125,9 +125,18 @@ def collect_options_data(symbol, expiration_date_gte, expiration_date_lte, outpu
             iv,
             underlying_price,
             in_the_money,
-            earnings_within_dte
+            None  # earnings_within_dte, filled in below
         ]
         rows.append(row)
+
+    # Expiry-dependent columns for every contract in one pass over the parsed dates
+    expiries = to_day_array(exp_dates)
+    dtes = (expiries - today).astype(int)
+    earnings_within = event_calendar.event_before(expiries, symbol)
+    for row, dte, within in zip(rows, dtes, earnings_within):
+        row[5] = int(dte)
+        row[-1] = bool(within)
+    rows.insert(0, header)
     
     # Ensure output directory exists and output_csv is in OUTPUT_DIR
     PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
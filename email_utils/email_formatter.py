@@ -2,10 +2,13 @@ import os
 import glob
 import json
 from datetime import datetime
-import base64
 import logging
 from azure.communication.email import EmailClient
 from config import AZURE_EMAIL_CONNECTION_STRING, AZURE_EMAIL_SENDER
+from trade_generator.strategy_json_parser import load_signal_index, SignalIndex
+from email_utils.email_templates import render_table, render_report, encode_attachments
+# extract_reason used to be defined here; re-exported for scripts that import it from this module
+from email_utils.email_templates import extract_reason  # noqa: F401
 
 def find_latest_file(folder, pattern):
     files = glob.glob(os.path.join(folder, pattern))
@@ -13,77 +16,9 @@ def find_latest_file(folder, pattern):
         return None
     return max(files, key=os.path.getmtime)
 
-def extract_reason(signals, signal_type):
-    # Return a comma-separated list of strategy names where the signal matches the type (e.g., 'strongly bullish')
-    reasons = [name for name, v in signals.items() if signal_type in v.get('signal', '').lower()]
-    return ', '.join(reasons) if reasons else 'N/A'
-
 def format_signal_table(entries, signal_type, color):
-    # entries: list of dicts for a given signal_type
-    if not entries:
-        return f'<p style="color:gray;">No {signal_type.title()} stocks today.</p>'
-    table = f"""
-    <style>
-    @media only screen and (max-width: 700px) {{
-        table.responsive-table, table.responsive-table thead, table.responsive-table tbody, table.responsive-table th, table.responsive-table td, table.responsive-table tr {{
-            display: block;
-        }}
-        table.responsive-table thead tr {{
-            display: none;
-        }}
-        table.responsive-table tr {{ margin-bottom: 15px; }}
-        table.responsive-table td {{
-            border: none;
-            position: relative;
-            padding-left: 50%;
-            min-height: 40px;
-            box-sizing: border-box;
-        }}
-        table.responsive-table td:before {{
-            position: absolute;
-            top: 8px;
-            left: 8px;
-            width: 45%;
-            white-space: nowrap;
-            font-weight: bold;
-            color: #333;
-        }}
-        table.responsive-table td:nth-of-type(1):before {{ content: 'Ticker'; }}
-        table.responsive-table td:nth-of-type(2):before {{ content: 'Current Price'; }}
-        table.responsive-table td:nth-of-type(3):before {{ content: '52W High'; }}
-        table.responsive-table td:nth-of-type(4):before {{ content: '52W Low'; }}
-        table.responsive-table td:nth-of-type(5):before {{ content: 'Reason'; }}
-    }}
-    </style>
-    <table class="responsive-table" style="border-collapse:collapse;width:100%;margin-bottom:20px;font-family:'Segoe UI',sans-serif;font-size:14px;">
-    <thead>
-    <tr style="background:{color};color:white;font-weight:bold;text-align:left;">
-        <th style='border:1px solid #ddd;padding:8px;'>Ticker</th>
-        <th style='border:1px solid #ddd;padding:8px;'>Current Price</th>
-        <th style='border:1px solid #ddd;padding:8px;'>52W High</th>
-        <th style='border:1px solid #ddd;padding:8px;'>52W Low</th>
-        <th style='border:1px solid #ddd;padding:8px;'>Reason</th>
-    </tr>
-    </thead>
-    <tbody>
-    """
-    for entry in entries:
-        ticker = entry.get('ticker', '')
-        price = entry.get('current_price', '')
-        high = entry.get('high_52w', '')
-        low = entry.get('low_52w', '')
-        reason = extract_reason(entry.get('signals', {}), signal_type.lower())
-        table += f"""
-        <tr style="background:#fff;">
-            <td style='border:1px solid #ddd;padding:8px;'>{ticker}</td>
-            <td style='border:1px solid #ddd;padding:8px;'>{price}</td>
-            <td style='border:1px solid #ddd;padding:8px;'>{high}</td>
-            <td style='border:1px solid #ddd;padding:8px;'>{low}</td>
-            <td style='border:1px solid #ddd;padding:8px;'>{reason}</td>
-        </tr>
-        """
-    table += "</tbody></table>"
-    return table
+    # entries: list of dicts for a given signal_type; the style block is part of the page (render_report)
+    return render_table(entries, signal_type.lower(), color)
 
 def load_recipients(json_path):
     try:
@@ -96,6 +31,11 @@ def load_recipients(json_path):
         return []
 
 def send_email(subject, plain_text, html_content, attachment_path=None, recipients_json='config/email_recipients.json'):
+    """
+    Send the report to the recipients in recipients_json (as BCC).
+    attachment_path is one path or a list of paths; each file is attached with its own
+    content type, large text files gzipped (email_templates.encode_attachments).
+    """
     connection_string = AZURE_EMAIL_CONNECTION_STRING
     sender_address = AZURE_EMAIL_SENDER
     if not connection_string or not sender_address:
@@ -117,17 +57,12 @@ def send_email(subject, plain_text, html_content, attachment_path=None, recipien
                 "html": html_content
             },
         }
-        if attachment_path:
-            with open(attachment_path, "rb") as f:
-                file_bytes = f.read()
-                encoded = base64.b64encode(file_bytes).decode("utf-8")
-            message["attachments"] = [
-                {
-                    "name": os.path.basename(attachment_path),
-                    "contentType": "text/csv",
-                    "contentInBase64": encoded
-                }
-            ]
+        paths = [attachment_path] if isinstance(attachment_path, str) else list(attachment_path or [])
+        attachments, skipped = encode_attachments(paths)
+        if skipped:
+            print(f"Attachments over the size limit, not sent: {[os.path.basename(p) for p in skipped]}")
+        if attachments:
+            message["attachments"] = attachments
         poller = client.begin_send(message)
         result = poller.result()
         print(f"Email sent: {result['id']}")
@@ -135,39 +70,28 @@ def send_email(subject, plain_text, html_content, attachment_path=None, recipien
         # Hide recipient emails in error output
         print(f"Failed to send email: {str(ex).replace(str(recipients), '[HIDDEN]')}")
 
-def format_email_body():
+def format_email_body(analysis=None):
+    """
+    Subject, plain text, HTML and attachment paths of the daily signal email.
+    analysis (list[dict]) renders already-loaded analysis records; otherwise today's
+    bull_bear_analysis JSON is read (once per process, via load_signal_index).
+    """
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     analysis_dir = os.path.join(project_root, 'output/bull_bear_analysis')
     today_str = datetime.now().strftime('%Y-%m-%d')
     analysis_json = find_latest_file(analysis_dir, f'bull_bear_analysis_{today_str}.json')
-    if not analysis_json:
+    if analysis is not None:
+        signal_index = SignalIndex.from_records(analysis, source_path=analysis_json)
+    elif analysis_json:
+        signal_index = load_signal_index(analysis_json)
+    else:
         return ("No Analysis", "No analysis file found for today.", "<p>No analysis file found for today.</p>", [])
-    with open(analysis_json) as f:
-        data = json.load(f)
-    strongly_bullish = [d for d in data if d.get('combined_signal', {}).get('text') == 'Strongly Bullish']
-    strongly_bearish = [d for d in data if d.get('combined_signal', {}).get('text') == 'Strongly Bearish']
-    neutral = [d for d in data if d.get('combined_signal', {}).get('text') == 'Neutral']
-    # Build tables
-    bull_table = format_signal_table(strongly_bullish, 'strongly bullish', '#2e8b57')
-    bear_table = format_signal_table(strongly_bearish, 'strongly bearish', '#b22222')
-    neutral_table = format_signal_table(neutral, 'neutral', '#4682b4')
-    # Logo and header
-    logo = '<div style="font-size:2em;font-weight:bold;color:#4682b4;margin-bottom:10px;">🐂📈 Bull & Bear Daily Signal Report 📉🐻</div>'
-    html_content = f"""
-    <html>
-        <body style='font-family:sans-serif;'>
-            {logo}
-            <h2 style='color:#333;'>Strongly Bullish Stocks</h2>
-            {bull_table}
-            <h2 style='color:#333;'>Strongly Bearish Stocks</h2>
-            {bear_table}
-            <h2 style='color:#333;'>Neutral Stocks</h2>
-            {neutral_table}
-            <p style='font-size:0.9em;color:#888;'>Generated on {today_str}</p>
-        </body>
-    </html>
-    """
+    html_content = render_report([
+        ('Strongly Bullish Stocks', signal_index.entries('Strongly Bullish'), 'strongly bullish', '#2e8b57'),
+        ('Strongly Bearish Stocks', signal_index.entries('Strongly Bearish'), 'strongly bearish', '#b22222'),
+        ('Neutral Stocks', signal_index.entries('Neutral'), 'neutral', '#4682b4'),
+    ], today_str)
     subject = f"Bull & Bear Daily Signal Report - {today_str}"
     plain_text = f"See attached HTML for today's signal tables."
-    attachments = [analysis_json]
+    attachments = [analysis_json] if analysis_json else []
     return subject, plain_text, html_content, attachments
@@ -0,0 +1,176 @@
+# email_utils/email_templates.py
+"""
+HTML rendering and attachment encoding for the daily signal email.
+
+The page, table, row and overflow fragments are string.Template objects
+compiled once at import. Rendering substitutes each row and joins the rows once,
+instead of growing one string with +=. The responsive <style> block is emitted
+once in <head> rather than once per table. Each table shows at most
+MAX_TABLE_ROWS rows plus an "and N more" line, so the email stays the same size
+however large the universe is. The full analysis travels as an attachment.
+
+encode_attachments() turns file paths into Azure Communication Email
+attachments with the content type of each file. Text files above
+COMPRESS_MIN_BYTES are gzip-compressed and sent as <name>.gz.
+"""
+import base64
+import gzip
+import html
+import mimetypes
+import os
+from string import Template
+
+MAX_TABLE_ROWS = 100  # rows per signal table; the rest are counted in a footer line
+COMPRESS_MIN_BYTES = 32 * 1024  # smaller attachments are sent as they are
+MAX_ATTACHMENT_BYTES = 7 * 1024 * 1024  # stays under the service's 10 MB message limit once base64-encoded
+TEXT_EXTENSIONS = ('.csv', '.json', '.jsonl', '.txt', '.html', '.log')
+mimetypes.add_type('application/x-ndjson', '.jsonl')
+
+TABLE_COLUMNS = [('ticker', 'Ticker'), ('current_price', 'Current Price'), ('high_52w', '52W High'),
+                 ('low_52w', '52W Low'), ('reason', 'Reason')]
+_CELL = "border:1px solid #ddd;padding:8px;"
+
+STYLE_BLOCK = """<style>
+@media only screen and (max-width: 700px) {
+    table.responsive-table, table.responsive-table thead, table.responsive-table tbody, table.responsive-table th, table.responsive-table td, table.responsive-table tr {
+        display: block;
+    }
+    table.responsive-table thead tr { display: none; }
+    table.responsive-table tr { margin-bottom: 15px; }
+    table.responsive-table td {
+        border: none;
+        position: relative;
+        padding-left: 50%;
+        min-height: 40px;
+        box-sizing: border-box;
+    }
+    table.responsive-table td:before {
+        position: absolute;
+        top: 8px;
+        left: 8px;
+        width: 45%;
+        white-space: nowrap;
+        font-weight: bold;
+        color: #333;
+    }
+""" + ''.join(
+    f"    table.responsive-table td:nth-of-type({i}):before {{ content: '{label}'; }}\n"
+    for i, (_, label) in enumerate(TABLE_COLUMNS, start=1)
+) + """}
+</style>"""
+
+PAGE_TEMPLATE = Template("""<html>
+<head>
+$style
+</head>
+<body style='font-family:sans-serif;'>
+<div style="font-size:2em;font-weight:bold;color:#4682b4;margin-bottom:10px;">🐂📈 Bull & Bear Daily Signal Report 📉🐻</div>
+$sections
+<p style='font-size:0.9em;color:#888;'>Generated on $date</p>
+</body>
+</html>
+""")
+SECTION_TEMPLATE = Template("<h2 style='color:#333;'>$title</h2>\n$table\n")
+TABLE_TEMPLATE = Template(
+    "<table class=\"responsive-table\" style=\"border-collapse:collapse;width:100%;margin-bottom:20px;"
+    "font-family:'Segoe UI',sans-serif;font-size:14px;\">\n<thead>\n"
+    "<tr style=\"background:$color;color:white;font-weight:bold;text-align:left;\">"
+    + ''.join(f"<th style='{_CELL}'>{label}</th>" for _, label in TABLE_COLUMNS)
+    + "</tr>\n</thead>\n<tbody>\n$rows</tbody></table>\n$more"
+)
+ROW_TEMPLATE = Template(
+    "<tr style=\"background:#fff;\">"
+    + ''.join(f"<td style='{_CELL}'>${key}</td>" for key, _ in TABLE_COLUMNS)
+    + "</tr>\n"
+)
+MORE_TEMPLATE = Template("<p style=\"color:gray;\">... and $count more $signal stocks (see the attached analysis).</p>\n")
+EMPTY_TEMPLATE = Template("<p style=\"color:gray;\">No $signal stocks today.</p>\n")
+
+
+def _text(value):
+    return '' if value is None else html.escape(str(value))
+
+
+def extract_reason(signals, signal_type):
+    # Comma-separated strategy names whose signal matches the type (e.g. 'strongly bullish')
+    reasons = [name for name, v in signals.items() if signal_type in v.get('signal', '').lower()]
+    return ', '.join(reasons) if reasons else 'N/A'
+
+
+def render_table(entries, signal_type, color, max_rows=MAX_TABLE_ROWS):
+    """
+    One signal table (without the style block).
+    Args:
+        entries (list[dict]): Analysis records with the signal.
+        signal_type (str): Lower-case signal text, e.g. 'strongly bullish'.
+        color (str): Header background.
+        max_rows (int): Rows shown; the remainder is summarized in one line.
+    """
+    if not entries:
+        return EMPTY_TEMPLATE.substitute(signal=signal_type.title())
+    shown = entries[:max_rows]
+    rows = ''.join(
+        ROW_TEMPLATE.substitute(
+            ticker=_text(entry.get('ticker', '')),
+            current_price=_text(entry.get('current_price', '')),
+            high_52w=_text(entry.get('high_52w', '')),
+            low_52w=_text(entry.get('low_52w', '')),
+            reason=_text(extract_reason(entry.get('signals', {}), signal_type)),
+        )
+        for entry in shown
+    )
+    more = MORE_TEMPLATE.substitute(count=len(entries) - len(shown), signal=signal_type) if len(entries) > len(shown) else ''
+    return TABLE_TEMPLATE.substitute(color=color, rows=rows, more=more)
+
+
+def render_report(sections, date_str, max_rows=MAX_TABLE_ROWS):
+    """
+    The full HTML page.
+    Args:
+        sections (list[tuple]): (title, entries, signal_type, color) per table, in display order.
+        date_str (str): Report date for the footer.
+    """
+    body = ''.join(
+        SECTION_TEMPLATE.substitute(title=title, table=render_table(entries, signal_type, color, max_rows))
+        for title, entries, signal_type, color in sections
+    )
+    return PAGE_TEMPLATE.substitute(style=STYLE_BLOCK, sections=body, date=date_str)
+
+
+def encode_attachment(path, compress=True):
+    """
+    One attachment for EmailClient.begin_send.
+    Returns:
+        dict: name, contentType and contentInBase64; text files of COMPRESS_MIN_BYTES or more
+              are gzipped and named <name>.gz with contentType application/gzip.
+    """
+    name = os.path.basename(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if compress and name.lower().endswith(TEXT_EXTENSIONS) and len(data) >= COMPRESS_MIN_BYTES:
+        data = gzip.compress(data, mtime=0)
+        name, content_type = f'{name}.gz', 'application/gzip'
+    return {'name': name, 'contentType': content_type, 'contentInBase64': base64.b64encode(data).decode('ascii')}
+
+
+def encode_attachments(paths, compress=True, max_bytes=MAX_ATTACHMENT_BYTES):
+    """
+    Attachments for every existing path, in order, skipping duplicates. Files that would take
+    the total past max_bytes (before base64) are left out.
+    Returns:
+        tuple: (attachments, skipped paths)
+    """
+    attachments, skipped, seen, total = [], [], set(), 0
+    for path in paths:
+        if not path or path in seen or not os.path.isfile(path):
+            continue
+        seen.add(path)
+        attachment = encode_attachment(path, compress)
+        size = len(attachment['contentInBase64']) * 3 // 4
+        if total + size > max_bytes:
+            skipped.append(path)
+            continue
+        total += size
+        attachments.append(attachment)
+    return attachments, skipped
@@ -0,0 +1,210 @@
+# indicators/incremental.py
+"""
+Streaming versions of the indicators in this package, for many tickers at once.
+
+IndicatorState keeps O(1)-per-bar state for every ticker (running sums, ring
+buffers and exponential averages) and is advanced one session at a time with
+that session's close/high/low arrays. snapshot() returns the same values the
+pandas_ta-based functions give for the ticker's history so far, without
+recomputing a lookback window:
+
+    state = IndicatorState(n_tickers)
+    for close, high, low in sessions:
+        state.update(close, high, low)
+    values = state.snapshot()   # {'rsi_14': array, 'sma_20': array, ...}
+
+NaN inputs mean "no bar" and leave that ticker's state untouched, so tickers
+listed late or with gaps behave as if their bars were concatenated, like the
+per-ticker bar lists the batch functions receive. Definitions follow pandas_ta:
+SMA-seeded EMAs, Wilder (RMA) smoothing for RSI/ATR/ADX, and population standard
+deviation for Bollinger Bands. The batch functions only see the last 400 days,
+so the long EMAs here (seeded at the first stored bar) are closer to their
+full-history values than the batch ones.
+"""
+import numpy as np
+
+# Column names shared with the indicators_YYYY-MM-DD.csv files
+SNAPSHOT_COLUMNS = [
+    'current_price', 'previous_close', 'percent_change', 'rsi_14', 'sma_20', 'sma_50', 'sma_200',
+    'ema_12', 'ema_20', 'ema_50', 'ema_200', 'macd', 'macd_signal', 'bb_upper', 'bb_middle',
+    'bb_lower', 'atr_14', 'adx_14', 'support_20', 'resistance_20', 'support_75', 'resistance_75',
+    'support_200', 'resistance_200'
+]
+
+
+class RollingWindow:
+    """Ring buffer of each ticker's last `size` values with a running sum."""
+
+    def __init__(self, size, n):
+        self.size = size
+        self.buffer = np.full((size, n), np.nan)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.total = np.zeros(n)
+
+    def push(self, values, mask):
+        idx = np.flatnonzero(mask)
+        slot = self.count[idx] % self.size
+        old = self.buffer[slot, idx]
+        self.total[idx] += values[idx] - np.where(np.isnan(old), 0.0, old)
+        self.buffer[slot, idx] = values[idx]
+        self.count[idx] += 1
+
+    @property
+    def full(self):
+        return self.count >= self.size
+
+    def mean(self):
+        return np.where(self.full, self.total / self.size, np.nan)
+
+    def std(self):
+        # Population standard deviation, computed from the buffer (exact, only at snapshot time)
+        with np.errstate(invalid='ignore'):
+            return np.where(self.full, np.std(self.buffer, axis=0), np.nan)
+
+    def min(self):
+        with np.errstate(invalid='ignore'):
+            return np.where(self.full, np.min(self.buffer, axis=0), np.nan)
+
+    def max(self):
+        with np.errstate(invalid='ignore'):
+            return np.where(self.full, np.max(self.buffer, axis=0), np.nan)
+
+
+class SeededEMA:
+    """EMA with alpha = 2 / (period + 1), seeded with the SMA of the first `period` values (pandas_ta ema)."""
+
+    def __init__(self, period, n):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.seed = np.zeros(n)
+        self.value = np.full(n, np.nan)
+
+    def push(self, values, mask):
+        warming = mask & (self.count < self.period)
+        self.seed[warming] += values[warming]
+        running = mask & (self.count >= self.period)
+        self.value[running] += self.alpha * (values[running] - self.value[running])
+        self.count[mask] += 1
+        seeded = warming & (self.count == self.period)
+        self.value[seeded] = self.seed[seeded] / self.period
+
+
+class WilderAverage:
+    """pandas_ta rma: ewm(alpha=1/period, adjust=True) over the values seen, NaN until `period` values."""
+
+    def __init__(self, period, n):
+        self.period = period
+        self.decay = 1.0 - 1.0 / period
+        self.count = np.zeros(n, dtype=np.int64)
+        self.numerator = np.zeros(n)
+        self.denominator = np.zeros(n)
+
+    def push(self, values, mask):
+        self.numerator[mask] = self.decay * self.numerator[mask] + values[mask]
+        self.denominator[mask] = self.decay * self.denominator[mask] + 1.0
+        self.count[mask] += 1
+
+    def value(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count >= self.period, self.numerator / self.denominator, np.nan)
+
+
+class IndicatorState:
+    """
+    Per-ticker state for every indicator in an indicators CSV row.
+    Args:
+        n (int): Number of tickers (the width of every update array).
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.close = np.full(n, np.nan)
+        self.previous_close = np.full(n, np.nan)
+        self.previous_high = np.full(n, np.nan)
+        self.previous_low = np.full(n, np.nan)
+        self.windows = {size: RollingWindow(size, n) for size in (20, 50, 75, 200)}
+        self.emas = {period: SeededEMA(period, n) for period in (12, 20, 26, 50, 200)}
+        self.macd_signal = SeededEMA(9, n)
+        self.gain = WilderAverage(14, n)
+        self.loss = WilderAverage(14, n)
+        self.true_range = WilderAverage(14, n)
+        self.plus_dm = WilderAverage(14, n)
+        self.minus_dm = WilderAverage(14, n)
+        self.dx = WilderAverage(14, n)
+
+    def update(self, close, high=None, low=None):
+        """
+        Advance every ticker with a bar in this session.
+        Args:
+            close (np.ndarray): Closes, NaN for tickers without a bar.
+            high, low (np.ndarray): Highs and lows; default to the close.
+        """
+        close = np.asarray(close, dtype=float)
+        high = close if high is None else np.where(np.isnan(high), close, high)
+        low = close if low is None else np.where(np.isnan(low), close, low)
+        bar = ~np.isnan(close)
+        prev = bar & ~np.isnan(self.close)
+
+        for window in self.windows.values():
+            window.push(close, bar)
+        for ema in self.emas.values():
+            ema.push(close, bar)
+        macd = self.emas[12].value - self.emas[26].value
+        self.macd_signal.push(macd, bar & ~np.isnan(macd))
+
+        with np.errstate(invalid='ignore'):
+            change = close - self.close
+            self.gain.push(np.maximum(change, 0.0), prev)
+            self.loss.push(np.maximum(-change, 0.0), prev)
+            true_range = np.fmax(high - low, np.fmax(np.abs(high - self.close), np.abs(self.close - low)))
+            self.true_range.push(true_range, prev)
+            up = high - self.previous_high
+            down = self.previous_low - low
+            self.plus_dm.push(np.where((up > down) & (up > 0), up, 0.0), prev)
+            self.minus_dm.push(np.where((down > up) & (down > 0), down, 0.0), prev)
+            dx = self._dx()
+        self.dx.push(dx, prev & ~np.isnan(dx))
+
+        self.previous_close = np.where(bar, self.close, self.previous_close)
+        self.close = np.where(bar, close, self.close)
+        self.previous_high = np.where(bar, high, self.previous_high)
+        self.previous_low = np.where(bar, low, self.previous_low)
+
+    def _dx(self):
+        atr = self.true_range.value()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            plus = 100 * self.plus_dm.value() / atr
+            minus = 100 * self.minus_dm.value() / atr
+            return 100 * np.abs(plus - minus) / (plus + minus)
+
+    def snapshot(self):
+        """Current indicator values per ticker, keyed by SNAPSHOT_COLUMNS (NaN where not enough bars)."""
+        gain, loss = self.gain.value(), self.loss.value()
+        macd = self.emas[12].value - self.emas[26].value
+        middle, std = self.windows[20].mean(), self.windows[20].std()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = {
+                'current_price': self.close,
+                'previous_close': self.previous_close,
+                'percent_change': (self.close - self.previous_close) / self.previous_close * 100,
+                'rsi_14': 100 * gain / (gain + loss),
+                'sma_20': middle,
+                'sma_50': self.windows[50].mean(),
+                'sma_200': self.windows[200].mean(),
+                'ema_12': self.emas[12].value,
+                'ema_20': self.emas[20].value,
+                'ema_50': self.emas[50].value,
+                'ema_200': self.emas[200].value,
+                'macd': macd,
+                'macd_signal': self.macd_signal.value,
+                'bb_upper': middle + 2 * std,
+                'bb_middle': middle,
+                'bb_lower': middle - 2 * std,
+                'atr_14': self.true_range.value(),
+                'adx_14': self.dx.value(),
+            }
+        for window in (20, 75, 200):
+            values[f'support_{window}'] = self.windows[window].min()
+            values[f'resistance_{window}'] = self.windows[window].max()
+        return {col: np.array(values[col], dtype=float, copy=True) for col in SNAPSHOT_COLUMNS}
@@ -22,11 +22,18 @@ from indicators.adx import calculate_adx
 from data.corporate_events import get_next_earnings_and_dividend_dates
 from indicators.support_resistance import find_strong_swing_levels_from_arrays
 from indicators.ytd_52w import get_ytd_52w_indicators_for_ticker
+from data.indicator_store import IndicatorStore
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+WRITE_INDICATOR_STORE = True  # also append the day's rows to the Parquet history in output/indicator_store
 
 
 def process_indicators(output_dir=None, tickers=None, today_str=None, corporate_events=None):
     """
     Generate indicator CSV for today and save to output/indicator_out/indicators_<today>.csv
+    (and, with WRITE_INDICATOR_STORE, into the day's partition of data.indicator_store)
     """
     if output_dir is None:
         PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -130,4 +137,10 @@ def process_indicators(output_dir=None, tickers=None, today_str=None, corporate_
         writer = csv.writer(f)
         writer.writerow(header)
         writer.writerows(rows)
+    if WRITE_INDICATOR_STORE:
+        try:
+            IndicatorStore().append(pd.DataFrame(rows, columns=header), today_str)
+        except Exception as e:
+            # The CSV is the day's primary output; a failed history append must not stop the run
+            logger.error(f"Failed to append {today_str} to the indicator store: {e}")
     return output_path
@@ -8,13 +8,15 @@ from utils.ticker_loader import load_tickers
 from data.corporate_events import get_next_earnings_and_dividend_dates
 from data.options_collector import collect_options_data
 import logging
-from azure.storage.blob import BlobServiceClient
 from datetime import datetime, timedelta
 import calendar
 from email_utils.email_formatter import send_email, format_email_body
 from utils.logger import get_logger
 from indicators.process_indicators import process_indicators
 import subprocess
+import glob
+import threading
+from utils.blob_uploader import BlobUploader
 
 # Ensure logs and output directories exist (relative to project root)
 LOG_DIR = os.path.join(PROJECT_ROOT, 'logs')
@@ -37,24 +39,54 @@ SEND_EMAIL = True  # Set to True to enable email notifications
 COLLECT_STOCK_DATA = True  # Set to True to enable email notifications
 COLLECT_OPTIONS_DATA = False  # Set to True to enable email notifications
 UPLOAD_TO_BLOB = False  # Set to True to enable Azure Blob upload
+# Output folders whose dated files are uploaded; the chain history and indicator store stay local
+REPORT_DIRS = ('indicator_out', 'bull_bear_analysis', 'bull_bear_trades_out')
+
+_uploader = None
+
+
+def get_uploader():
+    """The run's BlobUploader: one client and connection pool, container ensured once."""
+    global _uploader
+    if _uploader is None:
+        _uploader = BlobUploader(AZURE_CONNECTION_STRING, AZURE_CONTAINER_NAME)
+    return _uploader
 
 def upload_to_blob(filename, data):
     if not AZURE_CONNECTION_STRING:
         logger.error('Azure Blob Storage connection string not set in environment variable AZURE_BLOB_CONNECTION_STRING')
         return
     try:
-        blob_service_client = BlobServiceClient.from_connection_string(AZURE_CONNECTION_STRING)
-        container_client = blob_service_client.get_container_client(AZURE_CONTAINER_NAME)
-        try:
-            container_client.create_container()
-        except Exception:
-            pass  # Container may already exist
-        blob_client = container_client.get_blob_client(filename)
-        blob_client.upload_blob(data, overwrite=True)
-        logger.info(f"Uploaded {filename} to Azure Blob Storage container '{AZURE_CONTAINER_NAME}'")
+        status = get_uploader().upload_bytes(filename, data)
+        logger.info(f"{filename}: {status} in Azure Blob Storage container '{AZURE_CONTAINER_NAME}'")
     except Exception as e:
         logger.error(f"Failed to upload {filename} to Azure Blob Storage: {e}")
 
+def upload_daily_artifacts(today_str):
+    """Upload the report files dated today_str from REPORT_DIRS concurrently (unchanged files are skipped)."""
+    if not AZURE_CONNECTION_STRING:
+        logger.error('Azure Blob Storage connection string not set in environment variable AZURE_BLOB_CONNECTION_STRING')
+        return {}
+    # Signal index sidecars (.idx) are local lookup tables derived from the analysis
+    paths = sorted(p for d in REPORT_DIRS for p in glob.glob(os.path.join(OUTPUT_DIR, d, f'*{today_str}*'))
+                   if os.path.isfile(p) and not p.endswith('.idx'))
+    try:
+        return get_uploader().upload_files(paths, base_dir=PROJECT_ROOT)
+    except Exception as e:
+        logger.error(f"Failed to upload artifacts to Azure Blob Storage: {e}")
+        return {}
+
+def upload_log():
+    """Upload today's log; called last, once nothing else is written to it."""
+    if not AZURE_CONNECTION_STRING:
+        return {}
+    file_handler.flush()
+    try:
+        return get_uploader().upload_files([log_file], base_dir=PROJECT_ROOT)
+    except Exception as e:
+        logger.error(f"Failed to upload {log_file} to Azure Blob Storage: {e}")
+        return {}
+
 def main():
     tickers = load_tickers()
     print("Processing tickers:", tickers)
@@ -92,37 +124,29 @@ def main():
             if trade_csvs:
                 trade_csv_path = os.path.join(trades_dir, trade_csvs[0])
 
+    # Upload alongside the email rather than after it
+    upload_thread = None
+    if UPLOAD_TO_BLOB:
+        upload_thread = threading.Thread(target=upload_daily_artifacts, args=(today_str,), name='blob-upload')
+        upload_thread.start()
+
     # Send summary email with tables if enabled
     if SEND_EMAIL:
         subject, plain_text, html_content, attachments = format_email_body()
-        # On Friday, attach both the latest trades JSON and CSV if available
-        if weekday == 4:
-            extra_attachments = []
-            if trade_json_path:
-                extra_attachments.append(trade_json_path)
-            if trade_csv_path:
-                extra_attachments.append(trade_csv_path)
-            # Always include the analysis JSON as the first attachment
-            if attachments:
-                all_attachments = [attachments[0]] + extra_attachments
-            else:
-                all_attachments = extra_attachments
-            send_email(
-                subject=subject,
-                plain_text=plain_text,
-                html_content=html_content,
-                attachment_path=all_attachments[0] if all_attachments else None,
-                recipients_json=os.path.join(PROJECT_ROOT, "config/email_recipients.json")
-            )
-        else:
-            # Mon-Thu: just send the daily signal mail with analysis JSON
-            send_email(
-                subject=subject,
-                plain_text=plain_text,
-                html_content=html_content,
-                attachment_path=attachments[0] if attachments else None,
-                recipients_json=os.path.join(PROJECT_ROOT, "config/email_recipients.json")
-            )
+        # Always include the analysis JSON; on Friday also the latest trades JSON and CSV
+        all_attachments = attachments[:1] + [p for p in (trade_json_path, trade_csv_path) if p]
+        send_email(
+            subject=subject,
+            plain_text=plain_text,
+            html_content=html_content,
+            attachment_path=all_attachments,
+            recipients_json=os.path.join(PROJECT_ROOT, "config/email_recipients.json")
+        )
+
+    if upload_thread is not None:
+        upload_thread.join()
+        upload_log()
+        get_uploader().close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,292 @@
+# strategy/rule_engine.py
+"""
+Compiles the strategy rules declared in config/credit_spread_indicator.json into
+vectorized callables that are evaluated over a whole indicator DataFrame at once.
+
+Each strategy declares an ordered list of rules:
+
+    "rules": [
+        {"when": "sma_50 > sma_200", "signal": "strongly bullish"},
+        {"when": "sma_50 < sma_200", "signal": "strongly bearish"}
+    ],
+    "default": "neutral"
+
+The first rule whose expression holds for a row decides that row's signal.
+Expressions support comparisons (including chained ones such as
+``5 <= pct_from_52w_low <= 50``), ``and``/``or``/``not``, arithmetic
+(``+ - * /``), numeric constants and column names. Column names must appear in
+the strategy's ``combo`` (or be one of BASE_COLUMNS), so a typo fails when the
+config is loaded instead of silently producing neutral signals.
+"""
+import ast
+import numpy as np
+import pandas as pd
+
+# Columns every strategy may reference without listing them in its combo
+BASE_COLUMNS = ('current_price',)
+INSUFFICIENT_DATA = "Insufficient data"
+
+_COMPARE_OPS = {
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+_BIN_OPS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+
+
+def compile_expression(expr, allowed_names):
+    """
+    Compile a rule expression into a vectorized callable.
+    Args:
+        expr (str): Expression such as "adx_14 > 20 and sma_50 > sma_200".
+        allowed_names (iterable[str]): Column names the expression may reference.
+    Returns:
+        tuple: (fn, names) where fn(columns) takes a dict of {name: np.ndarray}
+               and returns a boolean array, and names is the set of referenced columns.
+    Raises:
+        ValueError: If the expression is malformed or references an unknown column.
+    """
+    try:
+        tree = ast.parse(expr, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid rule expression {expr!r}: {e.msg}") from None
+    allowed_names = set(allowed_names)
+    names = set()
+    fn = _compile_node(tree.body, expr, allowed_names, names)
+    return fn, names
+
+
+def _compile_node(node, expr, allowed_names, names):
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(v, expr, allowed_names, names) for v in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+
+        def bool_op(cols):
+            result = parts[0](cols)
+            for part in parts[1:]:
+                result = combine(result, part(cols))
+            return result
+        return bool_op
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile_node(node.operand, expr, allowed_names, names)
+        if isinstance(node.op, ast.Not):
+            return lambda cols: np.logical_not(operand(cols))
+        if isinstance(node.op, ast.USub):
+            return lambda cols: np.negative(operand(cols))
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.Compare):
+        operands = [_compile_node(node.left, expr, allowed_names, names)]
+        operands += [_compile_node(c, expr, allowed_names, names) for c in node.comparators]
+        ops = []
+        for op in node.ops:
+            if type(op) not in _COMPARE_OPS:
+                raise ValueError(f"Unsupported comparison in rule expression {expr!r}")
+            ops.append(_COMPARE_OPS[type(op)])
+
+        def compare(cols):
+            # Chained comparisons (a < b < c) evaluate as (a < b) and (b < c)
+            values = [o(cols) for o in operands]
+            result = ops[0](values[0], values[1])
+            for i in range(1, len(ops)):
+                result = np.logical_and(result, ops[i](values[i], values[i + 1]))
+            return result
+        return compare
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        left = _compile_node(node.left, expr, allowed_names, names)
+        right = _compile_node(node.right, expr, allowed_names, names)
+        op = _BIN_OPS[type(node.op)]
+        return lambda cols: op(left(cols), right(cols))
+    if isinstance(node, ast.Name):
+        if node.id not in allowed_names:
+            raise ValueError(f"Rule expression {expr!r} references unknown column '{node.id}'")
+        names.add(node.id)
+        name = node.id
+        return lambda cols: cols[name]
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda cols: value
+    raise ValueError(f"Unsupported syntax in rule expression {expr!r}: {ast.dump(node)}")
+
+
+class CompiledStrategy:
+    """A single strategy from the config with its rules compiled to vectorized callables."""
+
+    def __init__(self, name, strategy_type, weight, combo, rules, default):
+        self.name = name
+        self.type = strategy_type
+        self.weight = weight
+        self.combo = list(combo)
+        self.rules = rules  # list of (fn, signal_text)
+        self.default = default
+        self.required_columns = list(dict.fromkeys(self.combo + list(BASE_COLUMNS)))
+
+    def is_available(self, columns):
+        """A strategy is only evaluated when every combo column (and current_price) is present."""
+        return all(c in columns for c in self.required_columns)
+
+    def evaluate(self, cols, n_rows):
+        """Return an array of signal texts, one per row, first matching rule wins."""
+        if not self.rules:
+            return np.full(n_rows, self.default, dtype=object)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            conditions = [np.broadcast_to(np.asarray(fn(cols), dtype=bool), (n_rows,)) for fn, _ in self.rules]
+        choices = np.array([signal for _, signal in self.rules], dtype=object)
+        # Index of the first matching rule, or len(rules) for the default
+        stacked = np.vstack(conditions + [np.ones(n_rows, dtype=bool)])
+        first_match = np.argmax(stacked, axis=0)
+        return np.append(choices, self.default)[first_match]
+
+
+class RuleSet:
+    """
+    All strategies of a config, compiled once. evaluate() scores a whole indicator
+    frame and combines the weighted strategy scores into the combined signal.
+    """
+
+    def __init__(self, strategies, signal_values, bands, band_default, indicators):
+        self.strategies = strategies
+        self.signal_values = signal_values
+        self.bands = bands  # list of (op, threshold, text), checked in order
+        self.band_default = band_default
+        self.indicators = indicators
+
+    @property
+    def names(self):
+        return [s.name for s in self.strategies]
+
+    @property
+    def weights(self):
+        return np.array([s.weight for s in self.strategies], dtype=float)
+
+    def column_arrays(self, df):
+        """Extract every referenced column from df as a float array (missing values become NaN)."""
+        cols = {}
+        for strategy in self.strategies:
+            for c in strategy.required_columns:
+                if c in df.columns and c not in cols:
+                    cols[c] = pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        return cols
+
+    def evaluate(self, df):
+        """
+        Evaluate every strategy over every row of df.
+        Args:
+            df (pd.DataFrame): Indicator frame, one row per ticker (and/or date).
+        Returns:
+            dict with keys:
+              - 'signals': {strategy_name: np.ndarray of signal texts}
+              - 'scores': np.ndarray (n_rows, n_strategies) of numeric signal values
+              - 'available': np.ndarray of bool, one per strategy
+              - 'combined_value': np.ndarray of combined signal values
+              - 'combined_text': np.ndarray of combined signal texts
+        """
+        n_rows = len(df)
+        columns = set(df.columns) & (set(self.indicators) | set(BASE_COLUMNS))
+        cols = self.column_arrays(df)
+        signals = {}
+        scores = np.zeros((n_rows, len(self.strategies)), dtype=float)
+        available = np.zeros(len(self.strategies), dtype=bool)
+        for j, strategy in enumerate(self.strategies):
+            if not strategy.is_available(columns):
+                signals[strategy.name] = np.full(n_rows, INSUFFICIENT_DATA, dtype=object)
+                continue
+            texts = strategy.evaluate(cols, n_rows)
+            signals[strategy.name] = texts
+            scores[:, j] = self.score_signals(texts)
+            available[j] = True
+        combined_value = self.combine_scores(scores, self.weights, available)
+        return {
+            'signals': signals,
+            'scores': scores,
+            'available': available,
+            'combined_value': combined_value,
+            'combined_text': self.interpret(combined_value),
+        }
+
+    def score_signals(self, texts):
+        """Map signal texts to their numeric values from the config's signal_values table."""
+        values = np.zeros(len(texts), dtype=float)
+        for text, value in self.signal_values.items():
+            values[texts == text] = value
+        return values
+
+    @staticmethod
+    def combine_scores(scores, weights, available):
+        """
+        Weighted average of strategy scores over the available strategies.
+        scores may be (n_rows, n_strategies); weights and available are per strategy.
+        """
+        weights = np.where(available, weights, 0.0)
+        total_weight = weights.sum()
+        combined = np.zeros(scores.shape[0], dtype=float)
+        if total_weight <= 0:
+            return combined
+        for j in np.flatnonzero(available):
+            combined += scores[:, j] * (weights[j] / total_weight)
+        return combined
+
+    def interpret(self, values):
+        """Turn combined signal values into their text labels using the configured bands."""
+        values = np.asarray(values, dtype=float)
+        conditions = []
+        choices = []
+        for op, threshold, text in self.bands:
+            conditions.append(values > threshold if op == 'above' else values < threshold)
+            choices.append(text)
+        if not conditions:
+            return np.full(len(values), self.band_default, dtype=object)
+        return np.select(conditions, np.array(choices, dtype=object), default=self.band_default)
+
+
+def compile_rules(config):
+    """
+    Compile the strategies of a credit_spread_indicator config into a RuleSet.
+    Args:
+        config (dict): Configuration loaded from the JSON file.
+    Returns:
+        RuleSet
+    Raises:
+        ValueError: If a strategy references an undeclared indicator, an unknown column,
+                    or emits a signal that has no entry in signal_values.
+    """
+    indicators = config.get('indicators', {})
+    signal_values = config.get('signal_values', {})
+    strategies = []
+    for strategy in config.get('strategies', []):
+        name = strategy['name']
+        combo = strategy.get('combo', [])
+        undeclared = [c for c in combo if c not in indicators]
+        if undeclared:
+            raise ValueError(f"Strategy '{name}' uses undeclared indicators: {undeclared}")
+        default = strategy.get('default', 'neutral')
+        rules = []
+        for rule in strategy.get('rules', []):
+            try:
+                fn, _ = compile_expression(rule['when'], list(combo) + list(BASE_COLUMNS))
+            except ValueError as e:
+                raise ValueError(f"Strategy '{name}': {e}") from None
+            rules.append((fn, rule['signal']))
+        for signal in [s for _, s in rules] + [default]:
+            if signal not in signal_values:
+                raise ValueError(f"Strategy '{name}' emits signal '{signal}' with no entry in signal_values")
+        strategies.append(CompiledStrategy(name, strategy.get('type'), strategy.get('weight', 0), combo, rules, default))
+    combined_cfg = config.get('combined_signal', {})
+    bands = []
+    for band in combined_cfg.get('bands', []):
+        if 'above' in band:
+            bands.append(('above', float(band['above']), band['text']))
+        elif 'below' in band:
+            bands.append(('below', float(band['below']), band['text']))
+        else:
+            raise ValueError(f"Combined signal band needs 'above' or 'below': {band}")
+    return RuleSet(strategies, signal_values, bands, combined_cfg.get('default', 'Neutral'), indicators)
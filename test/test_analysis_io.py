@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import json
+import tempfile
+from utils.analysis_io import write_analysis_jsonl, iter_analysis, load_analysis
+
+SAMPLE = [
+    {
+        "ticker": "AAA",
+        "signals": {
+            "Trend Crossover: SMA": {"signal": "strongly bullish", "type": "trend_crossover", "weight": 9},
+            "MACD Crossover": {"signal": "bearish crossover", "type": "momentum_shift", "weight": 6},
+        },
+        "combined_signal": {"value": 1.5, "text": "Strongly Bullish"},
+        "earnings_nearby": False,
+        "earnings_date": "2025-07-24",
+        "days_to_earnings": 51,
+        "current_price": 10.5,
+        "high_52w": 12.0,
+        "low_52w": 8.0,
+    },
+    {
+        "ticker": "BBB",
+        "signals": {
+            "Trend Crossover: SMA": {"signal": "strongly bearish", "type": "trend_crossover", "weight": 9},
+            "MACD Crossover": {"signal": "neutral", "type": "momentum_shift", "weight": 6},
+        },
+        "combined_signal": {"value": -2.0, "text": "Strongly Bearish"},
+        "earnings_nearby": True,
+        "earnings_date": None,
+        "days_to_earnings": None,
+        "current_price": 20.0,
+        "high_52w": 30.0,
+        "low_52w": 19.0,
+    },
+]
+
+
+class TestAnalysisIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.tmp.name, 'bull_bear_analysis_2025-01-01.json')
+        with open(self.json_path, 'w') as f:
+            json.dump(SAMPLE, f, indent=2)
+        write_analysis_jsonl(self.json_path + 'l', SAMPLE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        self.assertEqual(list(iter_analysis(self.json_path + 'l')), SAMPLE)
+
+    def test_field_selection_skips_signals(self):
+        records = load_analysis(self.json_path, fields=['ticker', 'combined_signal', 'earnings_nearby'])
+        self.assertEqual(records[1], {"ticker": "BBB", "combined_signal": {"value": -2.0, "text": "Strongly Bearish"}, "earnings_nearby": True})
+
+    def test_signals_text_inside_a_value(self):
+        # Summary values that look like the signals field must not end the record early
+        tricky = [dict(SAMPLE[0], ticker='A,"signals":["x"]}', earnings_date='"signals":')]
+        path = os.path.join(self.tmp.name, 'tricky.jsonl')
+        write_analysis_jsonl(path, tricky)
+        records = list(iter_analysis(path, fields=['ticker', 'earnings_date', 'current_price']))
+        self.assertEqual(records, [{'ticker': tricky[0]['ticker'], 'earnings_date': '"signals":', 'current_price': 10.5}])
+        self.assertEqual(list(iter_analysis(path)), tricky)
+
+    def test_legacy_json_when_compact_missing(self):
+        os.remove(self.json_path + 'l')
+        self.assertEqual(load_analysis(self.json_path), SAMPLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.engine import PricePanel, run_backtest, win_rates
+
+
+class TestBacktestEngine(unittest.TestCase):
+    def setUp(self):
+        dates = [f'2023-01-{d:02d}' for d in (2, 9, 16, 23, 30)]
+        prices = np.array([
+            [100.0, 50.0],
+            [95.0, 51.0],
+            [89.0, np.nan],
+            [92.0, 52.0],
+            [96.0, 53.0],
+        ])
+        self.panel = PricePanel(dates, ['AAA', 'BBB'], prices)
+        self.entries = pd.DataFrame({
+            'date': ['2023-01-02', '2023-01-02', '2023-01-23'],
+            'ticker': ['AAA', 'BBB', 'AAA'],
+            'entry_price': [100.0, 50.0, 92.0],
+            'combined_signal_value': pd.Series([2, 1.5, 2], dtype=object),
+            'combined_signal_text': ['Strongly Bullish'] * 3,
+        })
+
+    def test_breaches_and_exits(self):
+        result = run_backtest(self.panel, self.entries, [0.10, 0.05], [1, 2])
+        self.assertEqual(len(result), 3 * 2 * 2)
+        aaa = result[(result['ticker'] == 'AAA') & (result['date'] == '2023-01-02')]
+        # Exits one and two samples later: 95 and 89; 89 is below both strikes (90, 95)
+        self.assertEqual(aaa['exit_price'].tolist(), [95.0, 89.0, 95.0, 89.0])
+        self.assertEqual(aaa['breached'].tolist(), [False, True, False, True])
+        self.assertEqual(aaa['path_min'].tolist(), [95.0, 89.0, 95.0, 89.0])
+        # Window runs out after one sample for the last entry
+        late = result[result['date'] == '2023-01-23']
+        self.assertTrue(np.isnan(late[late['holding_days'] == 2]['exit_price']).all())
+        self.assertEqual(aaa['breaches_5d'].iloc[0], 1)
+        # Missing prices are skipped, not counted
+        self.assertEqual(result[result['ticker'] == 'BBB']['breaches_25d'].iloc[0], 0)
+
+    def test_win_rates(self):
+        result = run_backtest(self.panel, self.entries, [0.10], [2])
+        summary = win_rates(result)
+        self.assertEqual(summary[['total', 'wins']].values.tolist(), [[3, 2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
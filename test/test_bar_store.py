@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.bar_store import BarStore
+from backtest.engine import run_path_backtest
+
+
+def _bars(dates, closes, lows):
+    return [{'date': d, 'open': c, 'high': c + 1, 'low': l, 'close': c} for d, c, l in zip(dates, closes, lows)]
+
+
+class TestPathBacktest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = BarStore(os.path.join(self.tmp, 'bars'), os.path.join(self.tmp, 'cache'))
+        # 2023-01-16 is MLK day: the path skips it
+        dates = ['2023-01-09', '2023-01-10', '2023-01-11', '2023-01-12', '2023-01-13', '2023-01-17', '2023-01-18']
+        self.store.write('AAA', _bars(dates, [100, 97, 94, 96, 98, 99, 101], [99, 96, 89, 95, 97, 98, 100]))
+        self.store.write('BBB', _bars(dates[:3], [50, 51, 52], [49, 50, 51]))
+        # Dated the day after the 01-09 close they enter at
+        self.entries = pd.DataFrame({
+            'date': ['2023-01-10', '2023-01-10'],
+            'ticker': ['AAA', 'BBB'],
+            'entry_price': [100.0, 50.0],
+            'combined_signal_value': pd.Series([2, 1.5], dtype=object),
+            'combined_signal_text': ['Strongly Bullish'] * 2,
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_load_aligns_to_sessions_and_caches(self):
+        bars = self.store.load(['AAA', 'BBB', 'ZZZ'])
+        self.assertEqual(str(bars.sessions[5]), '2023-01-17')
+        self.assertTrue(np.isnan(bars.close[3:, 1]).all())
+        self.assertTrue(np.isnan(bars.close[:, 2]).all())
+        self.assertEqual(len(os.listdir(os.path.join(self.tmp, 'cache'))), 1)
+        np.testing.assert_array_equal(self.store.load(['AAA', 'BBB', 'ZZZ']).close, bars.close)
+
+    def test_cache_is_replaced_and_pruned(self):
+        cache_dir = os.path.join(self.tmp, 'cache')
+        self.store.load(['AAA', 'BBB'])
+        # New bars change the file's mtime: the set's cache is rebuilt in place
+        self.store.write('BBB', _bars(['2023-01-11', '2023-01-12'], [52, 53], [51, 52]))
+        os.utime(self.store.path('BBB'), (0, 0))
+        bars = self.store.load(['AAA', 'BBB'])
+        self.assertEqual(bars.close[3, 1], 53.0)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        for tickers in (['AAA'], ['BBB'], ['AAA', 'ZZZ']):
+            self.store.load(tickers)
+        self.assertEqual(len(os.listdir(cache_dir)), 4)
+        self.assertEqual(len(self.store.prune_cache(keep=2)), 2)
+        self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_first_touch_and_mae(self):
+        bars = self.store.load(['AAA', 'BBB'])
+        closes = run_path_backtest(bars, self.entries, [0.05], [2, 5])
+        aaa = closes[closes['ticker'] == 'AAA']
+        # Closes 97, 94, ...: the 95 strike is first closed below on the second session
+        self.assertEqual(aaa['first_touch_date'].tolist(), ['2023-01-11', '2023-01-11'])
+        self.assertEqual(aaa['days_to_touch'].tolist(), [2.0, 2.0])
+        self.assertEqual(aaa['breached'].tolist(), [True, False])
+        self.assertEqual(aaa['exit_date'].tolist(), ['2023-01-11', '2023-01-17'])
+        self.assertEqual(aaa['mae_pct'].tolist(), [-6.0, -6.0])
+        bbb = closes[closes['ticker'] == 'BBB']
+        self.assertEqual(bbb['touched'].tolist(), [False, False])
+        self.assertEqual(bbb['mae_pct'].tolist(), [0.0, 0.0])
+        self.assertTrue(pd.isna(bbb['exit_date'].tolist()[1]))
+
+        lows = run_path_backtest(bars, self.entries, [0.05, 0.10], [1, 5], use_lows=True)
+        aaa = lows[lows['ticker'] == 'AAA']
+        # The 89 low on 01-11 touches the 90 strike that closes never reach
+        self.assertEqual(aaa['touched'].tolist(), [False, True, False, True])
+        self.assertEqual(aaa['mae_pct'].tolist(), [-4.0, -11.0, -4.0, -11.0])
+
+    def test_one_session_hold_exits_on_the_rebalance_date(self):
+        bars = self.store.load(['AAA'])
+        # A rebalance on Tuesday 01-17 enters at Friday's 98 close (Monday is a holiday)
+        entries = self.entries.iloc[:1].assign(date='2023-01-17', entry_price=98.0)
+        result = run_path_backtest(bars, entries, [0.05], [1, 2])
+        self.assertEqual(result['exit_date'].tolist(), ['2023-01-17', '2023-01-18'])
+        self.assertEqual(result['exit_price'].tolist(), [99.0, 101.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gzip
+import hashlib
+import shutil
+import tempfile
+import unittest
+import uuid
+from utils.blob_uploader import BlobUploader, prepare_payload, AZURITE_CONNECTION_STRING, HASH_METADATA_KEY
+
+try:
+    import azure.storage.blob
+except ImportError:
+    azure = None
+
+# Set to run the upload tests against a local emulator, e.g. `azurite-blob --inMemoryPersistence`
+AZURITE = os.getenv('AZURITE_CONNECTION_STRING') or (AZURITE_CONNECTION_STRING if os.getenv('RUN_AZURITE_TESTS') else None)
+
+
+class TestPreparePayload(unittest.TestCase):
+    def test_text_is_gzipped_and_hashed_uncompressed(self):
+        data = 'ticker,current_price\n' + 'AAPL,190.5\n' * 200
+        payload, digest, content_type, encoding = prepare_payload('output/indicators_2024-06-07.csv', data)
+        self.assertEqual(encoding, 'gzip')
+        self.assertEqual(content_type, 'text/csv')
+        self.assertEqual(gzip.decompress(payload).decode('utf-8'), data)
+        self.assertEqual(digest, hashlib.sha256(data.encode('utf-8')).hexdigest())
+        self.assertLess(len(payload), len(data))
+        # Deterministic, so unchanged content gives unchanged bytes
+        self.assertEqual(payload, prepare_payload('output/indicators_2024-06-07.csv', data)[0])
+
+    def test_binary_and_disabled_compression_upload_as_is(self):
+        payload, _, content_type, encoding = prepare_payload('chains/AAPL.pkl', b'\x80\x05data')
+        self.assertEqual((payload, encoding, content_type), (b'\x80\x05data', None, 'application/octet-stream'))
+        payload, _, _, encoding = prepare_payload('report.json', '{}', compress=False)
+        self.assertEqual((payload, encoding), (b'{}', None))
+
+
+@unittest.skipIf(azure is None or not AZURITE, "Azure SDK not installed or Azurite not configured")
+class TestAzuriteUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.container = f'test-{uuid.uuid4().hex[:12]}'
+        self.paths = []
+        for name in ('indicators_2024-06-07.csv', 'bull_bear_analysis_2024-06-07.json'):
+            path = os.path.join(self.tmp, 'output', name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write(f'{name}\n' * 100)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        from azure.storage.blob import BlobServiceClient
+        BlobServiceClient.from_connection_string(AZURITE).delete_container(self.container)
+
+    def test_uploads_once_then_skips_unchanged(self):
+        with BlobUploader(AZURITE, self.container) as uploader:
+            first = uploader.upload_files(self.paths, base_dir=self.tmp, prefix='2024-06-07/')
+            self.assertEqual(set(first.values()), {'uploaded'})
+            with open(self.paths[0], 'a') as f:
+                f.write('changed\n')
+            second = uploader.upload_files(self.paths, base_dir=self.tmp, prefix='2024-06-07/')
+            self.assertEqual([second[p] for p in self.paths], ['uploaded', 'skipped'])
+            blob = uploader.container_client.get_blob_client('2024-06-07/output/indicators_2024-06-07.csv')
+            properties = blob.get_blob_properties()
+            self.assertEqual(properties.content_settings.content_encoding, 'gzip')
+            with open(self.paths[0], 'rb') as f:
+                self.assertEqual(properties.metadata[HASH_METADATA_KEY], hashlib.sha256(f.read()).hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.bootstrap import bootstrap_win_rates
+from backtest.engine import win_rates
+
+
+def _result(n_weeks=40, per_week=20, seed=5):
+    # Each week's trades win or lose together for the 5% protection, independently for 10%
+    rng = np.random.default_rng(seed)
+    dates = np.repeat([f'week{w:02d}' for w in range(n_weeks)], per_week)
+    frames = []
+    for protection in (0.10, 0.05):
+        if protection == 0.05:
+            breached = np.repeat(rng.random(n_weeks) < 0.3, per_week)
+        else:
+            breached = rng.random(n_weeks * per_week) < 0.3
+        frames.append(pd.DataFrame({'date': dates, 'protection': protection, 'holding_days': 5, 'breached': breached}))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestBootstrap(unittest.TestCase):
+    def test_counts_match_win_rates(self):
+        result = _result()
+        intervals = bootstrap_win_rates(result, block='week', n_samples=500)
+        summary = win_rates(result)
+        self.assertEqual(intervals['total'].tolist(), summary['total'].tolist())
+        self.assertEqual(intervals['wins'].tolist(), summary['wins'].tolist())
+        self.assertEqual(intervals['blocks'].tolist(), [40, 40])
+        self.assertTrue(((intervals['ci_low'] <= intervals['win_rate']) & (intervals['win_rate'] <= intervals['ci_high'])).all())
+
+    def test_week_blocks_widen_clustered_intervals(self):
+        result = _result()
+        by_trade = bootstrap_win_rates(result, block='trade').set_index('protection')
+        by_week = bootstrap_win_rates(result, block='week').set_index('protection')
+        width = lambda frame: frame['ci_high'] - frame['ci_low']
+        # Clustered outcomes: resampling trades treats 800 trades as independent and is far too narrow
+        self.assertGreater(width(by_week).loc[0.05], 3 * width(by_trade).loc[0.05])
+        # Independent outcomes: both agree roughly
+        self.assertLess(abs(width(by_week).loc[0.10] - width(by_trade).loc[0.10]), 0.5 * width(by_trade).loc[0.10])
+
+    def test_trade_intervals_match_resampling(self):
+        result = _result()
+        wins = ~result.loc[result['protection'] == 0.10, 'breached'].to_numpy()
+        rng = np.random.default_rng(1)
+        resampled = wins[rng.integers(0, len(wins), size=(4000, len(wins)))].mean(axis=1)
+        expected = np.quantile(resampled, [0.025, 0.975])
+        row = bootstrap_win_rates(result, block='trade').set_index('protection').loc[0.10]
+        self.assertAlmostEqual(row['ci_low'], expected[0], delta=0.01)
+        self.assertAlmostEqual(row['ci_high'], expected[1], delta=0.01)
+
+    def test_seed_makes_intervals_repeatable(self):
+        result = _result()
+        pd.testing.assert_frame_equal(bootstrap_win_rates(result, block='week', seed=3),
+                                      bootstrap_win_rates(result, block='week', seed=3))
+        with self.assertRaises(ValueError):
+            bootstrap_win_rates(result, block='month')
+
+
+if __name__ == '__main__':
+    unittest.main()
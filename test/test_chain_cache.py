@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from trade_generator.chain_cache import ChainCache
+
+
+class TestChainCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.captured = datetime(2025, 6, 6, 10, 0, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_freshness_window(self):
+        ChainCache(self.cache_dir).put('aapl', '2025-06-20', {'price': 1}, captured=self.captured)
+        ChainCache(self.cache_dir).put('AAPL', '2025-06-20', {'price': 2}, captured=self.captured + timedelta(minutes=10))
+        cache = ChainCache(self.cache_dir, max_age_minutes=30)
+        self.assertEqual(cache.get('AAPL', '2025-06-20', now=self.captured + timedelta(minutes=20)), {'price': 2})
+        self.assertIsNone(cache.get('AAPL', '2025-06-20', now=self.captured + timedelta(minutes=45)))
+        self.assertIsNone(cache.get('AAPL', '2025-07-18', now=self.captured))
+        forced = ChainCache(self.cache_dir, force_refresh=True)
+        self.assertIsNone(forced.get('AAPL', '2025-06-20', now=self.captured + timedelta(minutes=20)))
+
+    def test_prune(self):
+        cache = ChainCache(self.cache_dir)
+        cache.put('AAPL', 'underlying', (('2025-06-20',), 200.0), captured=self.captured)
+        self.assertEqual(cache.prune(retention_days=7, now=self.captured + timedelta(days=1)), 0)
+        self.assertEqual(cache.prune(retention_days=7, now=self.captured + timedelta(days=8)), 1)
+        self.assertIsNone(cache.get('AAPL', 'underlying', now=self.captured))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import base64
+import gzip
+import shutil
+import tempfile
+import time
+import unittest
+from email_utils.email_templates import render_report, render_table, encode_attachments, COMPRESS_MIN_BYTES
+
+
+def _entries(n, signal='Strongly Bullish'):
+    return [{
+        'ticker': f'T{i}', 'current_price': 100.0 + i, 'high_52w': 150.0, 'low_52w': 80.0,
+        'signals': {'trend': {'signal': signal}, 'momentum': {'signal': 'Neutral'}},
+    } for i in range(n)]
+
+
+class TestEmailTemplates(unittest.TestCase):
+    def test_style_block_once_and_rows_bounded(self):
+        started = time.perf_counter()
+        page = render_report([
+            ('Strongly Bullish Stocks', _entries(5000), 'strongly bullish', '#2e8b57'),
+            ('Strongly Bearish Stocks', _entries(3, 'Strongly Bearish'), 'strongly bearish', '#b22222'),
+            ('Neutral Stocks', [], 'neutral', '#4682b4'),
+        ], '2024-06-07', max_rows=50)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(page.count('<style>'), 1)
+        self.assertEqual(page.count('<tr style="background:#fff;">'), 53)
+        self.assertIn('... and 4950 more strongly bullish stocks', page)
+        self.assertIn('No Neutral stocks today.', page)
+        self.assertIn("<td style='border:1px solid #ddd;padding:8px;'>trend</td>", page)
+        self.assertIn('Generated on 2024-06-07', page)
+
+    def test_values_are_escaped(self):
+        entry = _entries(1)[0]
+        entry['ticker'] = 'A<B>&$x'
+        table = render_table([entry], 'strongly bullish', '#2e8b57')
+        self.assertIn('A&lt;B&gt;&amp;$x', table)
+
+
+class TestAttachments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_content_types_and_compression(self):
+        big = self._write('bull_bear_analysis_2024-06-07.json', b'{"ticker": "AAPL"}\n' * COMPRESS_MIN_BYTES)
+        small = self._write('bull_bear_trades_summary_2024-06-07.csv', b'ticker,credit\nAAPL,1.2\n')
+        attachments, skipped = encode_attachments([big, small, small, None, os.path.join(self.tmp, 'missing.csv')])
+        self.assertEqual(skipped, [])
+        self.assertEqual([(a['name'], a['contentType']) for a in attachments], [
+            ('bull_bear_analysis_2024-06-07.json.gz', 'application/gzip'),
+            ('bull_bear_trades_summary_2024-06-07.csv', 'text/csv'),
+        ])
+        with open(big, 'rb') as f:
+            self.assertEqual(gzip.decompress(base64.b64decode(attachments[0]['contentInBase64'])), f.read())
+
+    def test_size_limit_skips_later_files(self):
+        first = self._write('a.csv', b'x' * 100)
+        second = self._write('b.csv', b'y' * 100)
+        attachments, skipped = encode_attachments([first, second], compress=False, max_bytes=150)
+        self.assertEqual([a['name'] for a in attachments], ['a.csv'])
+        self.assertEqual(skipped, [second])
+
+
+if __name__ == '__main__':
+    unittest.main()
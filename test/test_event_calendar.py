@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+from data.event_calendar import CorporateEventCalendar
+
+
+class TestCorporateEventCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = CorporateEventCalendar.from_events({
+            'AAA': {'earnings_date': '2025-06-10', 'ex_dividend_date': '2025-06-05'},
+            'BBB': {'earnings_date': '2025-05-01'},
+            'CCC': {'earnings_date': 'not a date'},
+            'DDD': None,
+        })
+
+    def test_days_to_earnings(self):
+        days = self.calendar.days_to_earnings(as_of='2025-06-03')
+        self.assertEqual(days[0], 7)
+        # Passed, unparseable and missing dates are all unknown
+        self.assertTrue(np.isnan(days[1:]).all())
+        self.assertEqual(self.calendar.earnings_within(10, as_of='2025-06-03').tolist(), [True, False, False, False])
+        self.assertEqual(self.calendar.earnings_within(5, as_of='2025-06-03').tolist(), [False, False, False, False])
+
+    def test_event_before_expiry(self):
+        result = self.calendar.event_before(['2025-06-20', '2025-06-06', '2025-06-20', '2025-06-20'], ['AAA', 'AAA', 'DDD', 'ZZZ'])
+        self.assertEqual(result.tolist(), [True, False, False, False])
+        ex_div = self.calendar.event_before(['2025-06-06'], 'AAA', event='ex_dividend_date')
+        self.assertTrue(ex_div[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
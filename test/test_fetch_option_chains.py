@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# bull_bear_credit_trades imports strategy_json_parser as a top-level module
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'trade_generator')))
+
+import threading
+import time
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+import pandas as pd
+from trade_generator import bull_bear_credit_trades
+
+
+def _chain(S):
+    strikes = [S * 0.9, S, S * 1.1]
+    return pd.DataFrame({'strike': strikes, 'bid': [1.0, 2.0, 1.0], 'ask': [1.2, 2.2, 1.2], 'lastPrice': [1.1, 2.1, 1.1],
+                         'impliedVolatility': 0.3})
+
+
+class FakeTicker:
+    """yf.Ticker stand-in: counts requests, fails where told to, answers in a scrambled order."""
+    calls = Counter()
+    lock = threading.Lock()
+    failing_tickers = {'BAD'}
+    failing_chains = {('FLAKY', 1)}  # (ticker, expiration index)
+
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.expirations = [(datetime.now() + timedelta(weeks=w)).strftime('%Y-%m-%d') for w in (2, 4, 6)]
+
+    def _count(self, kind):
+        with self.lock:
+            self.calls[(self.ticker, kind)] += 1
+
+    @property
+    def options(self):
+        self._count('options')
+        if self.ticker in self.failing_tickers:
+            raise RuntimeError('no data')
+        return tuple(self.expirations)
+
+    def history(self, period):
+        self._count('history')
+        return pd.DataFrame({'Close': [100.0 + len(self.ticker)]})
+
+    def option_chain(self, expiration):
+        self._count('option_chain')
+        index = self.expirations.index(expiration)
+        # Later expirations finish first
+        time.sleep(0.01 * (3 - index))
+        if (self.ticker, index) in self.failing_chains:
+            raise RuntimeError('timeout')
+        S = 100.0 + len(self.ticker)
+        return SimpleNamespace(calls=_chain(S), puts=_chain(S))
+
+
+class TestFetchOptionChains(unittest.TestCase):
+    def setUp(self):
+        FakeTicker.calls.clear()
+        patcher = mock.patch.object(bull_bear_credit_trades.yf, 'Ticker', FakeTicker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_order_requests_and_failures(self):
+        tickers = ['ZZ', 'BAD', 'AAPL', 'FLAKY', 'ZZ']
+        chains = bull_bear_credit_trades.fetch_option_chains(tickers, max_workers=4)
+        self.assertEqual(list(chains), ['ZZ', 'BAD', 'AAPL', 'FLAKY'])
+        expirations = FakeTicker('X').expirations
+        # Every chain in week-offset order, whatever order the requests finished in
+        for ticker in ('ZZ', 'AAPL'):
+            self.assertEqual([exp for _, _, _, exp in chains[ticker]], expirations)
+            self.assertTrue(all(S == 100.0 + len(ticker) for _, _, S, _ in chains[ticker]))
+            self.assertIn('delta', chains[ticker][0][1])
+        # A failing ticker is empty and a failing expiration is dropped; the rest are kept
+        self.assertEqual(chains['BAD'], [])
+        self.assertEqual([exp for _, _, _, exp in chains['FLAKY']], [expirations[0], expirations[2]])
+        # One expirations lookup and one price per ticker, one request per chain
+        for ticker in ('ZZ', 'AAPL', 'FLAKY'):
+            self.assertEqual(FakeTicker.calls[(ticker, 'options')], 1)
+            self.assertEqual(FakeTicker.calls[(ticker, 'history')], 1)
+            self.assertEqual(FakeTicker.calls[(ticker, 'option_chain')], 3)
+        self.assertEqual(FakeTicker.calls[('BAD', 'history')], 0)
+
+    def test_serial_fetch_matches_pooled(self):
+        pooled = bull_bear_credit_trades.fetch_option_chains(['AAPL', 'FLAKY'], max_workers=8)
+        serial = bull_bear_credit_trades.fetch_option_chains(['AAPL', 'FLAKY'], max_workers=1)
+        for ticker in pooled:
+            self.assertEqual([exp for *_, exp in pooled[ticker]], [exp for *_, exp in serial[ticker]])
+            for (calls_a, puts_a, _, _), (calls_b, puts_b, _, _) in zip(pooled[ticker], serial[ticker]):
+                pd.testing.assert_frame_equal(puts_a, puts_b)
+
+
+if __name__ == '__main__':
+    unittest.main()
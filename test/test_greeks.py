@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from trade_generator.greeks import bs_greeks, bs_price
+from trade_generator.iv_solver import fill_missing_iv, implied_volatility
+
+try:
+    import mibian
+except ImportError:
+    mibian = None
+
+
+class TestGreeks(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.S = rng.uniform(20, 500, 50)
+        self.K = self.S * rng.uniform(0.7, 1.3, 50)
+        self.days = rng.integers(1, 90, 50)
+        self.iv = rng.uniform(0.1, 1.2, 50)
+
+    def test_put_call_parity(self):
+        call = bs_price(self.S, self.K, self.days, 5.0, self.iv, 'call')
+        put = bs_price(self.S, self.K, self.days, 5.0, self.iv, 'put')
+        parity = self.S - self.K * np.exp(-0.05 * self.days / 365.0)
+        np.testing.assert_allclose(call - put, parity, atol=1e-9)
+
+    def test_missing_iv_gives_nan(self):
+        greeks = bs_greeks(100.0, [90.0, 100.0, 110.0], 30, 5.0, [np.nan, 0.0, 0.3], 'put')
+        self.assertTrue(np.isnan(greeks['delta'][:2]).all())
+        self.assertFalse(np.isnan(greeks['delta'][2]))
+
+    def test_implied_volatility_round_trip(self):
+        types = np.where(np.arange(len(self.S)) % 2 == 0, 'call', 'put')
+        prices = bs_price(self.S, self.K, self.days, 5.0, self.iv, types)
+        iv, converged = implied_volatility(prices, self.S, self.K, self.days, 5.0, types)
+        self.assertTrue(converged.all())
+        np.testing.assert_allclose(bs_price(self.S, self.K, self.days, 5.0, iv, types), prices, atol=1e-5)
+        # A price below intrinsic value has no solution
+        iv, converged = implied_volatility([0.5], 100.0, [110.0], 30, 5.0, 'put')
+        self.assertFalse(converged[0])
+        self.assertTrue(np.isnan(iv[0]))
+
+    def test_fill_missing_iv_from_the_mid(self):
+        strikes = np.array([90.0, 95.0, 100.0, 105.0, 110.0])
+        mids = bs_price(100.0, strikes, 30, 5.0, np.array([0.25, 0.35, 0.40, 0.30, 0.30]), 'put')
+        chain = pd.DataFrame({
+            'strike': strikes,
+            'bid': mids - 0.05,
+            'ask': mids + 0.05,
+            # Market, missing, zero, yfinance's ~0 placeholder, and an unquoted contract
+            'impliedVolatility': [0.25, np.nan, 0.0, 1e-05, np.nan],
+        })
+        chain.loc[4, ['bid', 'ask']] = 0.0
+        filled = fill_missing_iv(chain, 100.0, 5.0, 30, 'put')
+        self.assertEqual(filled['iv_source'].tolist(), ['market', 'solved', 'solved', 'solved', 'missing'])
+        self.assertEqual(filled['impliedVolatility'][0], 0.25)
+        solved = filled['iv_source'] == 'solved'
+        np.testing.assert_allclose(filled['impliedVolatility'][solved], [0.35, 0.40, 0.30], atol=1e-6)
+        np.testing.assert_allclose(bs_price(100.0, strikes[solved], 30, 5.0, filled['impliedVolatility'][solved], 'put'),
+                                   mids[solved], atol=1e-5)
+        self.assertTrue(np.isnan(filled['impliedVolatility'][4]))
+        # The input chain is left as it was
+        self.assertTrue(np.isnan(chain['impliedVolatility'][1]))
+        self.assertNotIn('iv_source', chain)
+
+    @unittest.skipIf(mibian is None, "mibian not installed")
+    def test_matches_mibian(self):
+        for option_type in ('call', 'put'):
+            greeks = bs_greeks(self.S, self.K, self.days, 5.0, self.iv, option_type)
+            prefix = 'call' if option_type == 'call' else 'put'
+            for i in range(len(self.S)):
+                ref = mibian.BS([self.S[i], self.K[i], 5.0, self.days[i]], volatility=self.iv[i] * 100)
+                self.assertAlmostEqual(greeks['delta'][i], getattr(ref, f'{prefix}Delta'), places=9)
+                self.assertAlmostEqual(greeks['gamma'][i], ref.gamma, places=9)
+                self.assertAlmostEqual(greeks['theta'][i], getattr(ref, f'{prefix}Theta'), places=9)
+                self.assertAlmostEqual(greeks['vega'][i], ref.vega, places=9)
+                self.assertAlmostEqual(greeks['rho'][i], getattr(ref, f'{prefix}Rho'), places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from indicators.incremental import IndicatorState
+
+
+# pandas_ta definitions, written out with plain pandas
+def _ema(close, length):
+    seeded = close.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = close.iloc[:length].mean()
+    return seeded.ewm(span=length, adjust=False).mean()
+
+
+def _rma(values, length):
+    return values.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def _reference(close, high, low):
+    change = close.diff()
+    rsi = 100 * _rma(change.clip(lower=0), 14) / (_rma(change.clip(lower=0), 14) + _rma((-change).clip(lower=0), 14))
+    macd = _ema(close, 12) - _ema(close, 26)
+    signal = _ema(macd.dropna().reset_index(drop=True), 9)
+    prev_close = close.shift()
+    true_range = pd.concat([high - low, (high - prev_close).abs(), (prev_close - low).abs()], axis=1).max(axis=1)
+    true_range.iloc[0] = np.nan
+    atr = _rma(true_range, 14)
+    up, down = high.diff(), -low.diff()
+    plus = ((up > down) & (up > 0)) * up
+    minus = ((down > up) & (down > 0)) * down
+    plus.iloc[0] = minus.iloc[0] = np.nan
+    dmp, dmn = 100 * _rma(plus, 14) / atr, 100 * _rma(minus, 14) / atr
+    adx = _rma(100 * (dmp - dmn).abs() / (dmp + dmn), 14)
+    return {
+        'rsi_14': rsi.iloc[-1],
+        'sma_50': close.rolling(50).mean().iloc[-1],
+        'ema_20': _ema(close, 20).iloc[-1],
+        'ema_200': _ema(close, 200).iloc[-1],
+        'macd': macd.iloc[-1],
+        'macd_signal': signal.iloc[-1],
+        'bb_upper': close.rolling(20).mean().iloc[-1] + 2 * close.rolling(20).std(ddof=0).iloc[-1],
+        'atr_14': atr.iloc[-1],
+        'adx_14': adx.iloc[-1],
+        'support_75': close.iloc[-75:].min(),
+        'resistance_200': close.iloc[-200:].max(),
+    }
+
+
+class TestIncrementalIndicators(unittest.TestCase):
+    def test_matches_batch_definitions(self):
+        rng = np.random.default_rng(7)
+        n_sessions = 320
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, (n_sessions, 2)), axis=0))
+        high = close * (1 + rng.uniform(0, 0.02, close.shape))
+        low = close * (1 - rng.uniform(0, 0.02, close.shape))
+        # Second ticker lists late and misses a few sessions
+        for matrix in (close, high, low):
+            matrix[:40, 1] = np.nan
+            matrix[[100, 101, 250], 1] = np.nan
+        state = IndicatorState(2)
+        for i in range(n_sessions):
+            state.update(close[i], high[i], low[i])
+        snapshot = state.snapshot()
+        for t in range(2):
+            bars = ~np.isnan(close[:, t])
+            expected = _reference(*(pd.Series(m[bars, t]) for m in (close, high, low)))
+            for column, value in expected.items():
+                self.assertAlmostEqual(snapshot[column][t], value, places=6, msg=f'{column} ticker {t}')
+
+    def test_not_enough_bars(self):
+        state = IndicatorState(1)
+        for price in (10.0, 11.0, 12.0):
+            state.update(np.array([price]))
+        snapshot = state.snapshot()
+        self.assertEqual(snapshot['current_price'][0], 12.0)
+        self.assertEqual(snapshot['previous_close'][0], 11.0)
+        self.assertTrue(np.isnan(snapshot['sma_20'][0]))
+        self.assertTrue(np.isnan(snapshot['rsi_14'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
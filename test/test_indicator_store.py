@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data.indicator_store import IndicatorStore
+
+
+def _day(prices, earnings=None):
+    tickers = ['AAPL', 'MSFT', 'NA']
+    return pd.DataFrame({
+        'ticker': tickers,
+        'current_price': prices,
+        'rsi_14': ['55.5', '', 'bad'],
+        'sma_50': [100.0, None, 50.0],
+        'earnings_date': earnings or ['2024-07-25', None, 'N/A'],
+        'dividend_date': [None, None, None],
+    })
+
+
+class TestIndicatorStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = IndicatorStore(os.path.join(self.tmp, 'store'))
+        for i, date_str in enumerate(['2024-06-03', '2024-06-04', '2024-06-05']):
+            self.store.append(_day([190.0 + i, 420.0 + i, 10.0 + i]), date_str)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_typed_columns(self):
+        frame = self.store.read()
+        self.assertEqual(len(frame), 9)
+        self.assertEqual(frame['rsi_14'].dtype, np.float64)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(frame['date']))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(frame['earnings_date']))
+        first = frame.iloc[0]
+        self.assertEqual((first['ticker'], first['rsi_14']), ('AAPL', 55.5))
+        self.assertEqual(first['earnings_date'], pd.Timestamp('2024-07-25'))
+        self.assertTrue(np.isnan(frame.loc[frame['ticker'] == 'NA', 'rsi_14']).all())
+        self.assertTrue(frame.loc[frame['ticker'] == 'NA', 'earnings_date'].isna().all())
+
+    def test_filters_dates_tickers_and_columns(self):
+        frame = self.store.read(start='2024-06-04', end='2024-06-05', tickers=['NA', 'MSFT'], columns=['current_price'])
+        self.assertEqual(list(frame.columns), ['date', 'ticker', 'current_price'])
+        self.assertEqual(frame['ticker'].tolist(), ['MSFT', 'NA', 'MSFT', 'NA'])
+        self.assertEqual(frame['current_price'].tolist(), [421.0, 11.0, 422.0, 12.0])
+        self.assertTrue(self.store.read(start='2025-01-01').empty)
+
+    def test_append_replaces_the_day(self):
+        self.store.append(_day([1.0, 2.0, 3.0]), '2024-06-04')
+        self.assertEqual(self.store.dates(), ['2024-06-03', '2024-06-04', '2024-06-05'])
+        frame = self.store.read(start='2024-06-04', end='2024-06-04', tickers=['AAPL'])
+        self.assertEqual(frame['current_price'].tolist(), [1.0])
+
+    def test_import_csvs(self):
+        csv_dir = os.path.join(self.tmp, 'csv')
+        os.makedirs(csv_dir)
+        _day([5.0, 6.0, 7.0]).to_csv(os.path.join(csv_dir, 'indicators_2024-06-06.csv'), index=False)
+        self.assertEqual(self.store.import_csvs(csv_dir), ['2024-06-06'])
+        frame = self.store.read(start='2024-06-06', tickers=['NA'])
+        self.assertEqual(frame['current_price'].tolist(), [7.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from trade_generator.greeks import bs_price, chain_greeks
+from trade_generator.multi_leg import delta_window_pairs, search_iron_condors, search_strangles
+
+
+def synthetic_chain(option_type, S=100.0, days=30):
+    strikes = np.arange(70.0, 131.0, 1.0)
+    iv = 0.3 + 0.003 * np.abs(S - strikes)
+    price = bs_price(S, strikes, days, 5.0, iv, option_type)
+    chain = pd.DataFrame({
+        'strike': strikes, 'bid': np.round(price - 0.03, 2), 'ask': np.round(price + 0.03, 2),
+        'openInterest': 100, 'impliedVolatility': iv,
+    })
+    return chain.join(chain_greeks(chain, S, 5.0, days, option_type))
+
+
+class TestMultiLeg(unittest.TestCase):
+    def test_delta_window_matches_brute_force(self):
+        rng = np.random.default_rng(5)
+        put_delta = rng.uniform(0.0, 0.3, 60)
+        call_delta = rng.uniform(-0.3, 0.0, 80)
+        p, c = delta_window_pairs(put_delta, call_delta, 0.05)
+        expected = {(i, j) for i in range(60) for j in range(80) if abs(put_delta[i] + call_delta[j]) <= 0.05}
+        self.assertEqual(set(zip(p.tolist(), c.tolist())), expected)
+        self.assertEqual(len(p), len(expected))
+
+    def test_condors_respect_constraints(self):
+        puts, calls = synthetic_chain('put'), synthetic_chain('call')
+        condors = search_iron_condors(puts, calls, 100.0, expiry_days=30, top_k=10)
+        self.assertFalse(condors.empty)
+        self.assertTrue((condors['put_long'] < condors['put_short']).all())
+        self.assertTrue((condors['put_short'] < 100.0).all() and (condors['call_short'] > 100.0).all())
+        self.assertTrue((condors['call_long'] > condors['call_short']).all())
+        self.assertTrue((condors['credit'] >= 0.5).all() and (condors['max_loss'] <= 10.0).all())
+        self.assertTrue((condors['net_delta'].abs() <= 0.1).all())
+        self.assertTrue((np.diff(condors['score']) <= 0).all())
+
+    def test_strangles(self):
+        puts, calls = synthetic_chain('put'), synthetic_chain('call')
+        strangles = search_strangles(puts, calls, 100.0, expiry_days=30)
+        self.assertEqual(len(strangles), 3)
+        self.assertTrue((strangles['margin'] > strangles['credit']).all())
+        self.assertTrue(strangles['pop'].between(0, 1).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.parallel import SharedArrays, attach_arrays, date_shards, parallel_backtest
+from backtest.engine import PricePanel, run_backtest
+
+
+class TestParallelBacktest(unittest.TestCase):
+    def test_shared_arrays_round_trip(self):
+        prices = np.arange(12, dtype=float).reshape(3, 4)
+        days = np.array(['2023-01-03', '2023-01-04'], dtype='datetime64[D]')
+        with SharedArrays({'prices': prices, 'days': days}) as shared:
+            arrays, blocks = attach_arrays(shared.spec)
+            np.testing.assert_array_equal(arrays['prices'], prices)
+            np.testing.assert_array_equal(arrays['days'], days)
+            self.assertFalse(arrays['prices'].flags.writeable)
+            del arrays
+            for block in blocks:
+                block.close()
+
+    def test_date_shards_keep_dates_together(self):
+        dates = np.array(['b', 'a', 'c', 'a', 'd', 'b'])
+        shards = date_shards(dates, 3)
+        self.assertEqual([sorted(set(dates[s])) for s in shards], [['a', 'b'], ['c'], ['d']])
+        self.assertEqual(sorted(np.concatenate(shards).tolist()), list(range(len(dates))))
+
+    def test_matches_serial_run(self):
+        rng = np.random.default_rng(3)
+        dates = [str(d) for d in np.arange(np.datetime64('2023-01-02'), np.datetime64('2023-12-25'), 7)]
+        tickers = [f'T{i}' for i in range(30)]
+        prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, (len(dates), len(tickers))), axis=0))
+        prices[rng.random(prices.shape) < 0.02] = np.nan
+        panel = PricePanel(dates, tickers, prices)
+        n = 400
+        entries = pd.DataFrame({
+            'date': sorted(rng.choice(dates[:-2], n).tolist()),
+            'ticker': rng.choice(tickers, n),
+            'entry_price': rng.uniform(80, 120, n),
+            'combined_signal_value': pd.Series([2] * n, dtype=object),
+            'combined_signal_text': ['Strongly Bullish'] * n,
+        })
+        serial = run_backtest(panel, entries, [0.10, 0.05], [5, 10, 25])
+        parallel = parallel_backtest(panel, entries, [0.10, 0.05], [5, 10, 25], max_workers=2, n_shards=5)
+        pd.testing.assert_frame_equal(parallel, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
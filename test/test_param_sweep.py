@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.engine import PricePanel, run_backtest
+from backtest.param_sweep import (build_sweep_data, evaluate_candidate, grid_search_space, random_search_space,
+                                  run_sweep)
+from strategy.bull_bear_indicator_analysis import load_config
+from strategy.rule_engine import compile_rules
+
+ADX_KEY = 'threshold:Trend Strength with ADX:20'
+
+
+def _panel(n_dates=20, n_tickers=10, seed=11):
+    rng = np.random.default_rng(seed)
+    dates = [str(d) for d in np.datetime64('2023-01-02') + 7 * np.arange(n_dates)]
+    frames = []
+    for date_str in dates:
+        price = 100 + rng.normal(0, 8, n_tickers)
+        trend = rng.choice([-1.0, 1.0], n_tickers, p=[0.3, 0.7])
+        frames.append(pd.DataFrame({
+            'date': date_str,
+            'ticker': [f'T{t}' for t in range(n_tickers)],
+            'current_price': price,
+            'rsi_14': rng.uniform(20, 80, n_tickers),
+            'sma_20': price - trend, 'sma_50': price - 2 * trend, 'sma_200': price - 5 * trend,
+            'ema_20': price - trend, 'ema_50': price - 2 * trend,
+            'macd': trend, 'macd_signal': 0.5 * trend, 'adx_14': rng.uniform(10, 40, n_tickers),
+            'bb_upper': price + 5, 'bb_lower': price - 5, 'atr_14': 2.0,
+            'support_20': price - 3, 'resistance_20': price + 3,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+class TestSearchSpace(unittest.TestCase):
+    def test_grid_expands_every_combination(self):
+        candidates = grid_search_space({'protection': [0.05, 0.10], 'holding': [1, 2, 5], 'weight:A': [3]})
+        self.assertEqual(len(candidates), 6)
+        self.assertEqual(candidates[0], {'protection': 0.05, 'holding': 1, 'weight:A': 3})
+        self.assertEqual(candidates[-1], {'protection': 0.10, 'holding': 5, 'weight:A': 3})
+        self.assertEqual(len({tuple(c.values()) for c in candidates}), 6)
+
+    def test_random_draws_lists_and_ranges(self):
+        space = {'protection': [0.05, 0.10], 'bullish_threshold': (0.5, 1.5)}
+        candidates = random_search_space(space, 50, seed=4)
+        self.assertEqual(candidates, random_search_space(space, 50, seed=4))
+        self.assertTrue(all(c['protection'] in (0.05, 0.10) for c in candidates))
+        self.assertTrue(all(0.5 <= c['bullish_threshold'] <= 1.5 for c in candidates))
+
+
+class TestEvaluateCandidate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.config = load_config()
+        cls.rule_set = compile_rules(cls.config)
+        cls.panel = _panel()
+
+    def test_matches_engine_backtest(self):
+        data = build_sweep_data(self.panel, self.rule_set, [1, 2])
+        candidate = {'bullish_threshold': 1.0, 'protection': 0.05, 'holding': 2}
+        result = evaluate_candidate(data, candidate)
+
+        evaluation = self.rule_set.evaluate(self.panel)
+        keep = evaluation['combined_value'] >= 1.0
+        entries = pd.DataFrame({
+            'date': self.panel['date'][keep], 'ticker': self.panel['ticker'][keep],
+            'entry_price': self.panel['current_price'][keep],
+            'combined_signal_value': evaluation['combined_value'][keep],
+            'combined_signal_text': evaluation['combined_text'][keep],
+        })
+        backtest = run_backtest(PricePanel.from_frame(self.panel), entries, [0.05], [2])
+        backtest = backtest[backtest['exit_price'].notna()]
+        self.assertGreater(len(backtest), 0)
+        self.assertEqual(result['trades'], len(backtest))
+        self.assertEqual(result['wins'], int((~backtest['breached']).sum()))
+        self.assertAlmostEqual(result['breach_rate'], backtest['breached'].mean())
+        self.assertAlmostEqual(result['touch_rate'], (backtest['path_min'] < backtest['protection_price']).mean())
+        self.assertAlmostEqual(result['avg_pct_move'], backtest['pct_move'].mean())
+
+    def test_rule_thresholds_are_sweepable(self):
+        candidates = [{'bullish_threshold': 1.25, 'protection': 0.05, 'holding': 1, ADX_KEY: value}
+                      for value in (20, 35)]
+        data = build_sweep_data(self.panel, self.rule_set, [1], candidates, self.config)
+        same, stricter = [evaluate_candidate(data, c) for c in candidates]
+        # The config's own threshold reproduces the unswept result
+        baseline = {k: v for k, v in candidates[0].items() if k != ADX_KEY}
+        self.assertEqual({k: v for k, v in same.items() if k != ADX_KEY}, evaluate_candidate(data, baseline))
+
+        # 35 matches evaluating a config whose rules say adx_14 > 35
+        strategies = [dict(s) for s in self.config['strategies']]
+        for s in strategies:
+            if s['name'] == 'Trend Strength with ADX':
+                s['rules'] = [{**r, 'when': r['when'].replace('adx_14 > 20', 'adx_14 > 35')} for r in s['rules']]
+        edited = compile_rules({**self.config, 'strategies': strategies})
+        unswept = {k: v for k, v in candidates[1].items() if k != ADX_KEY}
+        expected = evaluate_candidate(build_sweep_data(self.panel, edited, [1]), unswept)
+        self.assertEqual({k: v for k, v in stricter.items() if k != ADX_KEY}, expected)
+        self.assertLess(stricter['trades'], same['trades'])
+
+        with self.assertRaises(ValueError):
+            build_sweep_data(self.panel, self.rule_set, [1], [{**candidates[0], 'threshold:Trend Strength with ADX:21': 25}],
+                             self.config)
+
+    def test_run_sweep_keeps_candidate_order_across_workers(self):
+        space = {'bullish_threshold': [0.25, 0.75, 1.25], 'protection': [0.05, 0.10], 'holding': [1, 2],
+                 ADX_KEY: [15, 25]}
+        candidates = grid_search_space(space)
+        data = build_sweep_data(self.panel, self.rule_set, [1, 2], candidates, self.config)
+        in_process = run_sweep(candidates, data, max_workers=1)
+        pooled = run_sweep(candidates, data, max_workers=2, chunk_size=5)
+        self.assertEqual(pooled, in_process)
+        self.assertEqual([{k: r[k] for k in space} for r in pooled], candidates)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import glob
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.engine import PricePanel, load_entries, run_backtest
+from backtest.pipeline import panel_entries, write_indicator_csvs, write_analysis_files, load_indicator_panel
+
+
+def _panel(n_dates=30, n_tickers=12, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = [str(d) for d in np.datetime64('2023-01-02') + 7 * np.arange(n_dates)]
+    frames = []
+    for i, date_str in enumerate(dates):
+        price = 100 + rng.normal(0, 5, n_tickers).cumsum() + i
+        trend = rng.choice([-1.0, 1.0], n_tickers, p=[0.3, 0.7])
+        frames.append(pd.DataFrame({
+            'date': date_str,
+            'ticker': [f'T{t}' for t in range(n_tickers - 1)] + ['NA'],
+            'current_price': price,
+            'rsi_14': 50 + 10 * trend,
+            'sma_20': price - trend, 'sma_50': price - 2 * trend, 'sma_200': price - 5 * trend,
+            'ema_20': price - trend, 'ema_50': price - 2 * trend,
+            'macd': trend, 'macd_signal': 0.5 * trend, 'adx_14': 30.0,
+            'bb_upper': price + 5, 'bb_lower': price - 5, 'atr_14': 2.0,
+            'support_20': price - 3, 'resistance_20': price + 3,
+        }))
+    panel = pd.concat(frames, ignore_index=True)
+    panel.loc[5, 'current_price'] = np.nan
+    return panel
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_matches_file_based_flow(self):
+        panel = _panel()
+        entries = panel_entries(panel)
+        self.assertGreater(len(entries), 0)
+        self.assertLess(len(entries), len(panel))
+        in_memory = run_backtest(PricePanel.from_frame(panel), entries, [0.05, 0.10], [1, 2, 5])
+
+        # The debug files reproduce the old indicators CSV -> analysis JSON -> engine path
+        write_indicator_csvs(panel, self.tmp)
+        csv_files = sorted(glob.glob(os.path.join(self.tmp, 'indicators_*.csv')))
+        write_analysis_files(load_indicator_panel(csv_files), out_dir=self.tmp)
+        dates = sorted(set(panel['date']))
+        file_entries = load_entries(dates, analysis_dir=self.tmp)
+        file_panel = PricePanel.from_indicator_csvs(os.path.join(self.tmp, 'indicators_*.csv'))
+        self.assertIn('NA', file_panel.tickers)
+        from_files = run_backtest(file_panel, file_entries, [0.05, 0.10], [1, 2, 5])
+        pd.testing.assert_frame_equal(in_memory, from_files[in_memory.columns], check_dtype=False)
+
+    def test_entries_skip_rows_without_a_price(self):
+        panel = _panel()
+        entries = panel_entries(panel)
+        self.assertFalse(((entries['date'] == panel.loc[5, 'date']) & (entries['ticker'] == panel.loc[5, 'ticker'])).any())
+        self.assertTrue((entries['combined_signal_text'].str.lower() == 'strongly bullish').all())
+
+
+if __name__ == '__main__':
+    unittest.main()
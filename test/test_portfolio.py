@@ -0,0 +1,51 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from trade_generator.portfolio import select_portfolio, load_sector_map
+
+
+def trade(ticker, ev, max_loss=None, margin=None):
+    return {'ticker': ticker, 'expected_value': ev, 'max_loss': max_loss, 'margin': margin}
+
+
+class TestSelectPortfolio(unittest.TestCase):
+    def test_limits(self):
+        records = [
+            trade('AAA', 40.0, 400.0), trade('AAA', 30.0, 200.0),   # second AAA trade exceeds the per-ticker count
+            trade('BBB', 20.0, 300.0), trade('CCC', 25.0, 500.0),
+            trade('DDD', -5.0, 100.0),                               # negative expected value
+            trade('EEE', 10.0, margin=2000.0),                       # strangle: margin is the risk
+        ]
+        sectors = {'BBB': 'Energy', 'CCC': 'Energy'}
+        limits = {'max_ticker_risk_pct': None, 'max_sector_risk_pct': 0.5}
+        selected, summary = select_portfolio(records, buying_power=1000.0, limits=limits, sectors=sectors)
+        # AAA 200 (ratio 0.15) first, then BBB 300; AAA 400 is a second AAA trade; CCC breaks the Energy cap
+        self.assertEqual([(t['ticker'], t['max_loss']) for t in selected], [('AAA', 200.0), ('BBB', 300.0)])
+        self.assertEqual(summary['total_risk'], 500.0)
+        self.assertEqual(summary['total_objective'], 50.0)
+
+    def test_best_single_trade_beats_greedy(self):
+        records = [trade('AAA', 2.0, 1.0), trade('BBB', 100.0, 1000.0)]
+        selected, _ = select_portfolio(records, buying_power=1000.0, limits={'max_ticker_risk_pct': None, 'max_sector_risk_pct': None}, sectors={})
+        self.assertEqual([t['ticker'] for t in selected], ['BBB'])
+
+    def test_shipped_sector_map_binds_the_cap(self):
+        sectors = load_sector_map()
+        self.assertEqual(sectors['XOM'], sectors['CVX'])
+        records = [trade('XOM', 30.0, 250.0), trade('CVX', 25.0, 250.0), trade('MSFT', 10.0, 250.0)]
+        limits = {'max_ticker_risk_pct': None, 'max_sector_risk_pct': 0.3}
+        selected, _ = select_portfolio(records, buying_power=1000.0, limits=limits)
+        # XOM and CVX together would be 50% of the budget in one sector
+        self.assertEqual([t['ticker'] for t in selected], ['XOM', 'MSFT'])
+
+    def test_warns_when_sector_cap_has_no_map(self):
+        records = [trade('AAA', 30.0, 250.0), trade('BBB', 25.0, 250.0)]
+        with self.assertLogs('trade_generator.portfolio', level='WARNING') as logs:
+            select_portfolio(records, buying_power=1000.0, limits={'max_sector_risk_pct': 0.3}, sectors={})
+        self.assertIn('no sector map', logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from backtest.bar_store import DailyBars
+from backtest.replay import replay, load_trade_files
+from utils.trading_calendar import to_days
+from trade_generator.chain_store import ChainStore
+
+
+def _chain(strikes, bid, ask, iv=0.25):
+    return pd.DataFrame({'strike': strikes, 'bid': bid, 'ask': ask, 'lastPrice': bid,
+                         'impliedVolatility': iv})
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.trades_dir = os.path.join(self.tmp, 'trades')
+        os.makedirs(self.trades_dir)
+        self.store = ChainStore(os.path.join(self.tmp, 'history'))
+        results = [{
+            'ticker': 'AAA', 'expiration': '2024-03-08', 'current_price': 100.0,
+            'bull_put_spreads': [{'ticker': 'AAA', 'strategy': 'Bull Put', 'expiration': '2024-03-08',
+                                  'short_strike': 95.0, 'long_strike': 90.0, 'max_profit': 100.0,
+                                  'max_loss': 400.0}],
+            'iron_condors': [{'ticker': 'AAA', 'strategy': 'Iron Condor', 'expiration': '2024-03-08',
+                              'put_short_strike': 95.0, 'put_long_strike': 90.0, 'call_short_strike': 105.0,
+                              'call_long_strike': 110.0, 'max_profit': 150.0, 'max_loss': 350.0}],
+        }]
+        with open(os.path.join(self.trades_dir, 'bull_bear_trades_2024-03-04.json'), 'w') as f:
+            json.dump(results, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_load_trade_files_flattens_legs(self):
+        trades, legs = load_trade_files(self.trades_dir)
+        self.assertEqual(trades['strategy'].tolist(), ['Bull Put', 'Iron Condor'])
+        self.assertEqual(trades['credit'].tolist(), [1.0, 1.5])
+        self.assertEqual(legs.groupby('trade_id').size().tolist(), [2, 4])
+        self.assertEqual(legs['quantity'].sum(), -2 + 2)
+
+    def test_marks_quotes_then_model_then_intrinsic(self):
+        puts = _chain([90.0, 95.0], [0.2, 0.5], [0.4, 0.7])
+        calls = _chain([105.0, 110.0], [0.3, 0.1], [0.5, 0.2])
+        self.store.put('AAA', '2024-03-04', '2024-03-08', calls, puts, 100.0)
+        # Tuesday: the 90 put has no bid, so it is priced from the model
+        self.store.put('AAA', '2024-03-05', '2024-03-08', calls,
+                       _chain([90.0, 95.0], [0.0, 0.5], [0.3, 0.7], iv=[0.3, 0.25]), 99.0)
+        # Wednesday and Thursday have no snapshot; Friday only has the underlying price
+        self.store.put('AAA', '2024-03-08', '2024-03-08', None, _chain([80.0], [0.0], [0.05]), 93.0)
+        summary, daily, marks = replay(self.trades_dir, store=self.store, as_of='2024-03-15')
+
+        bull_put = daily[daily['trade_id'] == 0].set_index('date')
+        self.assertEqual(bull_put.index.tolist(), ['2024-03-04', '2024-03-05', '2024-03-06', '2024-03-07', '2024-03-08'])
+        # Entry day: (1.00 credit - (0.60 - 0.30)) x 100
+        self.assertAlmostEqual(bull_put.loc['2024-03-04', 'pnl'], 70.0)
+        self.assertTrue(bull_put.loc['2024-03-04', 'quoted'])
+        self.assertFalse(bull_put.loc['2024-03-05', 'quoted'])
+        # Expiration at 93: the short 95 put costs 2.00 to close
+        self.assertAlmostEqual(bull_put.loc['2024-03-08', 'pnl'], -100.0)
+        sources = marks[(marks['trade_id'] == 0) & (marks['date'] == '2024-03-08')]['source']
+        self.assertEqual(set(sources), {'expiry'})
+
+        row = summary.set_index('trade_id').loc[0]
+        self.assertTrue(row['expired'])
+        self.assertAlmostEqual(row['return_on_risk'], -0.25)
+        self.assertEqual(row['days_marked'], 5)
+        self.assertAlmostEqual(row['quoted_share'], 0.2)
+        condor = summary.set_index('trade_id').loc[1]
+        self.assertAlmostEqual(condor['pnl'], -50.0)
+        # Wednesday and Thursday are priced from Tuesday's spot
+        self.assertEqual(row['stale_days'], 2)
+
+    def test_bars_replace_the_carried_entry_spot(self):
+        # Only the entry day was captured; the underlying then falls through the short strike
+        self.store.put('AAA', '2024-03-04', '2024-03-08', None, _chain([90.0, 95.0], [0.2, 0.5], [0.4, 0.7]), 100.0)
+        sessions = to_days(['2024-03-04', '2024-03-05', '2024-03-06', '2024-03-07', '2024-03-08'])
+        close = pd.DataFrame({'AAA': [100.0, 97.0, 94.0, 92.0, 90.0]}).to_numpy()
+        bars = DailyBars(sessions, ['AAA'], close, close, close)
+
+        summary, _, marks = replay(self.trades_dir, store=self.store, as_of='2024-03-15')
+        bull_put = summary.set_index('trade_id').loc[0]
+        # Without bars the entry price is carried to expiration, where both puts look worthless
+        self.assertAlmostEqual(bull_put['pnl'], 100.0)
+        self.assertEqual(bull_put['stale_days'], 4)
+        self.assertEqual(set(marks.loc[marks['date'] > '2024-03-04', 'source']), {'stale'})
+
+        summary, _, marks = replay(self.trades_dir, store=self.store, bars=bars, as_of='2024-03-15')
+        bull_put = summary.set_index('trade_id').loc[0]
+        # At 90 the short 95 put costs 5.00 to close: (1.00 - 5.00) x 100
+        self.assertAlmostEqual(bull_put['pnl'], -400.0)
+        self.assertEqual(bull_put['stale_days'], 0)
+        later = marks[marks['date'] > '2024-03-04']
+        self.assertEqual(set(later['spot_source']), {'bars'})
+        self.assertEqual(later.loc[later['date'] == '2024-03-07', 'spot'].unique().tolist(), [92.0])
+
+    def test_unexpired_trades_stop_at_as_of(self):
+        self.store.put('AAA', '2024-03-04', '2024-03-08', None, _chain([90.0, 95.0], [0.2, 0.5], [0.4, 0.7]), 100.0)
+        summary, daily, _ = replay(self.trades_dir, store=self.store, as_of='2024-03-05')
+        row = summary.set_index('trade_id').loc[0]
+        self.assertEqual(row['last_date'], '2024-03-05')
+        self.assertFalse(row['expired'])
+
+
+if __name__ == '__main__':
+    unittest.main()
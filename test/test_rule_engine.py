@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from strategy.rule_engine import compile_expression, compile_rules, INSUFFICIENT_DATA
+from strategy.bull_bear_indicator_analysis import load_config
+
+
+class TestRuleEngine(unittest.TestCase):
+    def test_chained_comparison_and_arithmetic(self):
+        fn, names = compile_expression("5 <= a <= 50 and (b - c) / a > 0.1", ['a', 'b', 'c'])
+        cols = {'a': np.array([10.0, 60.0, np.nan]), 'b': np.array([5.0, 5.0, 5.0]), 'c': np.array([1.0, 1.0, 1.0])}
+        self.assertEqual(names, {'a', 'b', 'c'})
+        self.assertEqual(fn(cols).tolist(), [True, False, False])
+
+    def test_unknown_column_rejected(self):
+        with self.assertRaises(ValueError):
+            compile_expression("sma_50 > sma_2000", ['sma_50', 'sma_200'])
+        with self.assertRaises(ValueError):
+            compile_expression("__import__('os')", ['sma_50'])
+
+    def test_config_compiles_and_evaluates(self):
+        rule_set = compile_rules(load_config())
+        df = pd.DataFrame({
+            'ticker': ['UP', 'DOWN'],
+            'current_price': [110.0, 90.0],
+            'sma_50': [105.0, 95.0],
+            'sma_200': [100.0, 100.0],
+        })
+        result = rule_set.evaluate(df)
+        self.assertEqual(result['signals']['Trend Crossover: SMA'].tolist(), ['strongly bullish', 'strongly bearish'])
+        # Strategies whose combo columns are missing are reported and excluded from the weights
+        self.assertEqual(result['signals']['MACD Crossover'].tolist(), [INSUFFICIENT_DATA] * 2)
+        self.assertGreater(result['combined_value'][0], 0)
+        self.assertLess(result['combined_value'][1], 0)
+
+    def test_undeclared_signal_rejected(self):
+        config = {
+            'indicators': {'macd': {}, 'macd_signal': {}},
+            'strategies': [{
+                'name': 'MACD', 'combo': ['macd', 'macd_signal'], 'type': 'momentum_shift', 'weight': 1,
+                'rules': [{'when': 'macd > macd_signal', 'signal': 'to the moon'}],
+            }],
+            'signal_values': {'neutral': 0},
+        }
+        with self.assertRaises(ValueError):
+            compile_rules(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from backtest.bar_store import DailyBars
+from backtest.spread_pnl import (historical_volatility, simulate_spread_pnl, summarize_pnl, PNL_COLUMNS, CONFIG_COLUMNS,
+                                 SUMMARY_COLUMNS)
+from trade_generator.greeks import bs_price
+from utils.trading_calendar import nyse_calendar
+
+
+class TestSpreadPnl(unittest.TestCase):
+    def setUp(self):
+        self.sessions = nyse_calendar().sessions_between('2024-01-02', '2024-03-28')
+        n = len(self.sessions)
+        close = np.full((n, 2), 100.0)
+        close[:, 0] = 100 * np.exp(0.02 * np.sin(np.arange(n)))  # about 25% realized volatility
+        close[30:, 1] = 90.0  # BBB gaps down through both strikes
+        close[:30, 1] = 100 * np.exp(0.02 * np.cos(np.arange(30)))
+        self.bars = DailyBars(self.sessions, ['AAA', 'BBB'], close, close, close)
+        # Entered on sessions[25] at the close of the session before
+        self.entries = pd.DataFrame({
+            'date': [str(self.sessions[25])] * 2,
+            'ticker': ['AAA', 'BBB'],
+            'entry_price': [close[24, 0], close[24, 1]],
+        })
+
+    def test_prices_at_entry_and_expiry(self):
+        trades = simulate_spread_pnl(self.bars, self.entries, [0.05], [10], [0.05], r=5.0)
+        aaa, bbb = trades.iloc[0], trades.iloc[1]
+        days = (self.sessions[34] - self.sessions[24]).astype(int)
+        self.assertEqual(aaa['expiry_days'], days)
+        expected = (bs_price(aaa['entry_price'], aaa['short_strike'], days, 5.0, aaa['entry_vol'], 'put')
+                    - bs_price(aaa['entry_price'], aaa['long_strike'], days, 5.0, aaa['entry_vol'], 'put'))
+        self.assertAlmostEqual(aaa['credit'], float(expected))
+        # AAA stays above the short strike: the spread expires worthless and keeps the credit
+        self.assertEqual(aaa['exit_debit'], 0.0)
+        self.assertAlmostEqual(aaa['pnl'], aaa['credit'] * 100)
+        # BBB closes at 90, below the long strike: full max loss
+        self.assertAlmostEqual(bbb['pnl'], -bbb['max_loss'])
+        self.assertAlmostEqual(bbb['return_on_risk'], -1.0)
+
+    def test_one_session_hold_exits_on_the_entry_date(self):
+        trades = simulate_spread_pnl(self.bars, self.entries, [0.05], [1], [0.05])
+        aaa = trades.iloc[0]
+        self.assertEqual(aaa['exit_date'], str(self.sessions[25]))
+        self.assertEqual(aaa['exit_price'], self.bars.close[25, 0])
+        self.assertEqual(aaa['expiry_days'], (self.sessions[25] - self.sessions[24]).astype(int))
+        # Volatility known at the entry close, without the entry date's own return
+        hv = historical_volatility(self.bars)
+        self.assertEqual(aaa['entry_vol'], hv[24, 0])
+        self.assertNotEqual(aaa['entry_vol'], hv[25, 0])
+
+    def test_stored_iv_and_early_exit(self):
+        entries = self.entries.assign(iv=[0.30, np.nan])
+        trades = simulate_spread_pnl(self.bars, entries, [0.05], [5], [0.05], expiry_days=30)
+        self.assertEqual(trades.iloc[0]['entry_vol'], 0.30)
+        self.assertEqual(trades.iloc[0]['expiry_days'], 30)
+        self.assertGreater(trades.iloc[0]['exit_debit'], 0.0)  # 30 - 7 days still left at exit
+
+    def test_summary_drawdown(self):
+        trades = pd.DataFrame({
+            'date': ['d1', 'd2', 'd3', 'd4'], 'ticker': ['A'] * 4,
+            'exit_date': ['2024-01-05', '2024-01-12', '2024-01-19', '2024-01-26'],
+            'protection': 0.05, 'holding_days': 5, 'width_pct': 0.05,
+            'pnl': [50.0, -200.0, 30.0, 40.0], 'max_loss': [450.0] * 4,
+            'return_on_risk': [50 / 450, -200 / 450, 30 / 450, 40 / 450],
+        })
+        summary = summarize_pnl(trades).iloc[0]
+        self.assertEqual(summary['trades'], 4)
+        self.assertEqual(summary['win_rate'], 0.75)
+        self.assertEqual(summary['total_pnl'], -80.0)
+        self.assertEqual(summary['max_drawdown'], 200.0)
+        self.assertEqual(summary['worst_pnl'], -200.0)
+
+    def test_no_entries(self):
+        trades = simulate_spread_pnl(self.bars, self.entries.iloc[:0], [0.05], [10])
+        self.assertEqual(list(trades.columns), PNL_COLUMNS)
+        self.assertEqual(trades['pnl'].dtype, float)
+        summary = summarize_pnl(trades)
+        self.assertTrue(summary.empty)
+        self.assertEqual(list(summary.columns), CONFIG_COLUMNS + SUMMARY_COLUMNS)
+        # Entries that were never traded (no bars) leave nothing to summarize either
+        unknown = self.entries.assign(ticker=['ZZZ', 'YYY'])
+        self.assertTrue(summarize_pnl(simulate_spread_pnl(self.bars, unknown, [0.05], [10])).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
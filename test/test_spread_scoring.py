@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+from trade_generator.spread_scoring import spread_probabilities, monte_carlo_probabilities
+
+
+class TestSpreadScoring(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.short = rng.uniform(85, 98, 40)
+        self.long = self.short - rng.uniform(1, 8, 40)
+        self.credit = (self.short - self.long) * rng.uniform(0.05, 0.3, 40)
+        self.sigma = rng.uniform(0.2, 0.5, 40)
+        self.days = rng.integers(7, 45, 40)
+
+    def test_closed_form_bounds(self):
+        scores = spread_probabilities(100.0, self.short, self.long, self.credit, self.sigma, self.days, 'bull_put')
+        # Breakeven sits below the short strike, and touching is at least as likely as finishing beyond it
+        self.assertTrue((scores['pop'] >= scores['p_max_profit']).all())
+        self.assertTrue((scores['pot'] >= 1 - scores['p_max_profit'] - 1e-12).all())
+        self.assertTrue((scores['expected_value'] <= self.credit * 100).all())
+        missing = spread_probabilities(100.0, 95.0, 90.0, 1.0, np.nan, 30, 'bull_put')
+        self.assertTrue(np.isnan(missing['pop']))
+
+    def test_monte_carlo_matches_closed_form(self):
+        for spread_type, short, long in (('bull_put', self.short, self.long), ('bear_call', 200 - self.short, 200 - self.long)):
+            exact = spread_probabilities(100.0, short, long, self.credit, self.sigma, self.days, spread_type)
+            simulated = monte_carlo_probabilities(100.0, short, long, self.credit, self.sigma, self.days, spread_type, n_paths=4000, seed=1)
+            for name in ('pop', 'p_max_profit', 'pot'):
+                np.testing.assert_allclose(simulated[name], exact[name], atol=0.04)
+            again = monte_carlo_probabilities(100.0, short, long, self.credit, self.sigma, self.days, spread_type, n_paths=4000, seed=1)
+            np.testing.assert_array_equal(again['expected_value'], simulated['expected_value'])
+
+
+if __name__ == "__main__":
+    unittest.main()
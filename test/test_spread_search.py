@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+import pandas as pd
+from trade_generator.spread_search import search_vertical_spreads, spread_records
+
+
+class TestSpreadSearch(unittest.TestCase):
+    def setUp(self):
+        self.puts = pd.DataFrame({
+            'strike': [80.0, 85.0, 90.0, 95.0, 100.0, 105.0],
+            'bid': [0.10, 0.30, 0.80, 1.90, 4.00, 7.00],
+            'ask': [0.15, 0.40, 0.90, 2.00, 4.20, 7.30],
+            'openInterest': [50, 50, 5, 200, 300, 100],
+            'delta': [-0.03, -0.08, -0.15, -0.28, -0.50, -0.70],
+        })
+
+    def test_bull_put_candidates(self):
+        liquid = {'short_delta_range': (0.10, 0.35), 'min_open_interest': 10, 'max_bid_ask_spread': 0.50}
+        result = search_vertical_spreads(self.puts, 102.0, 'bull_put', liquid, top_k=None)
+        pairs = list(zip(result['short_strike'], result['long_strike']))
+        # 90 is in the delta band but fails open interest, so 95 is the only short; 95/80 is wider than max_width
+        self.assertEqual(sorted(pairs), [(95.0, 85.0)])
+        self.assertAlmostEqual(result['credit'].iloc[0], 1.50)
+
+    def test_constraints_and_top_k(self):
+        loose = {'short_delta_range': None, 'min_open_interest': 0, 'max_width': 20.0}
+        result = search_vertical_spreads(self.puts, 102.0, 'bull_put', loose, score='credit', top_k=2)
+        self.assertEqual(len(result), 2)
+        self.assertTrue((np.diff(result['score']) <= 0).all())
+        self.assertEqual((result['short_strike'].iloc[0], result['long_strike'].iloc[0]), (100.0, 80.0))
+        records = spread_records(result, 102.0, 'Bull Put')
+        self.assertEqual(records[0]['max_profit'], 385.0)
+        self.assertEqual(records[0]['max_loss'], 1615.0)
+
+    def test_default_leg_filters_are_off(self):
+        # No delta for the 95 put and no open interest for the 90: both are still traded by default
+        puts = self.puts.assign(delta=[-0.03, -0.08, -0.15, np.nan, -0.50, -0.70], openInterest=[50, 50, 0, 200, 300, 100])
+        pairs = set(zip(*[search_vertical_spreads(puts, 102.0, 'bull_put', top_k=None)[c]
+                          for c in ('short_strike', 'long_strike')]))
+        self.assertIn((95.0, 90.0), pairs)
+        self.assertIn((90.0, 85.0), pairs)
+        self.assertIn((100.0, 95.0), pairs)
+
+    def test_bear_call_requires_otm_strikes(self):
+        calls = self.puts.assign(delta=-self.puts['delta'])
+        result = search_vertical_spreads(calls, 102.0, 'bear_call', {'short_delta_range': None, 'min_open_interest': 0})
+        self.assertTrue(result.empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import json
+import tempfile
+from trade_generator.strategy_json_parser import (SignalIndex, get_tickers_by_signal, load_signal_index,
+                                                  find_latest_analysis_json)
+
+SAMPLE = [
+    {"ticker": "AAA", "combined_signal": {"value": 1.5, "text": "Strongly Bullish"}, "earnings_nearby": False},
+    {"ticker": "BBB", "combined_signal": {"value": 1.4, "text": "Strongly Bullish"}, "earnings_nearby": True},
+    {"ticker": "CCC", "combined_signal": {"value": -1.6, "text": "Strongly Bearish"}, "earnings_nearby": False},
+    {"ticker": "DDD", "combined_signal": {"value": 0.0, "text": "Neutral"}, "earnings_nearby": False},
+]
+
+
+class TestSignalIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'bull_bear_analysis_2025-01-01.json')
+        with open(self.path, 'w') as f:
+            json.dump(SAMPLE, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lookups(self):
+        index = SignalIndex.from_file(self.path)
+        self.assertEqual(index.tickers('Strongly Bullish'), ['AAA'])
+        self.assertEqual(index.tickers('Strongly Bullish', filter_earnings_nearby=False), ['AAA', 'BBB'])
+        self.assertEqual([e['ticker'] for e in index.entries('Strongly Bearish')], ['CCC'])
+        self.assertTrue(index.earnings_nearby('BBB'))
+        self.assertEqual(index.get('DDD')['combined_signal']['text'], 'Neutral')
+        self.assertEqual(get_tickers_by_signal(self.path, 'Strongly Bearish'), ['CCC'])
+        self.assertEqual(index.tickers('Unknown'), [])
+        # Both views are built once, not filtered per lookup
+        self.assertIs(index.tickers('Strongly Bullish'), index.tickers('Strongly Bullish'))
+        self.assertIs(index.tickers('Strongly Bullish', False), index.tickers('Strongly Bullish', False))
+
+    def test_sidecar_round_trip(self):
+        SignalIndex.from_file(self.path, write_sidecar=True)
+        index = SignalIndex.from_file(self.path)
+        # Built from the sidecar: entries are only parsed on demand
+        self.assertIsNone(index._records)
+        self.assertEqual(index.to_dict(filter_earnings_nearby=False)['Strongly Bullish'], ['AAA', 'BBB'])
+        self.assertEqual(index.get('AAA')['combined_signal']['value'], 1.5)
+
+    def test_reads_do_not_write_a_sidecar(self):
+        load_signal_index(self.path)
+        get_tickers_by_signal(self.path, 'Strongly Bullish')
+        self.assertEqual(os.listdir(self.tmp.name), [os.path.basename(self.path)])
+
+    def test_latest_analysis_is_not_the_sidecar(self):
+        SignalIndex.from_records(SAMPLE, source_path=self.path).save_sidecar()
+        # The sidecar is written after the analysis, so it is the newest file in the folder
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+        latest = find_latest_analysis_json(self.tmp.name)
+        self.assertEqual(latest, self.path)
+        with open(latest) as f:
+            self.assertEqual(len(json.load(f)), len(SAMPLE))
+
+
+if __name__ == "__main__":
+    unittest.main()
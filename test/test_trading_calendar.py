@@ -0,0 +1,37 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+from utils.trading_calendar import TradingCalendar, nyse_calendar, to_strings
+
+
+class TestTradingCalendar(unittest.TestCase):
+    def setUp(self):
+        self.calendar = nyse_calendar()
+
+    def test_sessions_and_holidays(self):
+        self.assertEqual(len(self.calendar.sessions_between('2023-01-01', '2023-12-31')), 250)
+        self.assertEqual(len(self.calendar.sessions_between('2024-01-01', '2024-12-31')), 252)
+        self.assertFalse(self.calendar.is_session(['2025-04-18', '2025-06-19', '2022-12-26']).any())
+        self.assertTrue(self.calendar.is_half_day(['2024-07-03', '2024-11-29', '2024-12-24']).all())
+
+    def test_offsets_and_expiries(self):
+        self.assertEqual(to_strings(self.calendar.offset(['2025-07-03', '2025-07-05', '2025-12-24'], 1)),
+                         ['2025-07-07', '2025-07-08', '2025-12-26'])
+        # Good Friday 2025 moves the weekly expiry to Thursday
+        self.assertEqual(to_strings(self.calendar.next_expiry(['2025-04-14', '2025-04-18'])), ['2025-04-17', '2025-04-25'])
+        self.assertEqual(to_strings(self.calendar.next_expiry('2025-06-01', monthly=True)), ['2025-06-20'])
+        weekly = self.calendar.rebalance_dates('2025-01-13', '2025-01-31')
+        self.assertEqual(to_strings(weekly), ['2025-01-13', '2025-01-21', '2025-01-27'])
+
+    def test_from_dates(self):
+        index = TradingCalendar.from_dates(['2023-01-09', '2023-01-02', '2023-01-16'])
+        self.assertEqual(index.position('2023-01-09'), 1)
+        self.assertIsNone(index.position('2023-01-03'))
+        self.assertEqual(to_strings(index.offset(['2023-01-02', '2023-01-09'], 2)), ['2023-01-16', None])
+        self.assertEqual(index.positions(['2023-01-05'], roll=None).tolist(), [-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import unittest
+import numpy as np
+from backtest.bar_store import DailyBars
+from backtest.walk_forward import stream_indicator_panel, walk_forward_windows, run_walk_forward
+from utils.trading_calendar import nyse_calendar
+
+
+class TestWalkForward(unittest.TestCase):
+    def test_snapshots_use_bars_before_the_rebalance_date(self):
+        sessions = nyse_calendar().sessions_between('2024-01-02', '2024-03-28')
+        close = np.arange(len(sessions), dtype=float)[:, None] + np.array([[100.0, 200.0]])
+        bars = DailyBars(sessions, ['AAA', 'BBB'], close, close - 1, close + 1)
+        # 2024-02-19 is Presidents' Day: that week rebalances on Tuesday
+        rebalance = nyse_calendar().rebalance_dates('2024-02-12', '2024-02-23')
+        panel = stream_indicator_panel(bars, rebalance)
+        self.assertEqual(sorted(set(panel['date'])), ['2024-02-12', '2024-02-20'])
+        row = panel[(panel['date'] == '2024-02-20') & (panel['ticker'] == 'AAA')].iloc[0]
+        last = int(np.searchsorted(sessions, np.datetime64('2024-02-16')))
+        self.assertEqual(row['entry_session'], last)
+        self.assertEqual(row['current_price'], close[last, 0])
+        self.assertAlmostEqual(row['sma_20'], close[last - 19:last + 1, 0].mean())
+
+    def test_windows_roll_by_out_of_sample_length(self):
+        windows = walk_forward_windows(np.arange(10), 4, 3)
+        self.assertEqual([(w[0].tolist(), w[1].tolist()) for w in windows],
+                         [([0, 1, 2, 3], [4, 5, 6]), ([3, 4, 5, 6], [7, 8, 9])])
+
+    def test_calibration_ignores_trades_open_into_out_of_sample(self):
+        dates = np.array([str(d) for d in nyse_calendar().rebalance_dates('2024-01-01', '2024-03-31')])
+        n = len(dates)
+        score = np.where(np.arange(n) % 2 == 0, 2.0, 0.5)
+        score[3] = 2.0
+        entry = np.full(n, 100.0)
+        # High scores win and low scores lose, except the last in-sample week, a high-score loss
+        exit_price = np.where(score > 1, 101.0, 80.0)
+        exit_price[3] = 80.0
+        exit_dates = np.array([np.datetime64(d) + 7 for d in dates], dtype='datetime64[D]')
+        exit_dates[3] = np.datetime64(dates[4]) + 1  # still open when the out-of-sample window starts
+        data = {
+            'date': dates, 'scores': score[:, None], 'available': np.array([True]),
+            'strategy_names': ['only'], 'default_weights': np.array([1.0]), 'entry': entry,
+            'exit': {5: exit_price}, 'path_min': {5: exit_price}, 'exit_date': {5: exit_dates},
+        }
+        windows = run_walk_forward(data, [0.05], [5], {'in_sample_weeks': 4, 'out_of_sample_weeks': 4,
+                                                        'thresholds': [0.0, 1.0], 'min_trades': 1})
+        first = windows.iloc[0]
+        self.assertEqual(first['bullish_threshold'], 1.0)
+        self.assertEqual(first['in_sample_trades'], 2)
+        self.assertEqual(first['in_sample_win_rate'], 1.0)
+        self.assertEqual(first['win_rate'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,149 +1,152 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import yfinance as yf
-import mibian
 import numpy as np
 import json
-import os
 import glob
-from strategy_json_parser import parse_strategy_json, find_latest_analysis_json, get_tickers_by_signal
+from concurrent.futures import ThreadPoolExecutor
+from strategy_json_parser import parse_strategy_json, find_latest_analysis_json, load_signal_index
+from trade_generator.greeks import bs_greeks, chain_greeks
+from trade_generator.iv_solver import fill_missing_iv
+from trade_generator.chain_cache import ChainCache, UNDERLYING_KEY, CHAIN_CACHE_MAX_AGE_MINUTES
+from trade_generator.chain_store import ChainStore
+from trade_generator.spread_search import RECORD_SCORE_FIELDS, SPREAD_TOP_K, search_vertical_spreads, rank_candidates, spread_records
+from trade_generator.spread_scoring import score_candidates
+from trade_generator.portfolio import account_buying_power, select_portfolio
+from trade_generator.multi_leg import search_iron_condors, search_strangles, multi_leg_records
 from datetime import datetime, timedelta
 
-# --- Compute Greeks using mibian for each option ---
+CHAIN_FETCH_WORKERS = 8  # concurrent yfinance requests
+USE_CHAIN_CACHE = True  # reuse chains fetched within CHAIN_CACHE_MAX_AGE_MINUTES (output/option_chain_cache)
+FORCE_REFRESH_CHAINS = False  # download every chain even if a fresh one is cached
+ARCHIVE_CHAINS = True  # keep each day's downloaded chains in output/option_chain_history for backtest/replay.py
+SPREAD_SCORING_METHOD = 'closed_form'  # or 'monte_carlo'
+SPREAD_RANK_BY = 'ev_per_risk'  # any spread_scoring.SCORE_COLUMNS column
+SELECT_PORTFOLIO = True  # write bull_bear_portfolio_<date>.json chosen by trade_generator.portfolio
+SEARCH_NEUTRAL_COMBOS = True  # iron condors / short strangles for Neutral tickers (JSON output only)
+
+# --- Compute Greeks for a single option (the chain path uses greeks.chain_greeks) ---
 def compute_greeks(row, S, r, expiry_days, option_type):
     # S: underlying price, r: risk-free rate (annual, %), expiry_days: days to expiry
     # row: option row from yfinance DataFrame
-    K = row['strike']
-    IV = row.get('impliedVolatility', np.nan)
-    if np.isnan(IV) or IV == 0:
-        return {k: np.nan for k in ['delta', 'gamma', 'theta', 'vega', 'rho']}
-    # mibian requires IV in percent, not decimal
-    c = mibian.BS([S, K, r, expiry_days], volatility=IV*100)
-    if option_type == 'call':
-        return {
-            'delta': c.callDelta,
-            'gamma': c.gamma,
-            'theta': c.callTheta,
-            'vega': c.vega,
-            'rho': c.callRho
-        }
-    else:
-        return {
-            'delta': c.putDelta,
-            'gamma': c.gamma,
-            'theta': c.putTheta,
-            'vega': c.vega,
-            'rho': c.putRho
-        }
+    greeks = bs_greeks(S, row['strike'], expiry_days, r, row.get('impliedVolatility', np.nan), option_type)
+    return {k: float(v) for k, v in greeks.items()}
 
-def get_option_chain_with_greeks(ticker_str, chosen_exp=None, r=5.0, week_offsets=None):
-    ticker = yf.Ticker(ticker_str.upper())
-    expirations = ticker.options
-    if not expirations:
-        print(f"No expirations for {ticker_str}")
-        return []
-    results = []
-    # Calculate target expirations: 2, 4, 6 weeks from now
-    now = datetime.now()
-    week_offsets = week_offsets or [2, 4, 6]
+def choose_expirations(expirations, week_offsets, now=None):
+    # Closest available expiration to each target week (2, 4, 6 weeks from now by default), without duplicates
+    now = now or datetime.now()
     target_dates = [(now + timedelta(weeks=w)).date() for w in week_offsets]
-    # Find the closest available expiration for each target week
     chosen_exps = []
     for td in target_dates:
         closest = min(expirations, key=lambda x: abs((datetime.strptime(x, "%Y-%m-%d").date() - td).days))
         if closest not in chosen_exps:
             chosen_exps.append(closest)
-    for chosen_exp in chosen_exps:
+    return chosen_exps
+
+def _fetch_underlying(ticker_str, week_offsets, now, cache=None):
+    # One expirations lookup and one price fetch per ticker (or none, if cached)
+    ticker = yf.Ticker(ticker_str.upper())
+    cached = cache.get(ticker_str, UNDERLYING_KEY, now) if cache else None
+    if cached is not None:
+        expirations, S = cached
+    else:
+        expirations = ticker.options
+        if not expirations:
+            print(f"No expirations for {ticker_str}")
+            return ticker, None, []
+        S = ticker.history(period="1d")['Close'].iloc[-1]
+        if cache:
+            cache.put(ticker_str, UNDERLYING_KEY, (tuple(expirations), float(S)))
+    return ticker, S, choose_expirations(expirations, week_offsets, now)
+
+def _fetch_chain(ticker, chosen_exp, S, r, now, cache=None, archive=None):
+    cached = cache.get(ticker.ticker, chosen_exp, now) if cache else None
+    if cached is not None:
+        calls, puts = cached
+    else:
         opt_chain = ticker.option_chain(chosen_exp)
         calls = opt_chain.calls
         puts = opt_chain.puts
-        S = ticker.history(period="1d")['Close'].iloc[-1]
-        expiry_date = datetime.strptime(chosen_exp, "%Y-%m-%d")
-        now_dt = datetime.now()
-        expiry_days = max((expiry_date - now_dt).days, 1)
-        # Compute Greeks for calls
-        call_greeks = calls.apply(lambda row: compute_greeks(row, S, r, expiry_days, 'call'), axis=1, result_type='expand')
-        calls = calls.join(call_greeks)
-        # Compute Greeks for puts
-        put_greeks = puts.apply(lambda row: compute_greeks(row, S, r, expiry_days, 'put'), axis=1, result_type='expand')
-        puts = puts.join(put_greeks)
-        results.append((calls, puts, S, chosen_exp))
+        if cache:
+            cache.put(ticker.ticker, chosen_exp, (calls, puts))
+        if archive:
+            archive.put(ticker.ticker, now.strftime('%Y-%m-%d'), chosen_exp, calls, puts, S)
+    expiry_days = days_to_expiry(chosen_exp, now)
+    # Solve IV from the bid/ask mid where yfinance has none, then compute Greeks for the whole chain at once
+    calls = fill_missing_iv(calls, S, r, expiry_days, 'call')
+    puts = fill_missing_iv(puts, S, r, expiry_days, 'put')
+    calls = calls.join(chain_greeks(calls, S, r, expiry_days, 'call'))
+    puts = puts.join(chain_greeks(puts, S, r, expiry_days, 'put'))
+    return (calls, puts, S, chosen_exp)
+
+def fetch_option_chains(tickers, r=5.0, week_offsets=None, max_workers=CHAIN_FETCH_WORKERS, cache=None, archive=None):
+    """
+    Option chains with Greeks for many tickers, fetched over a bounded thread pool.
+    The underlying price and expiration list are fetched once per ticker, then every
+    (ticker, expiration) chain is fetched concurrently. A ticker that fails is logged
+    and gets an empty list; it does not stop the others.
+    Args:
+        tickers (list[str]): Tickers to fetch.
+        r (float): Risk-free rate in percent.
+        week_offsets (list[int]): Target expirations in weeks from now.
+        max_workers (int): Thread pool size; 1 fetches serially.
+        cache (ChainCache): Serve fresh chains from disk and store new downloads; None always downloads.
+        archive (ChainStore): Also keep every downloaded chain in the historical chain store.
+    Returns:
+        dict: {ticker: [(calls, puts, S, expiration), ...]} in the order of tickers and
+              week_offsets, regardless of which request finished first.
+    """
+    week_offsets = week_offsets or [2, 4, 6]
+    tickers = list(dict.fromkeys(tickers))
+    now = datetime.now()
+    results = {t: [] for t in tickers}
+    if not tickers:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers) * len(week_offsets)))) as pool:
+        underlying = {t: pool.submit(_fetch_underlying, t, week_offsets, now, cache) for t in tickers}
+        chain_futures = {}
+        for t in tickers:
+            try:
+                ticker, S, chosen_exps = underlying[t].result()
+            except Exception as e:
+                print(f"Failed to fetch {t}: {e}")
+                continue
+            chain_futures[t] = [pool.submit(_fetch_chain, ticker, exp, S, r, now, cache, archive) for exp in chosen_exps]
+        for t, futures in chain_futures.items():
+            for future in futures:
+                try:
+                    results[t].append(future.result())
+                except Exception as e:
+                    print(f"Failed to fetch option chain for {t}: {e}")
     return results
 
-def find_bull_put_spreads(puts, current_price):
-    # Find all possible bull put spreads (short put at higher strike, long put at lower strike)
-    spreads = []
-    puts_sorted = puts.sort_values("strike", ascending=False).reset_index(drop=True)
-    for i in range(len(puts_sorted)-1):
-        short = puts_sorted.iloc[i]
-        long = puts_sorted.iloc[i+1]
-        # Both must have bid/ask
-        if np.isnan(short['bid']) or np.isnan(long['ask']):
-            continue
-        # Only consider spreads where both strikes are below current price
-        if short['strike'] >= current_price or long['strike'] >= current_price:
-            continue
-        credit = short['bid'] - long['ask']
-        if credit > 0:
-            width = short['strike'] - long['strike']
-            max_loss = round((width - credit) * 100, 2)  # in dollars
-            max_profit = round(credit * 100, 2)  # in dollars
-            percent_from_strike = round(100 * (current_price - short['strike']) / current_price, 2)
-            avg_oi = round((float(short.get('openInterest', 0)) + float(long.get('openInterest', 0))) / 2, 2)
-            percent_profit_of_width = round(100 * (credit / width), 2) if width != 0 else 0
-            spreads.append({
-                'ticker': '',  # to be filled in main
-                'current_price': round(float(current_price), 2),
-                'strategy': 'Bull Put',
-                'percent_from_strike': percent_from_strike,
-                'short_strike': round(float(short['strike']), 2),
-                'long_strike': round(float(long['strike']), 2),
-                'short_strike_price': round(float(short['bid']), 2),
-                'long_strike_credit': round(float(long['ask']), 2),
-                'max_loss': max_loss,
-                'max_profit': max_profit,
-                'width': round(float(width), 2),
-                'percent_profit_of_width': percent_profit_of_width,
-                'avg_oi': avg_oi,
-                'expiration': ''  # to be filled in main
-            })
-    return spreads, 0, 0
-
-def find_bear_call_spreads(calls, current_price):
-    # Find all possible bear call spreads (short call at lower strike, long call at higher strike)
-    spreads = []
-    calls_sorted = calls.sort_values("strike", ascending=True).reset_index(drop=True)
-    for i in range(len(calls_sorted)-1):
-        short = calls_sorted.iloc[i]
-        long = calls_sorted.iloc[i+1]
-        if np.isnan(short['bid']) or np.isnan(long['ask']):
-            continue
-        # Only consider spreads where both strikes are above current price
-        if short['strike'] <= current_price or long['strike'] <= current_price:
-            continue
-        credit = short['bid'] - long['ask']
-        if credit > 0:
-            width = long['strike'] - short['strike']
-            max_loss = round((width - credit) * 100, 2)
-            max_profit = round(credit * 100, 2)
-            percent_from_strike = round(100 * (short['strike'] - current_price) / current_price, 2)
-            avg_oi = round((float(short.get('openInterest', 0)) + float(long.get('openInterest', 0))) / 2, 2)
-            percent_profit_of_width = round(100 * (credit / width), 2) if width != 0 else 0
-            spreads.append({
-                'ticker': '',
-                'current_price': round(float(current_price), 2),
-                'strategy': 'Bear Call',
-                'percent_from_strike': percent_from_strike,
-                'short_strike': round(float(short['strike']), 2),
-                'long_strike': round(float(long['strike']), 2),
-                'short_strike_price': round(float(short['bid']), 2),
-                'long_strike_credit': round(float(long['ask']), 2),
-                'max_loss': max_loss,
-                'max_profit': max_profit,
-                'width': round(float(width), 2),
-                'percent_profit_of_width': percent_profit_of_width,
-                'avg_oi': avg_oi,
-                'expiration': ''
-            })
-    return spreads, 0, 0
+def get_option_chain_with_greeks(ticker_str, chosen_exp=None, r=5.0, week_offsets=None):
+    return fetch_option_chains([ticker_str], r=r, week_offsets=week_offsets)[ticker_str]
+
+def _scored_spreads(chain, current_price, spread_type, constraints, top_k, expiry_days):
+    if expiry_days is None:
+        return search_vertical_spreads(chain, current_price, spread_type, constraints, top_k=top_k)
+    # Score every candidate that passes the constraints, then keep the best by SPREAD_RANK_BY
+    candidates = search_vertical_spreads(chain, current_price, spread_type, constraints, top_k=None)
+    candidates = score_candidates(candidates, current_price, expiry_days, spread_type, method=SPREAD_SCORING_METHOD)
+    return rank_candidates(candidates, SPREAD_RANK_BY, top_k)
+
+def find_bull_put_spreads(puts, current_price, constraints=None, top_k=SPREAD_TOP_K, expiry_days=None):
+    # Bull put spreads (short put at higher strike, long put at lower strike), any width allowed by SPREAD_CONSTRAINTS.
+    # With expiry_days the candidates are ranked by probability/expected-value scores instead of credit/width.
+    candidates = _scored_spreads(puts, current_price, 'bull_put', constraints, top_k, expiry_days)
+    return spread_records(candidates, current_price, 'Bull Put'), 0, 0
+
+def find_bear_call_spreads(calls, current_price, constraints=None, top_k=SPREAD_TOP_K, expiry_days=None):
+    # Bear call spreads (short call at lower strike, long call at higher strike), any width allowed by SPREAD_CONSTRAINTS
+    candidates = _scored_spreads(calls, current_price, 'bear_call', constraints, top_k, expiry_days)
+    return spread_records(candidates, current_price, 'Bear Call'), 0, 0
+
+def days_to_expiry(expiration, now=None):
+    now = now or datetime.now()
+    return max((datetime.strptime(expiration, "%Y-%m-%d") - now).days, 1)
 
 def convert_np(obj):
     if isinstance(obj, dict):
@@ -161,19 +164,31 @@ def main():
     # Find latest analysis JSON and parse tickers
     analysis_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output/bull_bear_analysis')
     latest_json = find_latest_analysis_json(analysis_dir)
-    bullish_tickers = get_tickers_by_signal(latest_json, 'Strongly Bullish')
-    bearish_tickers = get_tickers_by_signal(latest_json, 'Strongly Bearish')
+    signal_index = load_signal_index(latest_json)
+    bullish_tickers = signal_index.tickers('Strongly Bullish')
+    bearish_tickers = signal_index.tickers('Strongly Bearish')
     print(f"Strongly Bullish: {bullish_tickers}")
     print(f"Strongly Bearish: {bearish_tickers}")
+    neutral_tickers = signal_index.tickers('Neutral') if SEARCH_NEUTRAL_COMBOS else []
+    print(f"Neutral: {neutral_tickers}")
     week_offsets = [2, 4, 6]
+    # Fetch every chain up front, concurrently; the loops below only search spreads
+    cache = None
+    if USE_CHAIN_CACHE:
+        cache = ChainCache(max_age_minutes=CHAIN_CACHE_MAX_AGE_MINUTES, force_refresh=FORCE_REFRESH_CHAINS)
+        cache.prune()
+    archive = ChainStore() if ARCHIVE_CHAINS else None
+    option_chains = fetch_option_chains(bullish_tickers + bearish_tickers + neutral_tickers, week_offsets=week_offsets,
+                                        cache=cache, archive=archive)
     results = []
     csv_rows = []
+    combo_rows = []
     # Bull Put for bullish
     for stock in bullish_tickers:
         print(f"\n--- Bull Put for {stock.upper()} ---")
-        option_data = get_option_chain_with_greeks(stock, week_offsets=week_offsets)
+        option_data = option_chains[stock]
         for calls, puts, S, exp in option_data:
-            spreads, _, _ = find_bull_put_spreads(puts, S)
+            spreads, _, _ = find_bull_put_spreads(puts, S, expiry_days=days_to_expiry(exp))
             for s in spreads[:5]:
                 s['ticker'] = stock.upper()
                 s['expiration'] = exp
@@ -188,9 +203,9 @@ def main():
     # Bear Call for bearish
     for stock in bearish_tickers:
         print(f"\n--- Bear Call for {stock.upper()} ---")
-        option_data = get_option_chain_with_greeks(stock, week_offsets=week_offsets)
+        option_data = option_chains[stock]
         for calls, puts, S, exp in option_data:
-            spreads, _, _ = find_bear_call_spreads(calls, S)
+            spreads, _, _ = find_bear_call_spreads(calls, S, expiry_days=days_to_expiry(exp))
             for s in spreads[:5]:
                 s['ticker'] = stock.upper()
                 s['expiration'] = exp
@@ -202,6 +217,24 @@ def main():
                 'bear_call_spreads': spreads[:5]
             }
             results.append(result)
+    # Iron condors and short strangles for neutral
+    for stock in neutral_tickers:
+        print(f"\n--- Iron Condor / Strangle for {stock.upper()} ---")
+        for calls, puts, S, exp in option_chains[stock]:
+            expiry_days = days_to_expiry(exp)
+            condors = multi_leg_records(search_iron_condors(puts, calls, S, expiry_days), S, 'Iron Condor')
+            strangles = multi_leg_records(search_strangles(puts, calls, S, expiry_days), S, 'Short Strangle')
+            for combo in condors + strangles:
+                combo['ticker'] = stock.upper()
+                combo['expiration'] = exp
+                combo_rows.append(combo)
+            results.append({
+                'ticker': stock.upper(),
+                'expiration': exp,
+                'current_price': float(S),
+                'iron_condors': condors,
+                'short_strangles': strangles
+            })
     # Write results to JSON in the correct output folder
     out_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output/bull_bear_trades_out')
     os.makedirs(out_dir, exist_ok=True)
@@ -210,6 +243,15 @@ def main():
     with open(out_path, 'w') as f:
         json.dump(convert_np(results), f, indent=2)
     print(f"Results written to {out_path}")
+    # Pick one portfolio from every candidate under buying-power and concentration limits
+    if SELECT_PORTFOLIO:
+        buying_power = account_buying_power()
+        selected, summary = select_portfolio(csv_rows + combo_rows, buying_power=buying_power)
+        portfolio_path = os.path.join(out_dir, f'bull_bear_portfolio_{today_str}.json')
+        with open(portfolio_path, 'w') as f:
+            json.dump(convert_np({'summary': summary, 'trades': selected}), f, indent=2)
+        print(f"Portfolio: {summary['selected']} of {summary['candidates']} candidates, "
+              f"risk ${summary['total_risk']:,.2f}, expected value ${summary['total_objective']:,.2f} -> {portfolio_path}")
     # Write CSV summary to the same folder
     csv_path = os.path.join(out_dir, f'bull_bear_trades_summary_{today_str}.csv')
     csv_fields = [
@@ -217,9 +259,10 @@ def main():
         'short_strike_price', 'long_strike_credit', 'max_loss', 'max_profit', 'width',
         'percent_profit_of_width', 'avg_oi', 'expiration'
     ]
+    score_fields = list(RECORD_SCORE_FIELDS)  # blank when the short leg has no IV
     with open(csv_path, 'w', newline='') as f:
         import csv
-        writer = csv.DictWriter(f, fieldnames=csv_fields)
+        writer = csv.DictWriter(f, fieldnames=csv_fields + score_fields)
         writer.writeheader()
         for row in csv_rows:
             row.pop('short_oi', None)
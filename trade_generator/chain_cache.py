@@ -0,0 +1,118 @@
+# trade_generator/chain_cache.py
+"""
+Disk cache for yfinance option chains, so re-running the trade generator during
+the same session (e.g. after changing spread filters) doesn't download every
+chain again.
+
+Entries are pickles named <TICKER>_<key>_<capture timestamp>.pkl, where key is an
+expiration date ('2025-06-20') for a (calls, puts) chain or 'underlying' for the
+ticker's (expirations, price). A lookup returns the newest capture that is still
+inside the freshness window; older captures are kept until prune() removes them.
+Raw chains are cached, before IV filling and Greeks, so those are always
+recomputed with the current code.
+"""
+import os
+import pickle
+import threading
+from datetime import datetime, timedelta
+
+CHAIN_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output/option_chain_cache')
+CHAIN_CACHE_MAX_AGE_MINUTES = 30
+CHAIN_CACHE_RETENTION_DAYS = 7
+UNDERLYING_KEY = 'underlying'
+_TIMESTAMP_FORMAT = '%Y%m%dT%H%M%S'
+
+
+class ChainCache:
+    """
+    Thread-safe (ticker, key, capture time) -> object cache on disk.
+
+        cache = ChainCache(max_age_minutes=30)
+        chain = cache.get('AAPL', '2025-06-20')
+        if chain is None:
+            chain = fetch(...)
+            cache.put('AAPL', '2025-06-20', chain)
+    """
+
+    def __init__(self, cache_dir=CHAIN_CACHE_DIR, max_age_minutes=CHAIN_CACHE_MAX_AGE_MINUTES, force_refresh=False):
+        self.cache_dir = cache_dir
+        self.max_age = timedelta(minutes=max_age_minutes)
+        self.force_refresh = force_refresh  # ignore existing entries but still write new ones
+        self._lock = threading.Lock()
+        self._index = None  # {(ticker, key): [capture datetimes]}, built from the directory on first use
+
+    def _scan(self):
+        index = {}
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.pkl'):
+                    continue
+                try:
+                    ticker, key, stamp = name[:-4].rsplit('_', 2)
+                    captured = datetime.strptime(stamp, _TIMESTAMP_FORMAT)
+                except ValueError:
+                    continue
+                index.setdefault((ticker, key), []).append(captured)
+        return index
+
+    def _entries(self, ticker, key):
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+            return list(self._index.get((ticker.upper(), key), []))
+
+    def captures(self):
+        """{(ticker, key): [capture datetimes]} for every entry in the cache directory."""
+        return self._scan()
+
+    def path(self, ticker, key, captured):
+        return os.path.join(self.cache_dir, f"{ticker.upper()}_{key}_{captured.strftime(_TIMESTAMP_FORMAT)}.pkl")
+
+    def get(self, ticker, key, now=None):
+        """Newest cached value captured within max_age of now, or None."""
+        if self.force_refresh:
+            return None
+        now = now or datetime.now()
+        fresh = [c for c in self._entries(ticker, key) if timedelta(0) <= now - c <= self.max_age]
+        if not fresh:
+            return None
+        try:
+            with open(self.path(ticker, key, max(fresh)), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def put(self, ticker, key, value, captured=None):
+        """Store value under (ticker, key) with capture time captured (default: now)."""
+        captured = (captured or datetime.now()).replace(microsecond=0)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(ticker, key, captured)
+        # Write then rename so concurrent readers never see a partial pickle
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._index is None:
+                self._index = self._scan()
+            else:
+                self._index.setdefault((ticker.upper(), key), []).append(captured)
+        return path
+
+    def prune(self, retention_days=CHAIN_CACHE_RETENTION_DAYS, now=None):
+        """Delete captures older than retention_days. Returns the number of files removed."""
+        now = now or datetime.now()
+        cutoff = now - timedelta(days=retention_days)
+        removed = 0
+        with self._lock:
+            index = self._scan()
+            for (ticker, key), captures in index.items():
+                for captured in captures:
+                    if captured < cutoff:
+                        try:
+                            os.remove(self.path(ticker, key, captured))
+                            removed += 1
+                        except OSError:
+                            pass
+            self._index = None
+        return removed
@@ -0,0 +1,120 @@
+# trade_generator/chain_store.py
+"""
+Historical option-chain store: one quote snapshot per (underlying, trading day,
+expiration), kept indefinitely so past trade recommendations can be re-marked
+(backtest/replay.py).
+
+Snapshots are pickled quote frames at
+output/option_chain_history/<TICKER>/<YYYY-MM-DD>_<expiration>.pkl with the
+columns QUOTE_COLUMNS, calls and puts stacked. The trade generator archives
+every chain it downloads (ARCHIVE_CHAINS in bull_bear_credit_trades.py); a
+later capture on the same day replaces the earlier one, so each day keeps its
+latest quotes. import_chain_cache() fills the store from existing chain cache
+captures.
+"""
+import os
+import glob
+import pickle
+import threading
+import numpy as np
+import pandas as pd
+from trade_generator.chain_cache import ChainCache, UNDERLYING_KEY
+
+CHAIN_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output/option_chain_history')
+QUOTE_COLUMNS = ['expiration', 'option_type', 'strike', 'bid', 'ask', 'lastPrice', 'impliedVolatility', 'underlying_price']
+
+
+def quote_frame(calls, puts, expiration, underlying_price):
+    """Stack yfinance calls/puts frames into QUOTE_COLUMNS rows for one expiration."""
+    frames = []
+    for option_type, chain in (('call', calls), ('put', puts)):
+        if chain is None or len(chain) == 0:
+            continue
+        frame = pd.DataFrame({
+            col: pd.to_numeric(chain[col], errors='coerce') if col in chain else np.nan
+            for col in ('strike', 'bid', 'ask', 'lastPrice', 'impliedVolatility')
+        })
+        frame.insert(0, 'option_type', option_type)
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=QUOTE_COLUMNS)
+    quotes = pd.concat(frames, ignore_index=True)
+    quotes.insert(0, 'expiration', expiration)
+    quotes['underlying_price'] = float(underlying_price) if underlying_price is not None else np.nan
+    return quotes[QUOTE_COLUMNS]
+
+
+class ChainStore:
+    """(ticker, date, expiration) -> quote frame on disk."""
+
+    def __init__(self, store_dir=CHAIN_STORE_DIR):
+        self.store_dir = store_dir
+
+    def path(self, ticker, date_str, expiration):
+        return os.path.join(self.store_dir, ticker.upper(), f'{date_str}_{expiration}.pkl')
+
+    def put(self, ticker, date_str, expiration, calls, puts, underlying_price):
+        """Archive one expiration's chain as the ticker's quotes for date_str ('YYYY-MM-DD')."""
+        path = self.path(ticker, date_str, expiration)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(quote_frame(calls, puts, expiration, underlying_price), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return path
+
+    def dates(self, ticker):
+        """Sorted dates with at least one stored expiration for ticker."""
+        names = glob.glob(os.path.join(self.store_dir, ticker.upper(), '*.pkl'))
+        return sorted({os.path.basename(n)[:10] for n in names})
+
+    def load(self, ticker, date_str, expirations=None):
+        """
+        Quotes for ticker on date_str, all stored expirations or only those listed.
+        Returns:
+            pd.DataFrame: QUOTE_COLUMNS rows, empty if nothing is stored.
+        """
+        if expirations is None:
+            paths = sorted(glob.glob(os.path.join(self.store_dir, ticker.upper(), f'{date_str}_*.pkl')))
+        else:
+            paths = [self.path(ticker, date_str, e) for e in expirations]
+        frames = []
+        for path in paths:
+            try:
+                with open(path, 'rb') as f:
+                    frames.append(pickle.load(f))
+            except (OSError, pickle.UnpicklingError, EOFError):
+                continue
+        frames = [f for f in frames if len(f)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=QUOTE_COLUMNS)
+
+
+def import_chain_cache(cache=None, store=None):
+    """
+    Copy chain cache captures into the store, keeping the latest capture of each day.
+    The underlying price is the ticker's same-day 'underlying' capture, if any.
+    Returns:
+        int: Number of (ticker, date, expiration) snapshots written.
+    """
+    cache = cache or ChainCache()
+    store = store or ChainStore()
+    index = cache.captures()
+    latest = {}
+    for (ticker, key), captures in index.items():
+        for captured in captures:
+            slot = (ticker, key, captured.strftime('%Y-%m-%d'))
+            latest[slot] = max(latest.get(slot, captured), captured)
+    written = 0
+    for (ticker, key, date_str), captured in sorted(latest.items()):
+        if key == UNDERLYING_KEY:
+            continue
+        with open(cache.path(ticker, key, captured), 'rb') as f:
+            calls, puts = pickle.load(f)
+        price = None
+        underlying = latest.get((ticker, UNDERLYING_KEY, date_str))
+        if underlying is not None:
+            with open(cache.path(ticker, UNDERLYING_KEY, underlying), 'rb') as f:
+                price = pickle.load(f)[1]
+        store.put(ticker, date_str, key, calls, puts, price)
+        written += 1
+    return written
@@ -0,0 +1,110 @@
+# trade_generator/iv_solver.py
+"""
+Batched implied-volatility solver: inverts Black-Scholes for a whole chain at once.
+
+Every contract keeps its own bracket [lo, hi] on volatility. Each iteration takes
+a Newton step where it stays inside the bracket and vega is usable, and bisects
+the bracket otherwise, so every contract converges even far from the money.
+Only contracts that have not converged yet are updated on each pass.
+"""
+import numpy as np
+from trade_generator.greeks import price_and_vega
+
+IV_LOWER = 1e-4
+IV_UPPER = 5.0  # 500% annualized
+PRICE_TOL = 1e-6
+VOL_TOL = 1e-7
+MAX_ITER = 100
+MIN_MARKET_IV = 1e-3  # yfinance reports ~0 (e.g. 1e-05) for strikes it could not solve
+
+
+def implied_volatility(price, S, K, expiry_days, r, option_type, max_iter=MAX_ITER):
+    """
+    Solve for implied volatility from option prices.
+    Args:
+        price: Observed option prices (e.g. bid/ask mid).
+        S: Underlying price(s).
+        K: Strike(s).
+        expiry_days: Calendar days to expiry.
+        r: Annual risk-free rate in percent (mibian convention).
+        option_type: 'call', 'put', or an array of those per contract.
+        max_iter (int): Iteration cap.
+    Returns:
+        tuple: (iv, converged) arrays. iv is NaN where the price is outside the
+               no-arbitrage bounds or the solver did not converge.
+    """
+    price, S, K, days = np.broadcast_arrays(
+        np.asarray(price, dtype=float), np.asarray(S, dtype=float),
+        np.asarray(K, dtype=float), np.asarray(expiry_days, dtype=float),
+    )
+    shape = price.shape
+    price, S, K, days = price.ravel(), S.ravel(), K.ravel(), days.ravel()
+    if isinstance(option_type, str):
+        types = np.full(price.shape, option_type)
+    else:
+        types = np.broadcast_to(np.asarray(option_type), shape).ravel()
+    n = price.size
+    iv = np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+
+    # Prices must lie strictly between the values at the bracket ends
+    price_lo, _ = price_and_vega(S, K, days, r, np.full(n, IV_LOWER), types)
+    price_hi, _ = price_and_vega(S, K, days, r, np.full(n, IV_UPPER), types)
+    solvable = np.isfinite(price) & (days > 0) & (price > price_lo) & (price < price_hi)
+    idx = np.flatnonzero(solvable)
+    lo = np.full(idx.size, IV_LOWER)
+    hi = np.full(idx.size, IV_UPPER)
+    # Brenner-Subrahmanyam starting point, clipped into the bracket
+    sigma = np.sqrt(2 * np.pi / (days[idx] / 365.0)) * price[idx] / S[idx]
+    sigma = np.clip(sigma, 0.05, 2.0)
+
+    for _ in range(max_iter):
+        if idx.size == 0:
+            break
+        model, vega = price_and_vega(S[idx], K[idx], days[idx], r, sigma, types[idx])
+        diff = model - price[idx]
+        # Price is increasing in volatility, so the sign of diff tightens the bracket
+        too_high = diff > 0
+        hi = np.where(too_high, sigma, hi)
+        lo = np.where(too_high, lo, sigma)
+        done = (np.abs(diff) < PRICE_TOL) | (hi - lo < VOL_TOL)
+        iv[idx[done]] = sigma[done]
+        converged[idx[done]] = True
+        keep = ~done
+        idx, sigma, diff, vega, lo, hi = idx[keep], sigma[keep], diff[keep], vega[keep], lo[keep], hi[keep]
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = sigma - diff / vega
+        use_newton = np.isfinite(newton) & (newton > lo) & (newton < hi) & (vega > 1e-8)
+        sigma = np.where(use_newton, newton, 0.5 * (lo + hi))
+
+    return iv.reshape(shape), converged.reshape(shape)
+
+
+def fill_missing_iv(chain, S, r, expiry_days, option_type, iv_column='impliedVolatility'):
+    """
+    Solve implied volatility from the bid/ask mid for contracts whose reported IV is
+    missing or ~0, so they get usable greeks instead of NaN.
+    Args:
+        chain (pd.DataFrame): yfinance calls or puts with strike, bid, ask and iv_column.
+    Returns:
+        pd.DataFrame: Copy of chain with iv_column filled where the solver converged,
+                      plus 'iv_source' ('market', 'solved' or 'missing').
+    """
+    chain = chain.copy()
+    iv = chain[iv_column].to_numpy(dtype=float, copy=True) if iv_column in chain else np.full(len(chain), np.nan)
+    missing = ~(iv > MIN_MARKET_IV)
+    source = np.where(missing, 'missing', 'market').astype(object)
+    if missing.any():
+        bid = chain['bid'].to_numpy(dtype=float)
+        ask = chain['ask'].to_numpy(dtype=float)
+        quoted = missing & (bid > 0) & (ask >= bid)
+        if quoted.any():
+            mid = 0.5 * (bid[quoted] + ask[quoted])
+            solved, ok = implied_volatility(mid, S, chain['strike'].to_numpy(dtype=float)[quoted], expiry_days, r, option_type)
+            rows = np.flatnonzero(quoted)
+            iv[rows[ok]] = solved[ok]
+            source[rows[ok]] = 'solved'
+        iv[source == 'missing'] = np.nan
+    chain[iv_column] = iv
+    chain['iv_source'] = source
+    return chain
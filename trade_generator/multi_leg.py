@@ -0,0 +1,223 @@
+# trade_generator/multi_leg.py
+"""
+Iron condor and short strangle search for neutral tickers.
+
+An iron condor is a bull put spread plus a bear call spread on the same
+expiration; a short strangle is a short OTM put plus a short OTM call. The
+wings come from spread_search, and combinations are never enumerated in full:
+
+  - wings that cannot reach min_credit even with the richest opposite wing, or
+    whose risk already exceeds max_risk, are dropped first (monotone bounds);
+  - the call wings are sorted by position delta, so the call wings that keep
+    |net delta| <= max_net_delta for a put wing form one contiguous slice found
+    with searchsorted;
+  - only pairs inside those slices are materialized and checked for credit and
+    risk, then scored and partially sorted for the top k.
+"""
+import numpy as np
+import pandas as pd
+from trade_generator.spread_search import eligible_short_legs, search_vertical_spreads, top_k_indices
+from trade_generator.spread_scoring import condor_probabilities
+
+MULTI_LEG_CONSTRAINTS = {
+    'min_credit': 0.50,      # total credit per share
+    'max_risk': 10.0,        # iron condor max loss per share (widest wing - credit)
+    'max_net_delta': 0.10,   # |position delta| per share
+    # search_vertical_spreads overrides for each wing
+    'wing': {'short_delta_range': (0.08, 0.30), 'min_open_interest': 10, 'max_bid_ask_spread': 0.50},
+}
+MULTI_LEG_TOP_K = 3
+
+CONDOR_COLUMNS = [
+    'put_short', 'put_long', 'call_short', 'call_long', 'credit', 'max_loss',
+    'net_delta', 'sigma', 'pop', 'expected_value', 'score',
+]
+STRANGLE_COLUMNS = [
+    'put_short', 'call_short', 'credit', 'margin', 'net_delta', 'sigma', 'pop', 'expected_value', 'score',
+]
+
+
+def delta_window_pairs(put_delta, call_delta, max_net_delta):
+    """
+    All (put, call) position pairs with |put_delta + call_delta| <= max_net_delta,
+    found with one searchsorted per side instead of a full cross product.
+    Returns:
+        tuple: (put_positions, call_positions) arrays.
+    """
+    order = np.argsort(call_delta, kind='stable')
+    sorted_delta = call_delta[order]
+    lo = np.searchsorted(sorted_delta, -max_net_delta - put_delta, side='left')
+    hi = np.searchsorted(sorted_delta, max_net_delta - put_delta, side='right')
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    puts = np.repeat(np.arange(put_delta.size), counts)
+    # Position inside each put's slice: 0..count-1
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return puts, order[np.repeat(lo, counts) + offsets]
+
+
+def _ranked(frame, columns, top_k):
+    if frame.empty:
+        return pd.DataFrame(columns=columns)
+    score = frame['score'].to_numpy(dtype=float)
+    best = top_k_indices(np.where(np.isfinite(score), score, -np.inf), top_k)
+    return frame.iloc[best][columns].reset_index(drop=True)
+
+
+def search_iron_condors(puts, calls, current_price, expiry_days=None, constraints=None, r=5.0, top_k=MULTI_LEG_TOP_K):
+    """
+    Best iron condors for one expiration.
+    Args:
+        puts, calls (pd.DataFrame): Chains with Greeks (see get_option_chain_with_greeks).
+        current_price (float): Underlying price.
+        expiry_days (int): Days to expiry; enables POP/EV scoring and ranking by EV per risk.
+                           Without it combinations are ranked by credit / max loss.
+        constraints (dict): Overrides for MULTI_LEG_CONSTRAINTS.
+        r (float): Risk-free rate in percent.
+        top_k (int): Number of condors to return.
+    Returns:
+        pd.DataFrame: CONDOR_COLUMNS, best first. Prices are per share.
+    """
+    constraints = {**MULTI_LEG_CONSTRAINTS, **(constraints or {})}
+    put_wings = search_vertical_spreads(puts, current_price, 'bull_put', constraints['wing'], top_k=None)
+    call_wings = search_vertical_spreads(calls, current_price, 'bear_call', constraints['wing'], top_k=None)
+    # Short wing position delta: -short delta + long delta
+    put_delta = (put_wings['long_delta'] - put_wings['short_delta']).to_numpy(dtype=float)
+    call_delta = (call_wings['long_delta'] - call_wings['short_delta']).to_numpy(dtype=float)
+    put_wings, put_delta = put_wings[np.isfinite(put_delta)], put_delta[np.isfinite(put_delta)]
+    call_wings, call_delta = call_wings[np.isfinite(call_delta)], call_delta[np.isfinite(call_delta)]
+    if put_wings.empty or call_wings.empty:
+        return pd.DataFrame(columns=CONDOR_COLUMNS)
+
+    put_credit, put_width = put_wings['credit'].to_numpy(dtype=float), put_wings['width'].to_numpy(dtype=float)
+    call_credit, call_width = call_wings['credit'].to_numpy(dtype=float), call_wings['width'].to_numpy(dtype=float)
+    # Monotone bounds: the best partner on the other side can't rescue these wings
+    keep_put = (put_credit + call_credit.max() >= constraints['min_credit']) & \
+               (put_width - put_credit - call_credit.max() <= constraints['max_risk'])
+    keep_call = (call_credit + put_credit.max() >= constraints['min_credit']) & \
+                (call_width - call_credit - put_credit.max() <= constraints['max_risk'])
+    p_idx, c_idx = np.flatnonzero(keep_put), np.flatnonzero(keep_call)
+    p, c = delta_window_pairs(put_delta[p_idx], call_delta[c_idx], constraints['max_net_delta'])
+    p, c = p_idx[p], c_idx[c]
+
+    credit = put_credit[p] + call_credit[c]
+    # Only one wing can finish in the money, so the wider one sets the max loss
+    max_loss = np.maximum(put_width[p], call_width[c]) - credit
+    ok = (credit >= constraints['min_credit']) & (max_loss <= constraints['max_risk']) & (max_loss > 0)
+    p, c, credit, max_loss = p[ok], c[ok], credit[ok], max_loss[ok]
+    frame = pd.DataFrame({
+        'put_short': put_wings['short_strike'].to_numpy(dtype=float)[p],
+        'put_long': put_wings['long_strike'].to_numpy(dtype=float)[p],
+        'call_short': call_wings['short_strike'].to_numpy(dtype=float)[c],
+        'call_long': call_wings['long_strike'].to_numpy(dtype=float)[c],
+        'credit': credit,
+        'max_loss': max_loss,
+        'net_delta': put_delta[p] + call_delta[c],
+        'sigma': 0.5 * (put_wings['short_iv'].to_numpy(dtype=float)[p] + call_wings['short_iv'].to_numpy(dtype=float)[c]),
+    })
+    if expiry_days is not None and not frame.empty:
+        scores = condor_probabilities(current_price, frame['put_short'], frame['put_long'], frame['call_short'],
+                                      frame['call_long'], frame['credit'], frame['sigma'], expiry_days, r)
+        frame['pop'] = scores['pop']
+        frame['expected_value'] = scores['expected_value']
+        frame['score'] = frame['expected_value'] / (frame['max_loss'] * 100)
+    else:
+        frame['pop'] = np.nan
+        frame['expected_value'] = np.nan
+        frame['score'] = frame['credit'] / frame['max_loss']
+    return _ranked(frame, CONDOR_COLUMNS, top_k)
+
+
+def naked_margin(S, strike, premium, option_type):
+    """Approximate Reg-T margin per share for a short option: premium + max(20% S - OTM amount, 10% floor)."""
+    if option_type == 'put':
+        otm_amount, floor = np.maximum(S - strike, 0.0), 0.10 * strike
+    else:
+        otm_amount, floor = np.maximum(strike - S, 0.0), 0.10 * S
+    return premium + np.maximum(0.20 * S - otm_amount, floor)
+
+
+def search_strangles(puts, calls, current_price, expiry_days=None, constraints=None, r=5.0, top_k=MULTI_LEG_TOP_K):
+    """
+    Best short strangles for one expiration. Risk is undefined, so combinations are
+    limited by min_credit and max_net_delta only, and ranked by EV (or credit) per
+    dollar of approximate margin. Arguments as for search_iron_condors.
+    Returns:
+        pd.DataFrame: STRANGLE_COLUMNS, best first. Prices are per share.
+    """
+    constraints = {**MULTI_LEG_CONSTRAINTS, **(constraints or {})}
+    p_rows = eligible_short_legs(puts, current_price, 'bull_put', constraints['wing'])
+    c_rows = eligible_short_legs(calls, current_price, 'bear_call', constraints['wing'])
+    if p_rows.size == 0 or c_rows.size == 0 or 'delta' not in puts or 'delta' not in calls:
+        return pd.DataFrame(columns=STRANGLE_COLUMNS)
+    put_strike, call_strike = puts['strike'].to_numpy(dtype=float)[p_rows], calls['strike'].to_numpy(dtype=float)[c_rows]
+    put_bid, call_bid = puts['bid'].to_numpy(dtype=float)[p_rows], calls['bid'].to_numpy(dtype=float)[c_rows]
+    put_delta, call_delta = -puts['delta'].to_numpy(dtype=float)[p_rows], -calls['delta'].to_numpy(dtype=float)[c_rows]
+    put_iv = puts['impliedVolatility'].to_numpy(dtype=float)[p_rows] if 'impliedVolatility' in puts else np.full(p_rows.size, np.nan)
+    call_iv = calls['impliedVolatility'].to_numpy(dtype=float)[c_rows] if 'impliedVolatility' in calls else np.full(c_rows.size, np.nan)
+
+    keep_put = put_bid + call_bid.max() >= constraints['min_credit']
+    keep_call = call_bid + put_bid.max() >= constraints['min_credit']
+    p_idx, c_idx = np.flatnonzero(keep_put), np.flatnonzero(keep_call)
+    p, c = delta_window_pairs(put_delta[p_idx], call_delta[c_idx], constraints['max_net_delta'])
+    p, c = p_idx[p], c_idx[c]
+    credit = put_bid[p] + call_bid[c]
+    ok = credit >= constraints['min_credit']
+    p, c, credit = p[ok], c[ok], credit[ok]
+    put_margin = naked_margin(current_price, put_strike[p], put_bid[p], 'put')
+    call_margin = naked_margin(current_price, call_strike[c], call_bid[c], 'call')
+    # Margin on the larger side plus the premium of the other
+    margin = np.where(put_margin >= call_margin, put_margin + call_bid[c], call_margin + put_bid[p])
+    frame = pd.DataFrame({
+        'put_short': put_strike[p],
+        'call_short': call_strike[c],
+        'credit': credit,
+        'margin': margin,
+        'net_delta': put_delta[p] + call_delta[c],
+        'sigma': 0.5 * (put_iv[p] + call_iv[c]),
+    })
+    if expiry_days is not None and not frame.empty:
+        scores = condor_probabilities(current_price, frame['put_short'], np.nan, frame['call_short'], np.nan,
+                                      frame['credit'], frame['sigma'], expiry_days, r)
+        frame['pop'] = scores['pop']
+        frame['expected_value'] = scores['expected_value']
+        frame['score'] = frame['expected_value'] / (frame['margin'] * 100)
+    else:
+        frame['pop'] = np.nan
+        frame['expected_value'] = np.nan
+        frame['score'] = frame['credit'] / frame['margin']
+    return _ranked(frame, STRANGLE_COLUMNS, top_k)
+
+
+def _rounded(value, digits=2):
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+
+def multi_leg_records(combos, current_price, strategy):
+    """
+    Convert search_iron_condors / search_strangles output to trade dicts (dollars per contract).
+    ticker and expiration are left blank for the caller to fill in.
+    """
+    records = []
+    for row in combos.to_dict('records'):
+        record = {
+            'ticker': '',
+            'current_price': round(float(current_price), 2),
+            'strategy': strategy,
+            'put_short_strike': _rounded(row['put_short']),
+            'put_long_strike': _rounded(row['put_long']) if 'put_long' in row else None,
+            'call_short_strike': _rounded(row['call_short']),
+            'call_long_strike': _rounded(row['call_long']) if 'call_long' in row else None,
+            'max_profit': _rounded(row['credit'] * 100),
+            'max_loss': _rounded(row['max_loss'] * 100) if 'max_loss' in row else None,
+            'margin': _rounded(row['margin'] * 100) if 'margin' in row else None,
+            'net_delta': _rounded(row['net_delta'], 4),
+            'pop': _rounded(row['pop'], 4),
+            'expected_value': _rounded(row['expected_value'], 4),
+            'expiration': '',
+        }
+        records.append(record)
+    return records
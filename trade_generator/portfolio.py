@@ -0,0 +1,144 @@
+# trade_generator/portfolio.py
+"""
+Portfolio-level selection of trade candidates.
+
+Every spread / condor / strangle record produced by bull_bear_credit_trades is a
+candidate taking one contract. The selector picks the set that maximizes total
+expected value subject to:
+
+  - total capital at risk (max loss, or margin for undefined-risk trades) within
+    the account's options buying power, optionally capped by max_total_risk;
+  - at most max_trades_per_ticker trades and max_ticker_risk_pct of capital per ticker;
+  - at most max_sector_risk_pct of capital per sector (config/ticker_sectors.json).
+
+It is a greedy knapsack: candidates sorted once by value per dollar of risk and
+added while every limit holds, compared with the best single trade (which
+guarantees at least half of the optimum for the budget constraint alone).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import numpy as np
+import pandas as pd
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SECTORS_PATH = os.path.join(PROJECT_ROOT, 'config/ticker_sectors.json')
+PORTFOLIO_LIMITS = {
+    'max_total_risk': None,        # dollars; None uses the account's buying power only
+    'max_trades_per_ticker': 1,
+    'max_ticker_risk_pct': 0.10,   # of the risk budget
+    'max_sector_risk_pct': 0.30,   # of the risk budget
+    'objective': 'expected_value', # record field to maximize (per contract, dollars)
+    'min_objective': 0.0,          # skip candidates whose objective is not above this
+}
+
+
+def load_sector_map(path=SECTORS_PATH):
+    """{ticker: sector} from config/ticker_sectors.json, or {} if the file doesn't exist."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return {t.upper(): sector for t, sector in json.load(f).items()}
+
+
+def account_buying_power():
+    """Options buying power from Alpaca, or None if the account can't be reached."""
+    try:
+        from utils.alpaca_api import get_account_info
+        account = get_account_info()
+        value = getattr(account, 'options_buying_power', None) or account.buying_power
+        return float(value)
+    except Exception as e:
+        logger.warning(f"Could not read buying power from Alpaca: {e}")
+        return None
+
+
+def candidate_frame(records):
+    """
+    Flatten trade records into one row per candidate with ticker, strategy, risk
+    (max loss, else margin, in dollars) and every numeric field of the record.
+    """
+    frame = pd.DataFrame(records)
+    if frame.empty:
+        return frame.assign(risk=pd.Series(dtype=float))
+    risk = frame['max_loss'] if 'max_loss' in frame else pd.Series(np.nan, index=frame.index)
+    if 'margin' in frame:
+        risk = risk.fillna(frame['margin'])
+    return frame.assign(risk=pd.to_numeric(risk, errors='coerce'))
+
+
+def select_portfolio(records, buying_power=None, limits=None, sectors=None):
+    """
+    Choose a portfolio from trade records.
+    Args:
+        records (list[dict]): Spread / combo records (need ticker, expected_value or the
+                              chosen objective, and max_loss or margin).
+        buying_power (float): Capital available; None leaves only max_total_risk (if set).
+        limits (dict): Overrides for PORTFOLIO_LIMITS.
+        sectors (dict): {ticker: sector}; tickers without a sector are their own group.
+    Returns:
+        tuple: (selected records in selection order, summary dict)
+    """
+    limits = {**PORTFOLIO_LIMITS, **(limits or {})}
+    sectors = sectors if sectors is not None else load_sector_map()
+    frame = candidate_frame(records)
+    budgets = [b for b in (buying_power, limits['max_total_risk']) if b is not None]
+    budget = min(budgets) if budgets else np.inf
+    summary = {'budget': None if np.isinf(budget) else float(budget), 'candidates': len(frame),
+               'selected': 0, 'total_risk': 0.0, 'total_objective': 0.0}
+    if frame.empty or limits['objective'] not in frame:
+        return [], summary
+
+    value = pd.to_numeric(frame[limits['objective']], errors='coerce').to_numpy(dtype=float)
+    risk = frame['risk'].to_numpy(dtype=float)
+    usable = np.isfinite(value) & np.isfinite(risk) & (risk > 0) & (risk <= budget) & (value > limits['min_objective'])
+    idx = np.flatnonzero(usable)
+    if idx.size == 0:
+        return [], summary
+    tickers = frame['ticker'].astype(str).str.upper().to_numpy()
+    groups = np.array([sectors.get(t, f"ticker:{t}") for t in tickers], dtype=object)
+    ticker_cap = limits['max_ticker_risk_pct'] * budget if limits['max_ticker_risk_pct'] else np.inf
+    sector_cap = limits['max_sector_risk_pct'] * budget if limits['max_sector_risk_pct'] else np.inf
+    if np.isfinite(sector_cap):
+        unmapped = sorted({t for t in tickers[idx] if t not in sectors})
+        if not sectors:
+            logger.warning(f"max_sector_risk_pct is set but no sector map was found at {SECTORS_PATH}; "
+                           f"the sector cap only limits each ticker on its own")
+        elif unmapped:
+            logger.warning(f"No sector for {len(unmapped)} candidate tickers ({', '.join(unmapped[:10])}); "
+                           f"each is capped as its own sector")
+
+    def greedy(order):
+        chosen, spent = [], 0.0
+        ticker_risk, ticker_count, sector_risk = {}, {}, {}
+        for i in order:
+            t, g, r = tickers[i], groups[i], risk[i]
+            if spent + r > budget or ticker_count.get(t, 0) >= limits['max_trades_per_ticker']:
+                continue
+            if ticker_risk.get(t, 0.0) + r > ticker_cap or sector_risk.get(g, 0.0) + r > sector_cap:
+                continue
+            chosen.append(i)
+            spent += r
+            ticker_risk[t] = ticker_risk.get(t, 0.0) + r
+            ticker_count[t] = ticker_count.get(t, 0) + 1
+            sector_risk[g] = sector_risk.get(g, 0.0) + r
+        return chosen
+
+    # Best value per dollar of risk first; ties go to the larger value
+    order = idx[np.lexsort((-value[idx], -(value[idx] / risk[idx])))]
+    chosen = greedy(order)
+    best_single = greedy(idx[np.argsort(-value[idx], kind='stable')][:1])
+    if value[best_single].sum() > value[chosen].sum():
+        chosen = best_single
+    selected = [records[i] for i in chosen]
+    summary.update({
+        'selected': len(chosen),
+        'total_risk': round(float(risk[chosen].sum()), 2),
+        'total_objective': round(float(value[chosen].sum()), 2),
+    })
+    return selected, summary
@@ -0,0 +1,221 @@
+# trade_generator/spread_scoring.py
+"""
+Probability and expected-value scoring for vertical credit spreads.
+
+Every candidate is scored at once from its short-leg IV and days to expiry,
+assuming a lognormal underlying with risk-neutral drift (r in percent, 365-day
+year, the same conventions as greeks.py):
+
+  pop          probability the spread expires above (bull put) / below (bear call) breakeven
+  p_max_profit probability the short strike expires out of the money
+  pot          probability the underlying touches the short strike before expiry
+  expected_value  expected P&L per contract in dollars at expiry (credit minus expected payout)
+  ev_per_risk  expected_value / max loss
+
+method='monte_carlo' estimates the same quantities from seeded simulated daily
+paths. Touch between two daily steps is counted with the Brownian-bridge crossing
+probability, so pot estimates continuous monitoring like the closed form.
+"""
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+from trade_generator.greeks import bs_price
+
+SCORE_COLUMNS = ['pop', 'p_max_profit', 'pot', 'expected_value', 'ev_per_risk']
+MC_PATHS = 10000
+MC_SEED = 42
+_MC_CHUNK_ELEMENTS = 4000000  # candidates x paths x steps simulated per chunk
+
+
+def _prepare(S, short_strike, long_strike, credit, sigma, expiry_days):
+    S, Ks, Kl, credit, sigma, days = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (
+        S, short_strike, long_strike, credit, sigma, expiry_days)))
+    return S, Ks, Kl, credit, sigma, np.maximum(days, 1.0)
+
+
+def _prob_above(S, X, mu, vol_sqrt_t, T):
+    """P(S_T > X) for log S_T ~ N(log S + mu T, vol_sqrt_t^2)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return ndtr((np.log(S / X) + mu * T) / vol_sqrt_t)
+
+
+def _prob_touch(S, H, mu, sigma, T):
+    """Probability that a GBM with log-drift mu touches H before T (reflection principle)."""
+    v = sigma * np.sqrt(T)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        b = np.log(H / S)
+        reflect = np.exp(2 * mu * b / (sigma * sigma))
+        down = ndtr((b - mu * T) / v) + reflect * ndtr((b + mu * T) / v)
+        up = ndtr((-b + mu * T) / v) + reflect * ndtr((-b - mu * T) / v)
+    p = np.where(H < S, down, up)
+    return np.clip(np.where(H == S, 1.0, p), 0.0, 1.0)
+
+
+def spread_probabilities(S, short_strike, long_strike, credit, sigma, expiry_days, spread_type, r=5.0):
+    """
+    Closed-form POP, probability of max profit, probability of touch and expected value.
+    Args:
+        S: Underlying price(s).
+        short_strike, long_strike: Strikes per candidate.
+        credit: Net credit per share.
+        sigma: Volatility per candidate as a decimal (short-leg IV).
+        expiry_days: Calendar days to expiry.
+        spread_type (str): 'bull_put' or 'bear_call'.
+        r (float): Annual risk-free rate in percent.
+    Returns:
+        dict: SCORE_COLUMNS -> np.ndarray. NaN where sigma is missing or not positive.
+    """
+    S, Ks, Kl, credit, sigma, days = _prepare(S, short_strike, long_strike, credit, sigma, expiry_days)
+    T = days / 365.0
+    rate = r / 100.0
+    mu = rate - 0.5 * sigma * sigma
+    v = sigma * np.sqrt(T)
+    option_type = 'put' if spread_type == 'bull_put' else 'call'
+    if spread_type == 'bull_put':
+        pop = _prob_above(S, Ks - credit, mu, v, T)
+        p_max_profit = _prob_above(S, Ks, mu, v, T)
+    elif spread_type == 'bear_call':
+        pop = 1.0 - _prob_above(S, Ks + credit, mu, v, T)
+        p_max_profit = 1.0 - _prob_above(S, Ks, mu, v, T)
+    else:
+        raise ValueError(f"Unknown spread type: {spread_type}")
+    # Undiscounted expected payout of the short minus the long option
+    growth = np.exp(rate * T)
+    payout = growth * (bs_price(S, Ks, days, r, sigma, option_type) - bs_price(S, Kl, days, r, sigma, option_type))
+    expected_value = (credit - payout) * 100
+    max_loss = (np.abs(Ks - Kl) - credit) * 100
+    scores = {
+        'pop': pop,
+        'p_max_profit': p_max_profit,
+        'pot': _prob_touch(S, Ks, mu, sigma, T),
+        'expected_value': expected_value,
+        'ev_per_risk': expected_value / np.where(max_loss > 0, max_loss, np.nan),
+    }
+    invalid = ~(sigma > 0)
+    return {k: np.where(invalid, np.nan, v) for k, v in scores.items()}
+
+
+def condor_probabilities(S, put_short, put_long, call_short, call_long, credit, sigma, expiry_days, r=5.0):
+    """
+    Closed-form POP and expected value for iron condors and short strangles.
+    Args:
+        put_short, put_long, call_short, call_long: Strikes per combination; NaN long
+            strikes mean no long leg on that side (a strangle).
+        credit: Total net credit per share.
+        sigma: Volatility per combination as a decimal.
+        Other arguments as for spread_probabilities.
+    Returns:
+        dict: 'pop' (expires between the breakevens), 'expected_value' (dollars per contract).
+              NaN where sigma is missing or not positive.
+    """
+    S, Ps, Pl, Cs, Cl, credit, sigma, days = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (
+        S, put_short, put_long, call_short, call_long, credit, sigma, expiry_days)))
+    days = np.maximum(days, 1.0)
+    T = days / 365.0
+    rate = r / 100.0
+    mu = rate - 0.5 * sigma * sigma
+    v = sigma * np.sqrt(T)
+    pop = _prob_above(S, Ps - credit, mu, v, T) - _prob_above(S, Cs + credit, mu, v, T)
+    growth = np.exp(rate * T)
+    payout = bs_price(S, Ps, days, r, sigma, 'put') + bs_price(S, Cs, days, r, sigma, 'call')
+    payout -= np.where(np.isnan(Pl), 0.0, bs_price(S, np.nan_to_num(Pl, nan=1.0), days, r, sigma, 'put'))
+    payout -= np.where(np.isnan(Cl), 0.0, bs_price(S, np.nan_to_num(Cl, nan=1.0), days, r, sigma, 'call'))
+    expected_value = (credit - growth * payout) * 100
+    invalid = ~(sigma > 0)
+    return {
+        'pop': np.where(invalid, np.nan, np.clip(pop, 0.0, 1.0)),
+        'expected_value': np.where(invalid, np.nan, expected_value),
+    }
+
+
+def monte_carlo_probabilities(S, short_strike, long_strike, credit, sigma, expiry_days, spread_type, r=5.0,
+                              n_paths=MC_PATHS, seed=MC_SEED):
+    """
+    Simulated counterpart of spread_probabilities(). All candidates share one seeded set
+    of daily Brownian increments, so results are reproducible and candidates are
+    compared on the same scenarios. Arguments and return value as for spread_probabilities.
+    """
+    if spread_type not in ('bull_put', 'bear_call'):
+        raise ValueError(f"Unknown spread type: {spread_type}")
+    S, Ks, Kl, credit, sigma, days = _prepare(S, short_strike, long_strike, credit, sigma, expiry_days)
+    shape = S.shape
+    S, Ks, Kl, credit, sigma = S.ravel(), Ks.ravel(), Kl.ravel(), credit.ravel(), sigma.ravel()
+    steps = np.ceil(days.ravel()).astype(int)
+    n = S.size
+    scores = {k: np.full(n, np.nan) for k in SCORE_COLUMNS}
+    valid = np.flatnonzero(sigma > 0)
+    if valid.size == 0:
+        return {k: v.reshape(shape) for k, v in scores.items()}
+
+    n_steps = int(steps[valid].max())
+    dt = 1.0 / 365.0
+    rng = np.random.default_rng(seed)
+    brownian = np.cumsum(rng.standard_normal((n_paths, n_steps)) * np.sqrt(dt), axis=1)
+    t = np.arange(1, n_steps + 1) * dt
+    rate = r / 100.0
+    chunk = max(1, _MC_CHUNK_ELEMENTS // (n_paths * n_steps))
+    for start in range(0, valid.size, chunk):
+        idx = valid[start:start + chunk]
+        sig = sigma[idx][:, None, None]
+        log_path = (rate - 0.5 * sig * sig) * t[None, None, :] + sig * brownian[None, :, :]
+        after_expiry = np.arange(n_steps)[None, None, :] >= steps[idx][:, None, None]
+        log_terminal = log_path[np.arange(idx.size), :, steps[idx] - 1]
+        S_T = S[idx][:, None] * np.exp(log_terminal)
+        log_barrier = np.log(Ks[idx] / S[idx])[:, None, None]
+        if spread_type == 'bull_put':
+            payout = np.maximum(Ks[idx][:, None] - S_T, 0.0) - np.maximum(Kl[idx][:, None] - S_T, 0.0)
+            side = 1.0  # distance to the short strike is positive while above it
+            max_profit = S_T > Ks[idx][:, None]
+        else:
+            payout = np.maximum(S_T - Ks[idx][:, None], 0.0) - np.maximum(S_T - Kl[idx][:, None], 0.0)
+            side = -1.0
+            max_profit = S_T < Ks[idx][:, None]
+        # Chance of crossing between consecutive steps given both endpoints (Brownian bridge)
+        distance = side * (log_path - log_barrier)
+        origin = np.broadcast_to(side * -log_barrier, (idx.size, n_paths, 1))
+        start_distance = np.concatenate([origin, distance[:, :, :-1]], axis=2)
+        with np.errstate(over='ignore'):
+            cross = np.exp(-2 * np.maximum(start_distance, 0) * np.maximum(distance, 0) / (sig * sig * dt))
+        cross = np.where((start_distance <= 0) | (distance <= 0), 1.0, cross)
+        cross = np.where(after_expiry, 0.0, cross)
+        touched = 1.0 - np.prod(1.0 - cross, axis=2)
+        pnl = (credit[idx][:, None] - payout) * 100
+        max_loss = (np.abs(Ks[idx] - Kl[idx]) - credit[idx]) * 100
+        scores['pop'][idx] = (pnl > 0).mean(axis=1)
+        scores['p_max_profit'][idx] = max_profit.mean(axis=1)
+        scores['pot'][idx] = touched.mean(axis=1)
+        scores['expected_value'][idx] = pnl.mean(axis=1)
+        scores['ev_per_risk'][idx] = scores['expected_value'][idx] / np.where(max_loss > 0, max_loss, np.nan)
+    return {k: v.reshape(shape) for k, v in scores.items()}
+
+
+def score_candidates(candidates, current_price, expiry_days, spread_type, r=5.0, method='closed_form', **mc_kwargs):
+    """
+    Add SCORE_COLUMNS to a search_vertical_spreads() frame, using its short_iv column.
+    Args:
+        method (str): 'closed_form' or 'monte_carlo' (mc_kwargs: n_paths, seed).
+    Returns:
+        pd.DataFrame: Copy of candidates with the score columns added.
+    """
+    if method == 'closed_form':
+        score_fn = spread_probabilities
+    elif method == 'monte_carlo':
+        score_fn = monte_carlo_probabilities
+    else:
+        raise ValueError(f"Unknown scoring method: {method}")
+    candidates = candidates.copy()
+    if candidates.empty:
+        for col in SCORE_COLUMNS:
+            candidates[col] = pd.Series(dtype=float)
+        return candidates
+    scores = score_fn(
+        current_price,
+        candidates['short_strike'].to_numpy(dtype=float),
+        candidates['long_strike'].to_numpy(dtype=float),
+        candidates['credit'].to_numpy(dtype=float),
+        candidates['short_iv'].to_numpy(dtype=float),
+        expiry_days, spread_type, r, **mc_kwargs,
+    )
+    for col in SCORE_COLUMNS:
+        candidates[col] = scores[col]
+    return candidates
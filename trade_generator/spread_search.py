@@ -0,0 +1,214 @@
+# trade_generator/spread_search.py
+"""
+Vertical credit spread search over a whole expiration at once.
+
+Every usable short strike is paired with every usable long strike as a
+(short x long) matrix built by broadcasting. Per-leg constraints (short-delta
+band, open interest, bid/ask spread) are applied to the 1-D legs first, pair
+constraints (width, credit) as masks on the matrix, and the top-k candidates
+by the chosen score are picked with a partial sort instead of a full one.
+"""
+import numpy as np
+import pandas as pd
+
+# The leg filters default to off, so every quoted out-of-the-money strike is considered as before
+SPREAD_CONSTRAINTS = {
+    'min_width': 0.0,            # dollars between strikes (exclusive lower bound)
+    'max_width': 10.0,           # dollars between strikes
+    'short_delta_range': None,   # (low, high) |delta| band for the short leg, e.g. (0.10, 0.35); drops legs without a delta
+    'min_credit': 0.05,          # short bid - long ask, per share
+    'min_open_interest': None,   # both legs, e.g. 10
+    'max_bid_ask_spread': None,  # ask - bid per leg, dollars, e.g. 0.50
+}
+SPREAD_TOP_K = 5
+
+SPREAD_TYPES = ('bull_put', 'bear_call')
+CANDIDATE_COLUMNS = [
+    'short_strike', 'long_strike', 'short_bid', 'long_ask', 'credit', 'width',
+    'short_delta', 'long_delta', 'short_iv', 'short_oi', 'long_oi', 'score',
+]
+RECORD_SCORE_FIELDS = ('pop', 'pot', 'expected_value')  # copied into trade records when scored
+
+
+def _score_credit_to_width(credit, width, short_delta):
+    return credit / width
+
+
+def _score_return_on_risk(credit, width, short_delta):
+    return credit / (width - credit)
+
+
+def _score_credit(credit, width, short_delta):
+    return credit
+
+
+def _score_edge(credit, width, short_delta):
+    # Credit minus expected loss, using |short delta| as the chance of finishing in the money
+    return credit - np.abs(short_delta) * width
+
+
+SCORES = {
+    'credit_to_width': _score_credit_to_width,
+    'return_on_risk': _score_return_on_risk,
+    'credit': _score_credit,
+    'edge': _score_edge,
+}
+
+
+def _column(chain, name, default=np.nan):
+    if name in chain:
+        return chain[name].to_numpy(dtype=float)
+    return np.full(len(chain), default)
+
+
+def _leg_mask(bid, ask, oi, constraints):
+    mask = np.isfinite(bid) & np.isfinite(ask)
+    min_oi = constraints.get('min_open_interest')
+    if min_oi:
+        mask &= np.nan_to_num(oi, nan=0.0) >= min_oi
+    max_spread = constraints.get('max_bid_ask_spread')
+    if max_spread is not None:
+        mask &= (ask - bid) <= max_spread
+    return mask
+
+
+def _otm_legs(chain, current_price, spread_type, constraints):
+    strike = _column(chain, 'strike')
+    if spread_type == 'bull_put':
+        otm = strike < current_price
+    else:
+        otm = strike > current_price
+    return otm & _leg_mask(_column(chain, 'bid'), _column(chain, 'ask'), _column(chain, 'openInterest', 0.0), constraints)
+
+
+def _short_legs(chain, legs, constraints):
+    short_ok = legs & (_column(chain, 'bid') > 0)
+    band = constraints.get('short_delta_range')
+    if band is not None and 'delta' in chain:
+        abs_delta = np.abs(_column(chain, 'delta'))
+        short_ok &= (abs_delta >= band[0]) & (abs_delta <= band[1])
+    return short_ok
+
+
+def eligible_short_legs(chain, current_price, spread_type, constraints=None):
+    """Positions of the rows of chain that may be sold under constraints (as for the short leg of a spread)."""
+    constraints = {**SPREAD_CONSTRAINTS, **(constraints or {})}
+    return np.flatnonzero(_short_legs(chain, _otm_legs(chain, current_price, spread_type, constraints), constraints))
+
+
+def top_k_indices(scores, k):
+    """Positions of the k largest scores, best first (argpartition, then sort only those k)."""
+    if k is None or k >= scores.size:
+        return np.argsort(-scores, kind='stable')
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind='stable')]
+
+
+def search_vertical_spreads(chain, current_price, spread_type, constraints=None, score='credit_to_width', top_k=SPREAD_TOP_K):
+    """
+    Find the best vertical credit spreads in one expiration.
+    Args:
+        chain (pd.DataFrame): yfinance puts (bull_put) or calls (bear_call) with strike, bid,
+                              ask and optionally openInterest and delta (see chain_greeks).
+        current_price (float): Underlying price; both strikes must be out of the money.
+        spread_type (str): 'bull_put' or 'bear_call'.
+        constraints (dict): Overrides for SPREAD_CONSTRAINTS.
+        score (str): Key of SCORES used to rank candidates.
+        top_k (int): Number of candidates to return (None for all).
+    Returns:
+        pd.DataFrame: CANDIDATE_COLUMNS, best first.
+    """
+    if spread_type not in SPREAD_TYPES:
+        raise ValueError(f"Unknown spread type: {spread_type}")
+    constraints = {**SPREAD_CONSTRAINTS, **(constraints or {})}
+    score_fn = SCORES[score]
+
+    strike = _column(chain, 'strike')
+    bid = _column(chain, 'bid')
+    ask = _column(chain, 'ask')
+    oi = _column(chain, 'openInterest', 0.0)
+    delta = _column(chain, 'delta')
+    iv = _column(chain, 'impliedVolatility')
+    legs = _otm_legs(chain, current_price, spread_type, constraints)
+    short_ok = _short_legs(chain, legs, constraints)
+    s = np.flatnonzero(short_ok)
+    l = np.flatnonzero(legs)
+    if s.size == 0 or l.size == 0:
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+
+    # Short legs down the rows, long legs across the columns
+    if spread_type == 'bull_put':
+        width = strike[s][:, None] - strike[l][None, :]
+    else:
+        width = strike[l][None, :] - strike[s][:, None]
+    credit = bid[s][:, None] - ask[l][None, :]
+    mask = (width > constraints['min_width']) & (credit >= constraints['min_credit']) & (credit < width)
+    if constraints.get('max_width') is not None:
+        mask &= width <= constraints['max_width']
+    rows, cols = np.nonzero(mask)
+    if rows.size == 0:
+        return pd.DataFrame(columns=CANDIDATE_COLUMNS)
+
+    credit = credit[rows, cols]
+    width = width[rows, cols]
+    short, long = s[rows], l[cols]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = score_fn(credit, width, delta[short])
+    scores = np.where(np.isfinite(scores), scores, -np.inf)
+    best = top_k_indices(scores, top_k)
+    short, long = short[best], long[best]
+    return pd.DataFrame({
+        'short_strike': strike[short],
+        'long_strike': strike[long],
+        'short_bid': bid[short],
+        'long_ask': ask[long],
+        'credit': credit[best],
+        'width': width[best],
+        'short_delta': delta[short],
+        'long_delta': delta[long],
+        'short_iv': iv[short],
+        'short_oi': np.nan_to_num(oi[short], nan=0.0),
+        'long_oi': np.nan_to_num(oi[long], nan=0.0),
+        'score': scores[best],
+    })
+
+
+def rank_candidates(candidates, by, top_k=SPREAD_TOP_K):
+    """Best top_k rows of candidates by column `by` (NaN last), using the same partial sort as the search."""
+    if candidates.empty:
+        return candidates
+    values = candidates[by].to_numpy(dtype=float)
+    values = np.where(np.isfinite(values), values, -np.inf)
+    return candidates.iloc[top_k_indices(values, top_k)].reset_index(drop=True)
+
+
+def spread_records(candidates, current_price, strategy):
+    """
+    Convert search_vertical_spreads output to the trade dicts written to the trades JSON/CSV.
+    ticker and expiration are left blank for the caller to fill in.
+    """
+    records = []
+    for c in candidates.itertuples(index=False):
+        credit = c.credit
+        width = c.width
+        records.append({
+            'ticker': '',
+            'current_price': round(float(current_price), 2),
+            'strategy': strategy,
+            'percent_from_strike': round(100 * abs(current_price - c.short_strike) / current_price, 2),
+            'short_strike': round(float(c.short_strike), 2),
+            'long_strike': round(float(c.long_strike), 2),
+            'short_strike_price': round(float(c.short_bid), 2),
+            'long_strike_credit': round(float(c.long_ask), 2),
+            'max_loss': round(float((width - credit) * 100), 2),
+            'max_profit': round(float(credit * 100), 2),
+            'width': round(float(width), 2),
+            'percent_profit_of_width': round(float(100 * credit / width), 2),
+            'avg_oi': round(float((c.short_oi + c.long_oi) / 2), 2),
+            'expiration': '',
+        })
+        for field in RECORD_SCORE_FIELDS:
+            if field in candidates.columns:
+                value = float(getattr(c, field))
+                records[-1][field] = round(value, 4) if np.isfinite(value) else None
+    return records
@@ -1,6 +1,137 @@
-import json
+import sys
 import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 import glob
+import json
+from utils.analysis_io import load_analysis
+
+SIGNAL_FIELDS = ('ticker', 'combined_signal', 'earnings_nearby')
+SIDECAR_SUFFIX = '.idx'  # must not end in .json, or the sidecar matches the analysis glob
+
+# Indexes already loaded in this process, keyed by (path, mtime)
+_INDEX_CACHE = {}
+
+
+class SignalIndex:
+    """
+    Parses an analysis file once and answers the lookups every consumer needs:
+    tickers or full entries by combined signal text, with or without the
+    earnings filter, and entries by ticker.
+
+    The signal/earnings tables can be persisted to a small sidecar file
+    (bull_bear_analysis_<date>.json.idx) so another process can answer
+    ticker lookups without parsing the analysis. Full entries are then parsed
+    lazily, on first use.
+    """
+
+    def __init__(self, by_signal, earnings_nearby, records=None, source_path=None):
+        self.source_path = source_path
+        self._by_signal = by_signal  # {signal_text: [tickers in file order]}
+        self._earnings_nearby = set(earnings_nearby)
+        # Earnings-filtered lists built once, so every lookup is a dict hit
+        self._by_signal_filtered = {sig: [t for t in tickers if t not in self._earnings_nearby]
+                                    for sig, tickers in by_signal.items()}
+        self._records = records  # {ticker: entry}, loaded lazily when built from a sidecar
+
+    @classmethod
+    def from_records(cls, records, source_path=None):
+        by_signal = {}
+        earnings_nearby = []
+        by_ticker = {}
+        for entry in records:
+            ticker = entry['ticker']
+            by_ticker[ticker] = entry
+            sig = entry.get('combined_signal', {}).get('text')
+            if sig:
+                by_signal.setdefault(sig, []).append(ticker)
+            if entry.get('earnings_nearby'):
+                earnings_nearby.append(ticker)
+        return cls(by_signal, earnings_nearby, by_ticker, source_path)
+
+    @classmethod
+    def from_file(cls, json_path, use_sidecar=True, write_sidecar=False):
+        """
+        Build the index for an analysis file.
+        Args:
+            json_path: Path to the analysis .json (or .jsonl) file
+            use_sidecar: Load the lookup tables from a current sidecar file if one exists
+            write_sidecar: Persist the lookup tables after parsing the analysis
+        """
+        sidecar = json_path + SIDECAR_SUFFIX
+        if use_sidecar and os.path.exists(sidecar):
+            try:
+                with open(sidecar) as f:
+                    data = json.load(f)
+                if data.get('source_mtime') == os.path.getmtime(json_path) and data.get('source_size') == os.path.getsize(json_path):
+                    return cls(data['by_signal'], data['earnings_nearby'], source_path=json_path)
+            except Exception as e:
+                print(f"Ignoring unreadable signal index {sidecar}: {e}")
+        # Only the summary fields are needed for the lookup tables; entries load lazily
+        index = cls.from_records(load_analysis(json_path, fields=SIGNAL_FIELDS), source_path=json_path)
+        index._records = None
+        if write_sidecar:
+            index.save_sidecar()
+        return index
+
+    def save_sidecar(self, path=None):
+        if self.source_path is None and path is None:
+            raise ValueError("SignalIndex has no source path to write a sidecar next to")
+        path = path or self.source_path + SIDECAR_SUFFIX
+        data = {
+            'source': os.path.basename(self.source_path) if self.source_path else None,
+            'source_mtime': os.path.getmtime(self.source_path) if self.source_path else None,
+            'source_size': os.path.getsize(self.source_path) if self.source_path else None,
+            'by_signal': self._by_signal,
+            'earnings_nearby': sorted(self._earnings_nearby),
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        return path
+
+    def _load_records(self):
+        if self._records is None:
+            self._records = {entry['ticker']: entry for entry in load_analysis(self.source_path)}
+        return self._records
+
+    def signal_texts(self):
+        return list(self._by_signal)
+
+    def tickers(self, signal_text, filter_earnings_nearby=True):
+        """Tickers whose combined signal is signal_text, in file order (a shared list: don't modify it)."""
+        table = self._by_signal_filtered if filter_earnings_nearby else self._by_signal
+        return table.get(signal_text, [])
+
+    def entries(self, signal_text, filter_earnings_nearby=False):
+        """Full analysis entries whose combined signal is signal_text, in file order."""
+        records = self._load_records()
+        return [records[t] for t in self.tickers(signal_text, filter_earnings_nearby)]
+
+    def get(self, ticker):
+        return self._load_records().get(ticker)
+
+    def earnings_nearby(self, ticker):
+        return ticker in self._earnings_nearby
+
+    def __contains__(self, ticker):
+        return ticker in self._load_records()
+
+    def to_dict(self, filter_earnings_nearby=True):
+        """{signal_text: [tickers,...], ...}"""
+        return {sig: self.tickers(sig, filter_earnings_nearby) for sig in self._by_signal}
+
+
+def load_signal_index(json_path, write_sidecar=False):
+    """
+    Returns the SignalIndex for json_path, parsing the file at most once per process.
+    Ticker lookups are answered from the sidecar when the analysis writer saved one.
+    """
+    key = (os.path.abspath(json_path), os.path.getmtime(json_path))
+    index = _INDEX_CACHE.get(key)
+    if index is None:
+        index = SignalIndex.from_file(json_path, write_sidecar=write_sidecar)
+        _INDEX_CACHE[key] = index
+    return index
 
 def parse_strategy_json(json_path, filter_earnings_nearby=True, only_strongly_bullish=True):
     """
@@ -12,8 +143,7 @@ def parse_strategy_json(json_path, filter_earnings_nearby=True, only_strongly_bu
     Returns:
         List of filtered trade dicts
     """
-    with open(json_path) as f:
-        data = json.load(f)
+    data = load_analysis(json_path)
     filtered = []
     for entry in data:
         if filter_earnings_nearby and entry.get('earnings_nearby'):
@@ -24,7 +154,8 @@ def parse_strategy_json(json_path, filter_earnings_nearby=True, only_strongly_bu
     return filtered
 
 def find_latest_analysis_json(folder):
-    files = glob.glob(os.path.join(folder, 'bull_bear_analysis_*.json'))
+    # Dated analyses only: sidecars and other files sharing the prefix are not analyses
+    files = glob.glob(os.path.join(folder, 'bull_bear_analysis_????-??-??.json'))
     if not files:
         raise FileNotFoundError(f"No analysis JSON files found in {folder}")
     return max(files, key=os.path.getmtime)
@@ -34,9 +165,7 @@ def get_tickers_by_signal(json_path, signal_text, filter_earnings_nearby=True):
     Returns a list of tickers from the analysis JSON with the given signal_text (e.g., 'Strongly Bullish', 'Strongly Bearish'),
     optionally filtering out those with earnings_nearby.
     """
-    with open(json_path) as f:
-        data = json.load(f)
-    return [entry['ticker'] for entry in data if entry.get('combined_signal', {}).get('text') == signal_text and (not filter_earnings_nearby or not entry.get('earnings_nearby'))]
+    return load_signal_index(json_path).tickers(signal_text, filter_earnings_nearby)
 
 # Optionally, add a function to get all signals in one call
 
@@ -44,13 +173,5 @@ def get_signals_dict(json_path, filter_earnings_nearby=True):
     """
     Returns a dict: {signal_text: [tickers,...], ...}
     """
-    with open(json_path) as f:
-        data = json.load(f)
-    signals = {}
-    for entry in data:
-        if filter_earnings_nearby and entry.get('earnings_nearby'):
-            continue
-        sig = entry.get('combined_signal', {}).get('text')
-        if sig:
-            signals.setdefault(sig, []).append(entry['ticker'])
-    return signals
+    signals = load_signal_index(json_path).to_dict(filter_earnings_nearby)
+    return {sig: tickers for sig, tickers in signals.items() if tickers}
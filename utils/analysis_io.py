@@ -0,0 +1,143 @@
+# utils/analysis_io.py
+"""
+Compact, streamable storage for the bull/bear analysis output.
+
+bull_bear_analysis_<date>.jsonl is JSON Lines:
+  - line 1 is a header with the strategy metadata (name, type, weight), which is
+    identical for every ticker and therefore stored once;
+  - every following line is one ticker, written with compact separators, as a
+    two-element array: [record without signals, signal texts in header order].
+
+Readers that don't ask for the signals decode only the first element of the
+array (JSONDecoder.raw_decode stops at its end) and never parse the signals.
+load_analysis() also reads the legacy indented .json files and returns the same
+record shape from both formats.
+"""
+import json
+import os
+
+FORMAT_NAME = 'bull_bear_analysis'
+FORMAT_VERSION = 1
+SUMMARY_FIELDS = (
+    'ticker', 'combined_signal', 'earnings_nearby', 'earnings_date', 'days_to_earnings',
+    'current_price', 'high_52w', 'low_52w'
+)
+_DECODER = json.JSONDecoder()
+
+
+class AnalysisWriter:
+    """
+    Streams analysis dicts to a .jsonl file one record at a time.
+
+        with AnalysisWriter(path) as writer:
+            for analysis in results:
+                writer.write(analysis)
+    """
+
+    def __init__(self, path, strategies=None):
+        self.path = path
+        self.strategies = strategies  # list of {'name', 'type', 'weight'}; taken from the first record if None
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, 'w')
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            if self.count == 0:
+                self._write_header()
+            self._file.close()
+            self._file = None
+
+    def _write_header(self):
+        header = {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'strategies': self.strategies or []}
+        self._file.write(json.dumps(header, separators=(',', ':'), default=str) + '\n')
+
+    def write(self, analysis):
+        signals = analysis.get('signals', {})
+        if self.count == 0:
+            if self.strategies is None:
+                self.strategies = [{'name': name, 'type': s.get('type'), 'weight': s.get('weight')} for name, s in signals.items()]
+            self._write_header()
+        record = {k: v for k, v in analysis.items() if k != 'signals'}
+        texts = [signals.get(s['name'], {}).get('signal') for s in self.strategies]
+        # The signals are a separate trailing element so readers can skip them without parsing
+        self._file.write(json.dumps([record, texts], separators=(',', ':'), default=str) + '\n')
+        self.count += 1
+
+
+def write_analysis_jsonl(path, results, strategies=None):
+    """Write a list (or any iterable) of analysis dicts to path in the compact format."""
+    with AnalysisWriter(path, strategies) as writer:
+        for analysis in results:
+            writer.write(analysis)
+    return path
+
+
+def compact_path_for(json_path):
+    """bull_bear_analysis_<date>.json -> bull_bear_analysis_<date>.jsonl"""
+    root, ext = os.path.splitext(json_path)
+    return json_path if ext == '.jsonl' else root + '.jsonl'
+
+
+def iter_analysis(path, fields=None):
+    """
+    Stream analysis records from a .jsonl file.
+    Args:
+        path (str): Path to a bull_bear_analysis_<date>.jsonl file.
+        fields (iterable[str]): Only return these keys. The signals of a line are only
+                                parsed when 'signals' is requested.
+    Yields:
+        dict: One analysis record per ticker, with 'signals' in the full
+              {name: {'signal', 'type', 'weight'}} shape when included.
+    """
+    fields = None if fields is None else set(fields)
+    want_signals = fields is None or 'signals' in fields
+    with open(path) as f:
+        header = json.loads(f.readline() or '{}')
+        if header.get('format') != FORMAT_NAME:
+            raise ValueError(f"{path} is not a {FORMAT_NAME} JSON Lines file")
+        strategies = header.get('strategies', [])
+        for line in f:
+            if not line.strip():
+                continue
+            if want_signals:
+                record, texts = json.loads(line)
+                record['signals'] = {
+                    s['name']: {'signal': text, 'type': s.get('type'), 'weight': s.get('weight')}
+                    for s, text in zip(strategies, texts)
+                }
+            else:
+                # Decode the record, the array's first element, and stop before the signals
+                record, _ = _DECODER.raw_decode(line, line.index('[') + 1)
+            if fields is not None:
+                record = {k: v for k, v in record.items() if k in fields}
+            yield record
+
+
+def load_analysis(path, fields=None):
+    """
+    Load analysis records from either format. When given a legacy .json path whose
+    compact .jsonl sibling exists and is at least as new, the compact file is read.
+    Args:
+        path (str): Path to a .json or .jsonl analysis file.
+        fields (iterable[str]): Only return these keys (see iter_analysis).
+    Returns:
+        list[dict]
+    """
+    compact = compact_path_for(path)
+    if compact != path and os.path.exists(compact) and os.path.getmtime(compact) >= os.path.getmtime(path):
+        path = compact
+    if path.endswith('.jsonl'):
+        return list(iter_analysis(path, fields))
+    with open(path) as f:
+        data = json.load(f)
+    if fields is None:
+        return data
+    fields = set(fields)
+    return [{k: v for k, v in entry.items() if k in fields} for entry in data]
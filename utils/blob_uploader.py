@@ -0,0 +1,172 @@
+# utils/blob_uploader.py
+"""
+Azure Blob Storage upload of the daily run's artifacts.
+
+One BlobUploader serves a whole run:
+  - a single BlobServiceClient is created on first use, with an HTTP connection
+    pool sized to the upload threads, and reused for every blob;
+  - the container is ensured once, before the first upload;
+  - upload_files() sends all files concurrently over a thread pool;
+  - text artifacts (COMPRESSED_EXTENSIONS) are gzip-compressed and stored with
+    Content-Encoding: gzip, so HTTP clients and the portal still see the
+    original file;
+  - every blob carries the SHA-256 of its uncompressed content in its metadata,
+    and a file whose hash matches the stored blob is skipped.
+
+Against the local Azurite emulator, use AZURITE_CONNECTION_STRING (its
+well-known development account on the default port).
+
+    with BlobUploader(connection_string, 'trading-data') as uploader:
+        uploader.upload_files(paths, base_dir=OUTPUT_DIR, prefix='2024-06-07/')
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+UPLOAD_WORKERS = 8
+COMPRESSED_EXTENSIONS = ('.csv', '.json', '.jsonl', '.html', '.log', '.txt')
+HASH_METADATA_KEY = 'content_sha256'
+AZURITE_CONNECTION_STRING = (
+    'DefaultEndpointsProtocol=http;AccountName=devstoreaccount1;'
+    'AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;'
+    'BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;'
+)
+
+
+def prepare_payload(blob_name, data, compress=True):
+    """
+    Bytes to upload for data, plus what the blob's headers and metadata need.
+    Returns:
+        tuple: (payload bytes, sha256 hex of data, content type, content encoding or None)
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    digest = hashlib.sha256(data).hexdigest()
+    content_type = mimetypes.guess_type(blob_name)[0] or 'application/octet-stream'
+    if compress and blob_name.lower().endswith(COMPRESSED_EXTENSIONS):
+        # mtime=0 keeps the compressed bytes identical for identical content
+        return gzip.compress(data, compresslevel=6, mtime=0), digest, content_type, 'gzip'
+    return data, digest, content_type, None
+
+
+class BlobUploader:
+    """Pooled, concurrent uploader for one container."""
+
+    def __init__(self, connection_string, container, max_workers=UPLOAD_WORKERS, compress=True,
+                 skip_unchanged=True):
+        self.connection_string = connection_string
+        self.container = container
+        self.max_workers = max_workers
+        self.compress = compress
+        self.skip_unchanged = skip_unchanged
+        self._service_client = None
+        self._container_client = None
+        self._container_ready = False
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _make_service_client(self):
+        # Imported here so the rest of the project doesn't need the Azure SDK
+        import requests
+        from azure.core.pipeline.transport import RequestsTransport
+        from azure.storage.blob import BlobServiceClient
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return BlobServiceClient.from_connection_string(self.connection_string,
+                                                        transport=RequestsTransport(session=session))
+
+    @property
+    def container_client(self):
+        """The container's client, created once and ensured to exist before it is handed out."""
+        with self._lock:
+            if self._container_client is None:
+                self._service_client = self._make_service_client()
+                self._container_client = self._service_client.get_container_client(self.container)
+            if not self._container_ready:
+                self._ensure_container(self._container_client)
+                self._container_ready = True
+            return self._container_client
+
+    def _ensure_container(self, container_client):
+        from azure.core.exceptions import ResourceExistsError
+        try:
+            container_client.create_container()
+            logger.info(f"Created Azure Blob Storage container '{self.container}'")
+        except ResourceExistsError:
+            pass
+
+    def _stored_hash(self, blob_client):
+        from azure.core.exceptions import ResourceNotFoundError
+        try:
+            return (blob_client.get_blob_properties().metadata or {}).get(HASH_METADATA_KEY)
+        except ResourceNotFoundError:
+            return None
+
+    def upload_bytes(self, blob_name, data):
+        """
+        Upload data (bytes or str) as blob_name.
+        Returns:
+            str: 'uploaded', or 'skipped' when the stored blob already has this content.
+        """
+        from azure.storage.blob import ContentSettings
+        payload, digest, content_type, encoding = prepare_payload(blob_name, data, self.compress)
+        blob_client = self.container_client.get_blob_client(blob_name)
+        if self.skip_unchanged and self._stored_hash(blob_client) == digest:
+            return 'skipped'
+        blob_client.upload_blob(payload, overwrite=True, metadata={HASH_METADATA_KEY: digest},
+                                content_settings=ContentSettings(content_type=content_type, content_encoding=encoding))
+        return 'uploaded'
+
+    def upload_file(self, path, blob_name):
+        with open(path, 'rb') as f:
+            return self.upload_bytes(blob_name, f.read())
+
+    def upload_files(self, paths, base_dir=None, prefix=''):
+        """
+        Upload files concurrently. Blob names are prefix + the path relative to base_dir
+        (the file name if base_dir is None), with '/' separators.
+        Returns:
+            dict: {path: 'uploaded' | 'skipped' | 'failed'}
+        """
+        started = time.perf_counter()
+        names = {}
+        for path in paths:
+            relative = os.path.relpath(path, base_dir) if base_dir else os.path.basename(path)
+            names[path] = prefix + relative.replace(os.sep, '/')
+        if not names:
+            return {}
+        self.container_client  # ensure the container before the workers start
+
+        def upload(path):
+            try:
+                return self.upload_file(path, names[path])
+            except Exception as e:
+                logger.error(f"Failed to upload {path} to Azure Blob Storage: {e}")
+                return 'failed'
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(names)))) as pool:
+            statuses = dict(zip(names, pool.map(upload, names)))
+        counts = {s: sum(1 for v in statuses.values() if v == s) for s in ('uploaded', 'skipped', 'failed')}
+        logger.info(f"Blob upload to '{self.container}': {counts['uploaded']} uploaded, {counts['skipped']} unchanged, "
+                    f"{counts['failed']} failed in {time.perf_counter() - started:.2f}s")
+        return statuses
+
+    def close(self):
+        if self._service_client is not None:
+            self._service_client.close()
+        self._service_client = self._container_client = None
+        self._container_ready = False
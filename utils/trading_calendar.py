@@ -0,0 +1,239 @@
+# utils/trading_calendar.py
+"""
+Exchange calendar: NYSE sessions, holidays, half-days and option expiries,
+precomputed once as sorted numpy datetime64[D] arrays.
+
+Lookups are O(1) (date -> session index dict) and every query also accepts an
+array of dates and answers with array operations:
+
+    cal = nyse_calendar()
+    cal.offset(['2025-07-03', '2025-12-24'], 5)      # 5 trading days later
+    cal.next_expiry('2025-04-14')                     # 2025-04-17 (Good Friday -> Thursday)
+    cal.rebalance_dates('2025-01-01', '2025-12-31')   # first session of every week
+
+TradingCalendar.from_dates() wraps any sorted list of dates (e.g. the dates of
+the backtest indicator files) in the same interface, so "n samples after" is
+the same call as "n trading days after".
+"""
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import numpy as np
+
+NAT = np.datetime64('NaT', 'D')
+# Unscheduled closures (national days of mourning, weather)
+SPECIAL_CLOSURES = (
+    '2001-09-11', '2001-09-12', '2001-09-13', '2001-09-14', '2004-06-11', '2007-01-02',
+    '2012-10-29', '2012-10-30', '2018-12-05', '2025-01-09',
+)
+
+
+def to_days(values):
+    """Dates, datetimes, 'YYYY-MM-DD' strings or datetime64 values (scalar or array) as datetime64[D]."""
+    if isinstance(values, (str, date, np.datetime64)):
+        values = [values]
+    return np.array([v.date() if isinstance(v, datetime) else v for v in values], dtype='datetime64[D]')
+
+
+def _easter(year):
+    # Anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th (1-based) weekday of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day):
+    # Saturday holidays move to Friday, Sunday holidays to Monday
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year):
+    """Full-day NYSE holidays for a year (rules in force since 1998; Juneteenth from 2022)."""
+    holidays = []
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # no Friday make-up day when Jan 1 is a Saturday
+        holidays.append(_observed(new_year))
+    holidays += [
+        _nth_weekday(year, 1, 0, 3),              # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),              # Washington's Birthday
+        _easter(year) - timedelta(days=2),        # Good Friday
+        _nth_weekday(year, 5, 0, -1),             # Memorial Day
+    ]
+    if year >= 2022:
+        holidays.append(_observed(date(year, 6, 19)))
+    holidays += [
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),              # Labor Day
+        _nth_weekday(year, 11, 3, 4),             # Thanksgiving
+        _observed(date(year, 12, 25)),
+    ]
+    return holidays
+
+
+def nyse_half_days(year, holidays=()):
+    """1 p.m. closes: July 3, the day after Thanksgiving and Christmas Eve, when they are sessions."""
+    candidates = [date(year, 7, 3), _nth_weekday(year, 11, 3, 4) + timedelta(days=1), date(year, 12, 24)]
+    return [d for d in candidates if d.weekday() < 5 and d not in holidays]
+
+
+class TradingCalendar:
+    """
+    Sorted trading sessions plus weekly and monthly option expiries.
+    Build with nyse_calendar() for the exchange calendar or from_dates() for an
+    arbitrary date index.
+    """
+
+    def __init__(self, sessions, holidays=None, half_days=None):
+        self.sessions = np.unique(to_days(sessions))
+        self.holidays = np.unique(to_days(holidays)) if holidays is not None else np.array([], dtype='datetime64[D]')
+        self.half_days = np.unique(to_days(half_days)) if half_days is not None else np.array([], dtype='datetime64[D]')
+        self._index = {d: i for i, d in enumerate(self.sessions.tolist())}
+        self.weekly_expiries = self._expiries(monthly=False)
+        self.monthly_expiries = self._expiries(monthly=True)
+
+    @classmethod
+    def nyse(cls, start_year, end_year):
+        holidays, half_days = [], []
+        for year in range(start_year, end_year + 1):
+            year_holidays = nyse_holidays(year)
+            holidays += year_holidays
+            half_days += nyse_half_days(year, year_holidays)
+        holidays += [d for d in to_days(SPECIAL_CLOSURES).tolist() if start_year <= d.year <= end_year]
+        days = np.arange(np.datetime64(f'{start_year}-01-01'), np.datetime64(f'{end_year + 1}-01-01'), dtype='datetime64[D]')
+        sessions = days[np.is_busday(days, holidays=to_days(holidays))]
+        return cls(sessions, holidays, half_days)
+
+    @classmethod
+    def from_dates(cls, dates):
+        """Calendar whose sessions are exactly dates; each expiry is the last date on or before a Friday."""
+        return cls(dates)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def _expiries(self, monthly):
+        # Fridays (third Friday of the month if monthly); a holiday Friday expires on the session before
+        if len(self.sessions) == 0:
+            return self.sessions
+        start, end = self.sessions[0], self.sessions[-1]
+        first_friday = start + ((4 - (start.astype('datetime64[D]').astype(int) - 4) % 7) % 7)
+        fridays = np.arange(first_friday, end + 1, 7, dtype='datetime64[D]')
+        if monthly:
+            day_of_month = (fridays - fridays.astype('datetime64[M]').astype('datetime64[D]')).astype(int) + 1
+            fridays = fridays[(day_of_month >= 15) & (day_of_month <= 21)]
+        pos = np.searchsorted(self.sessions, fridays, side='right') - 1
+        valid = pos >= 0
+        return np.unique(self.sessions[pos[valid]])
+
+    def is_session(self, dates):
+        return np.isin(to_days(dates), self.sessions)
+
+    def is_half_day(self, dates):
+        return np.isin(to_days(dates), self.half_days)
+
+    def position(self, day):
+        """Session index of one date (O(1)), or None if it is not a session."""
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        elif isinstance(day, datetime):
+            day = day.date()
+        elif isinstance(day, np.datetime64):
+            day = day.astype('datetime64[D]').item()
+        return self._index.get(day)
+
+    def positions(self, dates, roll='forward'):
+        """
+        Session indices for an array of dates. Non-sessions roll to the next
+        ('forward') or previous ('backward') session, or give -1 with roll=None.
+        """
+        days = to_days(dates)
+        if roll == 'backward':
+            pos = np.searchsorted(self.sessions, days, side='right') - 1
+        else:
+            pos = np.searchsorted(self.sessions, days, side='left')
+        if roll is None:
+            found = pos < len(self.sessions)
+            found[found] = self.sessions[pos[found]] == days[found]
+            pos = np.where(found, pos, -1)
+        return pos
+
+    def _at(self, pos):
+        pos = np.asarray(pos)
+        valid = (pos >= 0) & (pos < len(self.sessions))
+        out = np.full(pos.shape, NAT)
+        out[valid] = self.sessions[pos[valid]]
+        return out
+
+    def offset(self, dates, n, roll='forward'):
+        """The session n sessions after each date (before for negative n); NaT past either end."""
+        pos = self.positions(dates, roll=roll)
+        pos = np.where(pos < 0, -len(self.sessions) - 1, pos)
+        return self._at(pos + np.asarray(n))
+
+    def sessions_between(self, start, end):
+        """Sessions with start <= session <= end."""
+        lo, hi = np.searchsorted(self.sessions, to_days(start)[0]), np.searchsorted(self.sessions, to_days(end)[0], side='right')
+        return self.sessions[lo:hi]
+
+    def next_expiry(self, dates, monthly=False):
+        """First weekly (or monthly) expiry on or after each date; NaT past the end of the calendar."""
+        expiries = self.monthly_expiries if monthly else self.weekly_expiries
+        pos = np.searchsorted(expiries, to_days(dates), side='left')
+        out = np.full(pos.shape, NAT)
+        valid = pos < len(expiries)
+        out[valid] = expiries[pos[valid]]
+        return out
+
+    def rebalance_dates(self, start, end, weekday=0, frequency='weekly'):
+        """
+        One session per period between start and end: the first session on or after the
+        given weekday of each week ('weekly'), or the first session of each month ('monthly').
+        """
+        sessions = self.sessions_between(start, end)
+        if len(sessions) == 0:
+            return sessions
+        if frequency == 'monthly':
+            period = sessions.astype('datetime64[M]')
+        else:
+            # Week number shifted so each period starts on the requested weekday (1970-01-01 was a Thursday)
+            period = (sessions.astype(int) + 3 - weekday) // 7
+        first = np.ones(len(sessions), dtype=bool)
+        first[1:] = period[1:] != period[:-1]
+        return sessions[first]
+
+    def weekdays(self, start, end, weekday=0):
+        """Every calendar date with the given weekday between start and end, trading or not."""
+        start, end = to_days(start)[0], to_days(end)[0]
+        first = start + (weekday - (start.astype(int) + 3) % 7) % 7
+        return np.arange(first, end + 1, 7, dtype='datetime64[D]')
+
+
+@lru_cache(maxsize=4)
+def nyse_calendar(start_year=2000, end_year=2035):
+    """Shared NYSE calendar, built once per process."""
+    return TradingCalendar.nyse(start_year, end_year)
+
+
+def to_strings(days):
+    """datetime64[D] array -> list of 'YYYY-MM-DD' strings (None for NaT)."""
+    return [None if np.isnat(d) else str(d) for d in np.atleast_1d(days)]